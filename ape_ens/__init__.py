@@ -18,7 +18,12 @@ def config_class():
 
 
 def __getattr__(name: str):
-    if name == "ENS":
+    if name == "AsyncENS":
+        from ape_ens.ens import AsyncENS
+
+        return AsyncENS
+
+    elif name == "ENS":
         from ape_ens.ens import ENS
 
         return ENS
@@ -28,6 +33,16 @@ def __getattr__(name: str):
 
         return ENSConfig
 
+    elif name == "ENSRecords":
+        from ape_ens.ens import ENSRecords
+
+        return ENSRecords
+
+    elif name == "ENSIndexer":
+        from ape_ens.indexer import ENSIndexer
+
+        return ENSIndexer
+
     elif name == "ENSConversions":
         from ape_ens.converter import ENSConversions
 
@@ -36,4 +51,4 @@ def __getattr__(name: str):
     raise AttributeError(name)
 
 
-__all__ = ["ENS", "ENSConfig", "ENSConversions"]
+__all__ = ["AsyncENS", "ENS", "ENSConfig", "ENSConversions", "ENSIndexer", "ENSRecords"]
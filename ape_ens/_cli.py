@@ -1,4 +1,12 @@
+import csv
+import json
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import cached_property
+from itertools import islice
+from pathlib import Path
+from typing import IO, Optional
 
 import click
 from ape.cli import ApeCliContextObject, ape_cli_context, network_option
@@ -7,6 +15,7 @@ from ape.types.address import AddressType
 from eth_utils import to_hex
 
 from ape_ens.ens import ENS
+from ape_ens.instrumentation import SessionStats, format_stats, session_stats
 
 
 def create_ens() -> ENS:
@@ -53,32 +62,54 @@ def registry_address_option(**kwargs):
 
 @cli.command()
 @ape_cli_context(obj_type=ENSContext)
-@click.argument("name")
+@click.argument("names", nargs=-1, required=True)
 @network_option(default=None)
 @registry_address_option()
-def resolve(cli_ctx, name, registry_address):
+def resolve(cli_ctx, names, registry_address):
     """
-    Resolve an ENS address.
+    Resolve ENS addresses.
     """
-    if address := cli_ctx.ens.resolve(name, registry_address=registry_address):
-        click.echo(address)
-    else:
-        click.echo(f"Could not resolve ENS '{name}'.", err=True)
+    if len(names) == 1:
+        if address := cli_ctx.ens.resolve(names[0], registry_address=registry_address):
+            click.echo(address)
+        else:
+            click.echo(f"Could not resolve ENS '{names[0]}'.", err=True)
+
+        return
+
+    # Resolve many names using batched calls.
+    addresses = cli_ctx.ens.resolve_many(names, registry_address=registry_address)
+    for name, address in addresses.items():
+        if address:
+            click.echo(f"{name}: {address}")
+        else:
+            click.echo(f"Could not resolve ENS '{name}'.", err=True)
 
 
 @cli.command(name="name")
 @ape_cli_context(obj_type=ENSContext)
-@click.argument("address")
+@click.argument("addresses", nargs=-1, required=True)
 @network_option(default=None)
 @registry_address_option()
-def name_cmd(cli_ctx, address, registry_address):
+def name_cmd(cli_ctx, addresses, registry_address):
     """
-    Get the ENS of an address.
+    Get the ENS of addresses.
     """
-    if name := cli_ctx.ens.name(address, registry_address=registry_address):
-        click.echo(name)
-    else:
-        click.echo(f"No ENS name found for '{address}'.", err=True)
+    if len(addresses) == 1:
+        if name := cli_ctx.ens.name(addresses[0], registry_address=registry_address):
+            click.echo(name)
+        else:
+            click.echo(f"No ENS name found for '{addresses[0]}'.", err=True)
+
+        return
+
+    # Look-up many addresses using batched calls.
+    names = cli_ctx.ens.name_many(addresses, registry_address=registry_address)
+    for address, name in names.items():
+        if name:
+            click.echo(f"{address}: {name}")
+        else:
+            click.echo(f"No ENS name found for '{address}'.", err=True)
 
 
 @cli.command()
@@ -96,6 +127,271 @@ def owner(cli_ctx, name, registry_address):
         click.echo(f"No owner found for '{name}'.", err=True)
 
 
+def _read_values(lines: Iterable[str]) -> Iterator[str]:
+    values = (line.strip() for line in lines)
+    return (v for v in values if v and not v.startswith("#"))
+
+
+def _read_batches(lines: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+    values = _read_values(lines)
+    while batch := list(islice(values, batch_size)):
+        yield batch
+
+
+class _ResultWriter:
+    """
+    Writes look-up results as CSV or JSONL rows, flushing after each batch.
+    """
+
+    def __init__(self, output: IO[str], output_format: str, key: str, value: str) -> None:
+        self.output = output
+        self.output_format = output_format
+        self.fields = (key, value, "error")
+        self._csv = csv.writer(output) if output_format == "csv" else None
+        if self._csv is not None:
+            self._csv.writerow(self.fields)
+
+    def write(self, rows: Iterable[tuple[str, Optional[str], Optional[str]]]) -> None:
+        for row in rows:
+            if self._csv is not None:
+                self._csv.writerow(["" if v is None else v for v in row])
+            else:
+                self.output.write(f"{json.dumps(dict(zip(self.fields, row)))}\n")
+
+        self.output.flush()
+
+
+def _look_up_batch(
+    fn_many: Callable[[list[str]], dict], fn: Callable[[str], Optional[str]], batch: list[str]
+) -> list[tuple[str, Optional[str], Optional[str]]]:
+    try:
+        results = fn_many(batch)
+    except Exception:
+        # Find which values failed by looking them up one-by-one.
+        rows: list[tuple[str, Optional[str], Optional[str]]] = []
+        for value in batch:
+            try:
+                rows.append((value, fn(value), None))
+            except Exception as err:
+                rows.append((value, None, str(err) or type(err).__name__))
+
+        return rows
+
+    return [(value, results.get(value), None) for value in batch]
+
+
+def _look_up_file(
+    input_file: IO[str],
+    writer: _ResultWriter,
+    fn_many: Callable[[list[str]], dict],
+    fn: Callable[[str], Optional[str]],
+    batch_size: int,
+    concurrency: int,
+    continue_on_error: bool,
+) -> tuple[int, int]:
+    # Keep at most ``concurrency`` batches in flight and write them in input order,
+    # so memory use does not grow with the size of the input.
+    found = missing = 0
+    pending: deque[Future] = deque()
+
+    def write_next():
+        nonlocal found, missing
+        rows = pending.popleft().result()
+        for value, result, error in rows:
+            if error is not None and not continue_on_error:
+                raise click.ClickException(f"Failed to look up '{value}': {error}")
+
+            if result:
+                found += 1
+            else:
+                missing += 1
+
+        writer.write(rows)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch in _read_batches(input_file, batch_size):
+            pending.append(executor.submit(_look_up_batch, fn_many, fn, batch))
+            if len(pending) >= concurrency:
+                write_next()
+
+        while pending:
+            write_next()
+
+    return found, missing
+
+
+def bulk_options(fn):
+    fn = click.option(
+        "--continue-on-error",
+        is_flag=True,
+        help="Record failed look-ups in the output instead of stopping",
+    )(fn)
+    fn = click.option(
+        "--concurrency",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="The number of batches to look up at once",
+    )(fn)
+    fn = click.option(
+        "--batch-size",
+        type=click.IntRange(min=1),
+        default=500,
+        show_default=True,
+        help="The number of values to look up per batch",
+    )(fn)
+    fn = click.option(
+        "--format",
+        "output_format",
+        type=click.Choice(["csv", "jsonl"]),
+        default="csv",
+        show_default=True,
+        help="The output format",
+    )(fn)
+    fn = click.option(
+        "-o",
+        "--output",
+        type=click.File("w"),
+        default="-",
+        help="The output file (defaults to stdout)",
+    )(fn)
+    return click.argument("input_file", type=click.File("r"), default="-")(fn)
+
+
+@cli.command(name="resolve-file")
+@ape_cli_context(obj_type=ENSContext)
+@bulk_options
+@network_option(default=None)
+@registry_address_option()
+def resolve_file(
+    cli_ctx,
+    input_file,
+    output,
+    output_format,
+    batch_size,
+    concurrency,
+    continue_on_error,
+    registry_address,
+):
+    """
+    Resolve the ENS names in a file (or stdin), one per line.
+    """
+    ens = cli_ctx.ens
+    found, missing = _look_up_file(
+        input_file,
+        _ResultWriter(output, output_format, "name", "address"),
+        lambda names: ens.resolve_many(names, registry_address=registry_address),
+        lambda name: ens.resolve(name, registry_address=registry_address),
+        batch_size,
+        concurrency,
+        continue_on_error,
+    )
+    click.echo(f"Resolved {found} names ({missing} not found).", err=True)
+
+
+@cli.command(name="name-file")
+@ape_cli_context(obj_type=ENSContext)
+@bulk_options
+@network_option(default=None)
+@registry_address_option()
+def name_file(
+    cli_ctx,
+    input_file,
+    output,
+    output_format,
+    batch_size,
+    concurrency,
+    continue_on_error,
+    registry_address,
+):
+    """
+    Get the ENS of the addresses in a file (or stdin), one per line.
+    """
+    ens = cli_ctx.ens
+    found, missing = _look_up_file(
+        input_file,
+        _ResultWriter(output, output_format, "address", "name"),
+        lambda addresses: ens.name_many(addresses, registry_address=registry_address),
+        lambda address: ens.name(address, registry_address=registry_address),
+        batch_size,
+        concurrency,
+        continue_on_error,
+    )
+    click.echo(f"Found {found} names ({missing} not found).", err=True)
+
+
+@cli.group()
+def snapshot():
+    """
+    Offline ENS snapshots.
+    """
+
+
+@snapshot.command(name="export")
+@ape_cli_context(obj_type=ENSContext)
+@click.argument("input_file", type=click.File("r"), default="-")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="The snapshot file to write",
+)
+@click.option("--block", type=int, help="The block to resolve the names at (defaults to latest)")
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=500,
+    show_default=True,
+    help="The number of names to resolve per batch",
+)
+@network_option(default=None)
+@registry_address_option()
+def export(cli_ctx, input_file, output, block, batch_size, registry_address):
+    """
+    Export the ENS names in a file (or stdin), one per line, to a snapshot.
+    """
+    result = cli_ctx.ens.export_snapshot(
+        output,
+        _read_values(input_file),
+        block_number=block,
+        registry_address=registry_address,
+        batch_size=batch_size,
+    )
+    click.echo(
+        f"Exported {len(result)} names at block {result.block_number} to '{output}'.", err=True
+    )
+
+
+@cli.command()
+@ape_cli_context(obj_type=ENSContext)
+@click.option("--reset", is_flag=True, help="Delete the saved counters")
+def stats(cli_ctx, reset):
+    """
+    Show the saved ENS look-up, cache, and RPC counters.
+    """
+    path = cli_ctx.ens.stats_path
+    if reset:
+        SessionStats.clear(path)
+        session_stats.reset()
+        click.echo("Cleared the ENS stats.", err=True)
+        return
+
+    counters = SessionStats.load(path)
+    for key, value in session_stats.counters.items():
+        counters[key] = counters.get(key, 0) + value
+
+    if not counters:
+        click.echo(
+            "No ENS stats saved. Set `persistent_stats: true` in the `ens` config to save them.",
+            err=True,
+        )
+        return
+
+    for line in format_stats(counters):
+        click.echo(line)
+
+
 @cli.command()
 @ape_cli_context(obj_type=ENSContext)
 @click.argument("name")
@@ -0,0 +1,621 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, MutableMapping
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from ape_ens.instrumentation import record_cache
+from ape_ens.utils.concurrency import thread_connection
+
+# SQLite's default max number of host parameters is 999 on older versions.
+_QUERY_CHUNK_SIZE = 500
+
+# How often (in writes) to check whether the cache grew past its max size.
+_EVICTION_INTERVAL = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    registry TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    block_number INTEGER,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (kind, registry, key)
+);
+CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp);
+"""
+
+
+class CacheRecord(NamedTuple):
+    """
+    A cached ENS result.
+    """
+
+    value: str
+    """The cached value, such as an address or a name."""
+
+    block_number: Optional[int]
+    """The block number the value was read at, if known."""
+
+    timestamp: float
+    """The time (seconds since the epoch) the value was cached."""
+
+
+class _MemoryEntry:
+    __slots__ = (
+        "value",
+        "expires_at",
+        "block_number",
+        "refresh_at",
+        "refresh_block_number",
+        "hits",
+        "refreshing",
+    )
+
+    def __init__(
+        self,
+        value: Optional[str],
+        expires_at: Optional[float],
+        block_number: Optional[int],
+        refresh_at: Optional[float] = None,
+        refresh_block_number: Optional[int] = None,
+    ) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.block_number = block_number
+        self.refresh_at = refresh_at
+        self.refresh_block_number = refresh_block_number
+        self.hits = 0
+        self.refreshing = False
+
+
+class MemoryCache(MutableMapping[str, str]):
+    """
+    A bounded, in-memory ENS cache with LRU eviction. Entries may expire
+    after a wall-clock TTL or once they are too many blocks old. Negative
+    results (keys that did not resolve) can be cached as well, usually with
+    a shorter TTL. Negative entries are hidden from the mapping interface.
+
+    Args:
+        max_entries (Optional[int]): The max number of entries. The least-recently
+          used entries are evicted first. ``None`` means unbounded.
+        ttl (Optional[float]): Seconds until an entry expires. ``None`` means never.
+        negative_ttl (Optional[float]): Seconds until a negative entry expires.
+          ``None`` means never. ``0`` disables negative caching.
+        max_block_age (Optional[int]): The number of blocks until an entry expires.
+          ``None`` means never.
+        name (Optional[str]): The name to record the hits, misses, and evictions of
+          the cache under (see :mod:`ape_ens.instrumentation`). ``None`` means they
+          are not recorded.
+        refresh_ahead (Optional[float]): The fraction of an entry's lifetime (its TTL or
+          max block age) left when an often used entry is due to be refreshed (see
+          :meth:`~ape_ens.cache.MemoryCache.pop_due`). ``None`` means never.
+        refresh_min_hits (int): The number of hits until an entry is refreshed ahead.
+        index_values (bool): Set to ``True`` to also index the keys by their values,
+          for reverse look-ups (see :meth:`~ape_ens.cache.MemoryCache.keys_for`).
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10_000,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = 60.0,
+        max_block_age: Optional[int] = None,
+        name: Optional[str] = None,
+        refresh_ahead: Optional[float] = None,
+        refresh_min_hits: int = 2,
+        index_values: bool = False,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_block_age = max_block_age
+        self.name = name
+        self.refresh_ahead = refresh_ahead
+        self.refresh_min_hits = refresh_min_hits
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._due: list[str] = []
+        # Lowercase value -> keys with that value, oldest first (a dict as an ordered set).
+        self._keys_by_value: Optional[dict[str, dict[str, None]]] = {} if index_values else None
+        self._lock = threading.RLock()
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """
+        The fraction of look-ups that were found in the cache,
+        or ``None`` if there were no look-ups yet.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def lookup(self, key: str, block_number: Optional[int] = None) -> tuple[bool, Optional[str]]:
+        """
+        Look up a key, including negative entries.
+
+        Args:
+            key (str): The name or address looked up.
+            block_number (Optional[int]): The current block number, for block-height expiry.
+
+        Returns:
+            tuple[bool, str | None]: Whether the key was found and its value. A found key
+            with a ``None`` value is a cached negative result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_expired(entry, block_number):
+                if entry is not None:
+                    self._remove(key)
+
+                self.misses += 1
+                found = False
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found = True
+                entry.hits += 1
+                if self._is_due(entry, block_number):
+                    entry.refreshing = True
+                    self._due.append(key)
+
+        if self.name is not None:
+            record_cache(self.name, "hits" if found else "misses")
+
+        return (True, entry.value) if found else (False, None)  # type: ignore[union-attr]
+
+    def set(
+        self,
+        key: str,
+        value: Optional[str],
+        block_number: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Cache a value. A ``None`` value is cached as a negative result.
+
+        Args:
+            key (str): The name or address looked up.
+            value (Optional[str]): The result.
+            block_number (Optional[int]): The block number the result was read at.
+            ttl (Optional[float]): Override the default TTL for this entry.
+        """
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+
+        if value is None and ttl == 0:
+            # Negative caching is disabled.
+            return
+
+        now = time.monotonic()
+        expires_at = None if ttl is None else now + ttl
+        refresh_at = refresh_block_number = None
+        if (refresh_ahead := self.refresh_ahead) is not None and value is not None:
+            if ttl is not None:
+                refresh_at = now + ttl * (1 - refresh_ahead)
+
+            if self.max_block_age is not None and block_number is not None:
+                refresh_block_number = block_number + int(self.max_block_age * (1 - refresh_ahead))
+
+        evicted = 0
+        with self._lock:
+            if (previous := self._entries.get(key)) is not None:
+                self._unindex(key, previous)
+
+            self._entries[key] = _MemoryEntry(
+                value, expires_at, block_number, refresh_at, refresh_block_number
+            )
+            self._entries.move_to_end(key)
+            if self._keys_by_value is not None and value is not None:
+                self._keys_by_value.setdefault(value.lower(), {})[key] = None
+
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._unindex(*self._entries.popitem(last=False))
+                evicted += 1
+
+            self.evictions += evicted
+
+        if evicted and self.name is not None:
+            record_cache(self.name, "evictions", evicted)
+
+    def set_negative(self, key: str, block_number: Optional[int] = None) -> None:
+        """
+        Cache that the key did not resolve.
+
+        Args:
+            key (str): The name or address looked up.
+            block_number (Optional[int]): The block number the result was read at.
+        """
+        self.set(key, None, block_number=block_number)
+
+    def invalidate(self, keys: Iterable[str]) -> int:
+        """
+        Remove keys from the cache, including negative entries.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            return sum(self._remove(key) is not None for key in keys)
+
+    def keys_for(self, value: str, block_number: Optional[int] = None) -> list[str]:
+        """
+        Reverse look up the keys cached with a value (compared case-insensitively),
+        oldest first. Expired entries are skipped and hits are not recorded. Only
+        available when created with ``index_values=True``.
+
+        Args:
+            value (str): The value, such as an address.
+            block_number (Optional[int]): The current block number, for block-height expiry.
+
+        Returns:
+            list[str]
+        """
+        if self._keys_by_value is None:
+            raise ValueError("The values of this cache are not indexed.")
+
+        with self._lock:
+            keys = self._keys_by_value.get(value.lower(), {})
+            return [k for k in keys if not self._is_expired(self._entries[k], block_number)]
+
+    def pop_due(self) -> list[str]:
+        """
+        Get the keys due to be refreshed ahead of expiring: entries looked up at least
+        ``refresh_min_hits`` times and close to expiry (see ``refresh_ahead``). Each
+        entry is only returned once, until it is set again.
+
+        Returns:
+            list[str]
+        """
+        with self._lock:
+            due, self._due = self._due, []
+
+        return due
+
+    def all_keys(self) -> list[str]:
+        """
+        All the keys in the cache, including negative entries.
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def _remove(self, key: str) -> Optional[_MemoryEntry]:
+        if (entry := self._entries.pop(key, None)) is not None:
+            self._unindex(key, entry)
+
+        return entry
+
+    def _unindex(self, key: str, entry: _MemoryEntry) -> None:
+        if self._keys_by_value is None or entry.value is None:
+            return
+
+        value = entry.value.lower()
+        if (keys := self._keys_by_value.get(value)) is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._keys_by_value[value]
+
+    def _is_expired(self, entry: _MemoryEntry, block_number: Optional[int]) -> bool:
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            return True
+
+        return (
+            self.max_block_age is not None
+            and block_number is not None
+            and entry.block_number is not None
+            and block_number - entry.block_number > self.max_block_age
+        )
+
+    def _is_due(self, entry: _MemoryEntry, block_number: Optional[int]) -> bool:
+        if entry.refreshing or entry.hits < self.refresh_min_hits:
+            return False
+
+        elif entry.refresh_at is not None and entry.refresh_at <= time.monotonic():
+            return True
+
+        return (
+            entry.refresh_block_number is not None
+            and block_number is not None
+            and block_number >= entry.refresh_block_number
+        )
+
+    def __getitem__(self, key: str) -> str:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.value is None or self._is_expired(entry, None):
+                raise KeyError(key)
+
+            return entry.value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if self._remove(key) is None:
+                raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e.value is not None]
+
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for e in self._entries.values() if e.value is not None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._keys_by_value is not None:
+                self._keys_by_value.clear()
+
+
+class DiskCache:
+    """
+    A persistent ENS cache backed by SQLite. Records are keyed by their
+    kind (``"address"``, ``"name"``, ``"owner"``, or ``"record"``), the registry
+    address, and the look-up key (a name, an address, or ``<record>@<name>``).
+
+    The database uses write-ahead logging, so it is safe to use from many
+    threads and processes at once, such as parallel test workers.
+
+    Args:
+        path (Path): The path to the database file.
+        max_entries (int): The max number of records to keep. The oldest
+          records are evicted first.
+        timeout (float): How long to wait for another writer's lock, in seconds.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100_000, timeout: float = 30.0) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._write_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self._local, self._connect)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def get(self, kind: str, registry: str, key: str) -> Optional[CacheRecord]:
+        """
+        Get a cached record.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            key (str): The name or address looked up.
+
+        Returns:
+            :class:`~ape_ens.cache.CacheRecord` | None
+        """
+        row = self._connection.execute(
+            "SELECT value, block_number, timestamp FROM records "
+            "WHERE kind = ? AND registry = ? AND key = ?",
+            (kind, registry, key),
+        ).fetchone()
+        return CacheRecord(*row) if row else None
+
+    def get_many(self, kind: str, registry: str, keys: Iterable[str]) -> dict[str, CacheRecord]:
+        """
+        Get many cached records at once. Keys not in the cache are excluded
+        from the result.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            keys (Iterable[str]): The names or addresses looked up.
+
+        Returns:
+            dict[str, :class:`~ape_ens.cache.CacheRecord`]
+        """
+        keys = list(keys)
+        records: dict[str, CacheRecord] = {}
+        for start in range(0, len(keys), _QUERY_CHUNK_SIZE):
+            end = start + _QUERY_CHUNK_SIZE
+            chunk = keys[start:end]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._connection.execute(
+                "SELECT key, value, block_number, timestamp FROM records "
+                f"WHERE kind = ? AND registry = ? AND key IN ({placeholders})",
+                (kind, registry, *chunk),
+            )
+            for key, *record in rows:
+                records[key] = CacheRecord(*record)
+
+        return records
+
+    def set(
+        self,
+        kind: str,
+        registry: str,
+        key: str,
+        value: str,
+        block_number: Optional[int] = None,
+    ) -> None:
+        """
+        Cache a record.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            key (str): The name or address looked up.
+            value (str): The result.
+            block_number (Optional[int]): The block number the result was read at.
+        """
+        self.set_many(kind, registry, {key: value}, block_number=block_number)
+
+    def set_many(
+        self,
+        kind: str,
+        registry: str,
+        items: dict[str, str],
+        block_number: Optional[int] = None,
+    ) -> None:
+        """
+        Cache many records at once, in a single transaction.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            items (dict[str, str]): Keys mapped to their results.
+            block_number (Optional[int]): The block number the results were read at.
+        """
+        if not items:
+            return
+
+        timestamp = time.time()
+        connection = self._connection
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR REPLACE INTO records "
+                "(kind, registry, key, value, block_number, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, registry, k, v, block_number, timestamp) for k, v in items.items()],
+            )
+
+        with self._lock:
+            self._write_count += len(items)
+            if self._write_count < _EVICTION_INTERVAL:
+                return
+
+            self._write_count = 0
+
+        self.evict()
+
+    def delete(self, kind: str, registry: str, key: str) -> None:
+        """
+        Remove a record from the cache.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            key (str): The name or address looked up.
+        """
+        self._connection.execute(
+            "DELETE FROM records WHERE kind = ? AND registry = ? AND key = ?",
+            (kind, registry, key),
+        )
+
+    def delete_many(self, kind: str, registry: str, keys: Iterable[str]) -> int:
+        """
+        Remove many records from the cache, in a single transaction.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            keys (Iterable[str]): The names or addresses to remove.
+
+        Returns:
+            int: The number of records removed.
+        """
+        connection = self._connection
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            cursor = connection.executemany(
+                "DELETE FROM records WHERE kind = ? AND registry = ? AND key = ?",
+                [(kind, registry, key) for key in keys],
+            )
+
+        return cursor.rowcount
+
+    def keys(self, kind: str, registry: str) -> list[str]:
+        """
+        Get the keys of all the records of a kind.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+
+        Returns:
+            list[str]
+        """
+        rows = self._connection.execute(
+            "SELECT key FROM records WHERE kind = ? AND registry = ?", (kind, registry)
+        )
+        return [key for (key,) in rows]
+
+    def recent_keys(self, kind: str, registry: str, limit: int) -> list[str]:
+        """
+        Get the keys of the most recently cached records of a kind.
+
+        Args:
+            kind (str): The kind of record, e.g. ``"address"``.
+            registry (str): The registry address.
+            limit (int): The max number of keys.
+
+        Returns:
+            list[str]: The keys, most recent first.
+        """
+        rows = self._connection.execute(
+            "SELECT key FROM records WHERE kind = ? AND registry = ? "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (kind, registry, limit),
+        )
+        return [key for (key,) in rows]
+
+    def oldest_block_number(self, registry: str) -> Optional[int]:
+        """
+        Get the block number of the oldest record, if any have a block number.
+
+        Args:
+            registry (str): The registry address.
+
+        Returns:
+            int | None
+        """
+        (number,) = self._connection.execute(
+            "SELECT MIN(block_number) FROM records WHERE registry = ?", (registry,)
+        ).fetchone()
+        return number
+
+    def evict(self) -> int:
+        """
+        Remove the oldest records until the cache is within its max size.
+
+        Returns:
+            int: The number of records removed.
+        """
+        connection = self._connection
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            (count,) = connection.execute("SELECT COUNT(*) FROM records").fetchone()
+            if (excess := count - self.max_entries) <= 0:
+                return 0
+
+            connection.execute(
+                "DELETE FROM records WHERE rowid IN "
+                "(SELECT rowid FROM records ORDER BY timestamp LIMIT ?)",
+                (excess,),
+            )
+
+        return excess
+
+    def clear(self) -> None:
+        """
+        Remove all records from the cache.
+        """
+        self._connection.execute("DELETE FROM records")
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM records").fetchone()
+        return count
@@ -0,0 +1,262 @@
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from ape.logging import logger
+from ape.utils.basemodel import ManagerAccessMixin
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_hex
+
+from ape_ens.cache import MemoryCache
+from ape_ens.exceptions import GatewayError
+from ape_ens.instrumentation import record_rpc
+from ape_ens.utils.concurrency import ForkGuard, SingleFlight
+
+if TYPE_CHECKING:
+    from requests import Session
+
+    from ape_ens.config import ENSConfig
+
+# EIP-3668: the error an offchain resolver reverts with.
+OFFCHAIN_LOOKUP_SELECTOR = function_signature_to_4byte_selector(
+    "OffchainLookup(address,string[],bytes,bytes4,bytes)"
+)
+
+# EIP-3668 recommends clients limit the number of lookups per call.
+MAX_REDIRECTS = 4
+
+
+class OffchainLookup(NamedTuple):
+    """
+    The arguments of an EIP-3668 ``OffchainLookup`` revert.
+    """
+
+    sender: str
+    """The contract that reverted."""
+
+    urls: list[str]
+    """The gateway URL templates to try, in order."""
+
+    call_data: bytes
+    """The data to send to the gateway."""
+
+    callback_function: bytes
+    """The selector of the function to call with the gateway's response."""
+
+    extra_data: bytes
+    """Data to pass back to the callback function."""
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.sender.lower()}:{to_hex(self.call_data)}"
+
+    def encode_callback(self, response: bytes) -> bytes:
+        """
+        Encode the calldata of ``callback(response, extraData)``.
+        """
+        return self.callback_function + encode(["bytes", "bytes"], [response, self.extra_data])
+
+
+def decode_offchain_lookup(data: bytes) -> Optional[OffchainLookup]:
+    """
+    Decode the revert data of an ``OffchainLookup`` error.
+
+    Args:
+        data (bytes): The revert data.
+
+    Returns:
+        :class:`~ape_ens.ccip.OffchainLookup` | None: ``None`` when the data
+        is not an ``OffchainLookup`` error.
+    """
+    if data[:4] != OFFCHAIN_LOOKUP_SELECTOR:
+        return None
+
+    try:
+        sender, urls, call_data, callback, extra_data = decode(
+            ["address", "string[]", "bytes", "bytes4", "bytes"], data[4:]
+        )
+    except Exception:
+        return None
+
+    return OffchainLookup(sender, list(urls), call_data, callback, extra_data)
+
+
+def signed_response_expiry(response: bytes) -> Optional[int]:
+    """
+    Get when a signed gateway response expires. ENS offchain resolvers (such
+    as ``ensdomains/offchain-resolver``) respond with ``(bytes result, uint64 expires,
+    bytes signature)``.
+
+    Args:
+        response (bytes): The gateway response.
+
+    Returns:
+        int | None: The expiry (seconds since the epoch), or ``None`` when the response
+        is not in that format.
+    """
+    try:
+        _, expires, _ = decode(["bytes", "uint64", "bytes"], response)
+    except Exception:
+        return None
+
+    return expires
+
+
+class GatewayClient(ManagerAccessMixin):
+    """
+    Fetches EIP-3668 (CCIP-Read) gateway responses over a pooled HTTP session
+    and caches them until they expire. All :class:`~ape_ens.ens.ENS` instances in
+    a process share one client, so connections to gateways are kept alive and
+    the same lookup made by many instances (or threads) is only fetched once.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._session: Optional["Session"] = None
+        self._fork_guard = ForkGuard()
+        self._single_flight: SingleFlight[bytes] = SingleFlight()
+        self.cache = MemoryCache(max_entries=10_000, negative_ttl=0, name="gateway_cache")
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.config_manager.ens
+
+    @property
+    def session(self) -> "Session":
+        """
+        The HTTP session, created on first use.
+        """
+        with self._lock:
+            if self._fork_guard.forked():
+                self._session = None
+
+            if (session := self._session) is None:
+                from requests import Session
+                from requests.adapters import HTTPAdapter
+
+                session = Session()
+                adapter = HTTPAdapter(pool_maxsize=max(self.config.ccip_read_max_workers, 1))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+
+            return session
+
+    def fetch(self, lookup: OffchainLookup, use_cache: bool = True) -> bytes:
+        """
+        Get the gateway response for an ``OffchainLookup``, trying each of its URLs
+        in order.
+
+        Args:
+            lookup (:class:`~ape_ens.ccip.OffchainLookup`): The lookup.
+            use_cache (bool): Set to ``False`` to not use the cache.
+
+        Raises:
+            :class:`~ape_ens.exceptions.GatewayError`: When no gateway responded.
+
+        Returns:
+            bytes: The response to pass to the callback function.
+        """
+        key = lookup.cache_key
+        if use_cache:
+            found, cached = self.cache.lookup(key)
+            if found and cached is not None:
+                return bytes.fromhex(cached)
+
+        response = self._single_flight.do(key, lambda: self._request(lookup))
+        if use_cache and (ttl := self._cache_ttl(response)) > 0:
+            self.cache.set(key, response.hex(), ttl=ttl)
+
+        return response
+
+    def fetch_many(
+        self, lookups: Sequence[OffchainLookup], use_cache: bool = True
+    ) -> list[Optional[bytes]]:
+        """
+        Get the gateway responses of many lookups at once, in parallel.
+
+        Args:
+            lookups (Sequence[:class:`~ape_ens.ccip.OffchainLookup`]): The lookups.
+            use_cache (bool): Set to ``False`` to not use the cache.
+
+        Returns:
+            list[bytes | None]: The responses, in the same order as ``lookups``.
+            ``None`` means no gateway responded.
+        """
+
+        def fetch(lookup: OffchainLookup) -> Optional[bytes]:
+            try:
+                return self.fetch(lookup, use_cache=use_cache)
+            except GatewayError as err:
+                logger.debug(str(err))
+                return None
+
+        max_workers = min(max(self.config.ccip_read_max_workers, 1), len(lookups))
+        if max_workers <= 1:
+            return [fetch(lookup) for lookup in lookups]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fetch, lookups))
+
+    def _cache_ttl(self, response: bytes) -> float:
+        ttl = self.config.ccip_read_cache_ttl
+        if (expires := signed_response_expiry(response)) is not None:
+            # Never use a signed response past its expiry.
+            ttl = min(ttl, expires - time.time())
+
+        return ttl
+
+    def _request(self, lookup: OffchainLookup) -> bytes:
+        from requests import RequestException
+
+        sender = lookup.sender.lower()
+        data = to_hex(lookup.call_data)
+        errors = []
+        for template in lookup.urls:
+            url = template.replace("{sender}", sender).replace("{data}", data)
+            record_rpc("ccip_read")
+            try:
+                if "{data}" in template:
+                    response = self.session.get(url, timeout=self.config.ccip_read_timeout)
+                else:
+                    response = self.session.post(
+                        url,
+                        json={"data": data, "sender": sender},
+                        timeout=self.config.ccip_read_timeout,
+                    )
+
+            except RequestException as err:
+                errors.append(f"{url}: {err}")
+                continue
+
+            if 400 <= response.status_code < 500:
+                # The gateway understood the request and refused it.
+                raise GatewayError(f"Gateway '{url}' returned {response.status_code}.")
+
+            elif response.status_code >= 300:
+                errors.append(f"{url}: {response.status_code}")
+                continue
+
+            try:
+                return bytes.fromhex(response.json()["data"].removeprefix("0x"))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                errors.append(f"{url}: invalid response")
+
+        raise GatewayError(f"No gateway responded to the offchain lookup: {', '.join(errors)}")
+
+    def clear(self) -> None:
+        """
+        Close the HTTP session and clear the cache.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+        self.cache.clear()
+
+
+gateway_client = GatewayClient()
+"""The CCIP-Read gateway client shared by all :class:`~ape_ens.ens.ENS` instances."""
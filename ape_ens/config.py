@@ -1,8 +1,72 @@
+from pathlib import Path
 from typing import Optional
 
 from ape.api import PluginConfig
 from ape.types import AddressType
 
+from ape_ens.utils.multicall import MULTICALL3_ADDRESS
+from ape_ens.utils.names import DEFAULT_SUFFIXES
+
+
+class RateLimitConfig(PluginConfig):
+    """
+    Configure how ENS look-ups use a provider's RPC quota
+    (see :mod:`ape_ens.scheduler`).
+    """
+
+    requests_per_second: Optional[float] = None
+    """
+    The max number of RPC requests per second (a token bucket). Use it with
+    ``method_costs`` to stay under a compute-unit limit instead. Defaults to no limit.
+    """
+
+    burst: Optional[float] = None
+    """
+    The max number of requests (or compute units) to make at once after being idle.
+    Defaults to ``requests_per_second``.
+    """
+
+    method_costs: dict[str, float] = {}
+    """
+    The cost of each kind of call (such as ``eth_call`` or ``ens.address``, as shown
+    by ``ape ens stats``) against ``requests_per_second``. Defaults to ``1``.
+    """
+
+    max_retries: int = 3
+    """
+    The number of times to retry a call after a transient error, such as
+    HTTP 429 (rate limited), a 5xx status, or a timeout.
+    """
+
+    backoff: float = 0.5
+    """
+    Seconds to wait before the first retry, doubled after each retry (with jitter).
+    A ``Retry-After`` header takes precedence.
+    """
+
+    max_backoff: float = 30.0
+    """
+    The max number of seconds to wait before a retry.
+    """
+
+    adaptive_batch_size: bool = True
+    """
+    Set to ``False`` to always put ``multicall_batch_size`` calls in a multicall.
+    Otherwise, fewer calls are made at once when multicalls are slow (see
+    ``target_latency``) or exceed the node's gas limit.
+    """
+
+    min_batch_size: int = 10
+    """
+    The min number of calls to put in a multicall when adapting its size.
+    """
+
+    target_latency: float = 2.0
+    """
+    Seconds a multicall should take at most. Slower multicalls shrink the batch size
+    and quick ones grow it back, up to ``multicall_batch_size``.
+    """
+
 
 class ENSConfig(PluginConfig):
     """
@@ -15,6 +79,119 @@ class ENSConfig(PluginConfig):
     always fetch from Ethereum.
     """
 
+    local_cache_max_entries: Optional[int] = 10_000
+    """
+    The max number of entries in the in-memory cache. The least-recently
+    used entries are evicted first. Set to ``None`` for no limit.
+    """
+
+    cache_ttl: Optional[float] = None
+    """
+    Seconds until cached results expire. Defaults to never.
+    """
+
+    cache_max_block_age: Optional[int] = None
+    """
+    The number of blocks until cached results expire. Defaults to never.
+    """
+
+    negative_cache_ttl: Optional[float] = 60.0
+    """
+    Seconds until cached negative results (names that did not resolve)
+    expire. Set to ``0`` to not cache negative results.
+    """
+
+    refresh_ahead: Optional[float] = None
+    """
+    Set to a fraction (such as ``0.2``) to re-resolve often used names in the
+    background once that fraction of their cache lifetime (``cache_ttl`` or
+    ``cache_max_block_age``) is left, serving the cached address meanwhile, so
+    they do not expire on the request path. Defaults to never.
+    """
+
+    refresh_ahead_min_hits: int = 2
+    """
+    The number of cache hits until a name is refreshed ahead of expiring.
+    """
+
+    reverse_from_forward: bool = False
+    """
+    Set to ``True`` to also answer reverse look-ups (``name()``) from cached
+    forward results: an address gets the name that was resolved to it. Only an
+    address's owner sets its primary name, so this may not be the name ENS returns;
+    use it for labeling addresses (e.g. in traces), not for verifying them.
+    Hardcoded ``registry`` entries always answer reverse look-ups.
+    """
+
+    warm_up_names: list[str] = []
+    """
+    Names to resolve in one batch, in the background, when the first ``ENS``
+    instance of a process is created (see :meth:`~ape_ens.ens.ENS.warm_up`).
+    """
+
+    warm_up_top_n: int = 0
+    """
+    The number of the most recently cached names in the persistent cache to
+    also resolve when warming up. Only applies when ``persistent_cache`` is ``True``.
+    """
+
+    persistent_cache: bool = False
+    """
+    Set to ``True`` to also cache ENS results on disk, so they are
+    shared across processes and Ape sessions. Only applies when
+    ``use_cache`` is ``True``.
+    """
+
+    cache_path: Optional[Path] = None
+    """
+    The path to the persistent cache database. Defaults to
+    ``ens/cache.db`` in the Ape data folder.
+    """
+
+    cache_max_entries: int = 100_000
+    """
+    The max number of records to keep in the persistent cache.
+    The oldest records are evicted first.
+    """
+
+    resolver_cache_max_entries: Optional[int] = 10_000
+    """
+    The max number of resolver addresses to cache in memory. Set
+    to ``None`` for no limit.
+    """
+
+    resolver_cache_max_block_age: Optional[int] = 7200
+    """
+    The number of blocks until cached resolver addresses expire (about a day
+    on mainnet). Set to ``None`` to never expire them. Names without a resolver
+    expire after ``negative_cache_ttl`` instead.
+    """
+
+    pinned_cache_max_entries: Optional[int] = 100_000
+    """
+    The max number of results at finalized blocks (looked up using ``block_identifier``)
+    to cache in memory. These never expire. Set to ``None`` for no limit.
+    """
+
+    indexer_chunk_size: int = 2_000
+    """
+    The number of blocks :class:`~ape_ens.indexer.ENSIndexer` reads logs for at once.
+    """
+
+    persistent_stats: bool = False
+    """
+    Set to ``True`` to save the look-up counters (see :mod:`ape_ens.instrumentation`)
+    of each process when it exits, adding them up across processes, so that
+    ``ape ens stats`` shows them.
+    """
+
+    snapshot_path: Optional[Path] = None
+    """
+    The path to an offline snapshot of resolved names (see ``ape ens snapshot export``).
+    Names in the snapshot resolve without a connection. Only applies when
+    ``use_cache`` is ``True``.
+    """
+
     registry: dict[str, str] = {}
     """
     Hardcode entries in the registry to avoid connecting
@@ -23,8 +200,118 @@ class ENSConfig(PluginConfig):
     to Ethereum mainnet.
     """
 
+    allowed_suffixes: Optional[list[str]] = list(DEFAULT_SUFFIXES)
+    """
+    The name suffixes (e.g. ``eth``) ENS may resolve. Other dotted strings
+    (e.g. ``foo.txt``) are rejected when checking if they can resolve (such as
+    during conversion) without connecting. Defaults to ``.eth`` and common
+    DNSSEC-imported TLDs. Names in ``registry`` are always allowed. Set to
+    ``None`` to allow any suffix.
+    """
+
     registry_address: Optional[AddressType] = None
     """
     Configure the registry address if it different than the default
     Ethereum mainnet address.
     """
+
+    mainnet_providers: list[str] = []
+    """
+    Set to read from several Ethereum mainnet providers, as Ape provider names
+    (such as ``alchemy``) or RPC URIs. Each request goes to the fastest healthy
+    one, slow requests are raced against another (see ``provider_hedge_delay``),
+    and failing providers are skipped. Defaults to the one mainnet provider found.
+    """
+
+    provider_hedge_delay: Optional[float] = 0.5
+    """
+    Seconds until a request to one of the ``mainnet_providers`` is raced against
+    the next fastest one. Set to ``None`` to only fail over.
+    """
+
+    provider_timeout: float = 10.0
+    """
+    Seconds to wait for each request to one of the ``mainnet_providers`` given
+    as an RPC URI.
+    """
+
+    provider_failure_threshold: int = 3
+    """
+    The number of failed requests in a row until one of the ``mainnet_providers``
+    is skipped for ``provider_cooldown`` seconds.
+    """
+
+    provider_cooldown: float = 30.0
+    """
+    Seconds to skip a failing one of the ``mainnet_providers`` for.
+    """
+
+    connection_pool_size: int = 8
+    """
+    The max number of ENS connections (one per registry address) kept in the
+    process-wide pool shared by all ``ENS`` instances, and of HTTP connections
+    kept alive to each of the ``mainnet_providers`` given as an RPC URI.
+    """
+
+    multicall_address: AddressType = MULTICALL3_ADDRESS
+    """
+    The Multicall3 contract used to batch calls. Defaults to its usual address,
+    which is the same on most chains.
+    """
+
+    multicall_batch_size: int = 500
+    """
+    The max number of calls to group into a single Multicall3 call
+    when resolving many names at once.
+    """
+
+    rate_limits: dict[str, RateLimitConfig] = {}
+    """
+    Rate limits, retries, and multicall sizes by provider name (such as
+    ``alchemy``). The ``default`` entry applies to providers not listed.
+    """
+
+    ccip_read: bool = True
+    """
+    Set to ``False`` to not handle offchain (EIP-3668 CCIP-Read) look-ups in batches
+    and leave them to web3, one name at a time.
+    """
+
+    ccip_read_timeout: float = 10.0
+    """
+    Seconds to wait for each CCIP-Read gateway request.
+    """
+
+    ccip_read_max_workers: int = 8
+    """
+    The max number of CCIP-Read gateway requests in flight at once
+    when resolving many names.
+    """
+
+    ccip_read_cache_ttl: float = 300.0
+    """
+    Seconds to cache CCIP-Read gateway responses for. Signed responses are never
+    cached past their expiry. Set to ``0`` to not cache them.
+    """
+
+    async_concurrency: int = 32
+    """
+    The max number of look-ups in flight at once when using
+    :class:`~ape_ens.ens.AsyncENS` to resolve many names.
+    """
+
+    def get_rate_limit(self, provider_name: Optional[str] = None) -> RateLimitConfig:
+        """
+        Get the rate limit config of a provider.
+
+        Args:
+            provider_name (Optional[str]): The provider name. Defaults to the
+              ``default`` entry.
+
+        Returns:
+            :class:`~ape_ens.config.RateLimitConfig`
+        """
+        if provider_name and (config := self.rate_limits.get(provider_name)):
+            return config
+
+        return self.rate_limits.get("default") or RateLimitConfig()
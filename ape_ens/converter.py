@@ -1,13 +1,19 @@
-from typing import TYPE_CHECKING, Any
+from collections import Counter
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Optional
 
 from ape.api import ConverterAPI
 from ape.exceptions import ConversionError
 
-from ape_ens.ens import ENS
+from ape_ens.cache import MemoryCache
+from ape_ens.utils.names import is_plausible_name
 
 if TYPE_CHECKING:
     from ape.types import AddressType
 
+    from ape_ens.config import ENSConfig
+    from ape_ens.ens import ENS
+
 
 class ENSConversions(ConverterAPI):
     """Converts ENS names like `my-name.eth` to `0xAbCd...1234`"""
@@ -15,10 +21,12 @@ class ENSConversions(ConverterAPI):
     def __init__(self, *args, **kwargs) -> None:
         ens = kwargs.pop("ens", None)
         super().__init__(*args, **kwargs)
-        self._ens: ENS = ens
+        self._ens: Optional["ENS"] = ens
+        self._rejected: Optional[MemoryCache] = None
+        self._counts: Counter = Counter()
 
     @property
-    def address_cache(self) -> dict[str, "AddressType"]:
+    def address_cache(self) -> MemoryCache:
         return self.ens.local_registry
 
     @address_cache.setter
@@ -26,28 +34,100 @@ class ENSConversions(ConverterAPI):
         self.ens.local_registry = value
 
     @property
-    def ens(self) -> ENS:
+    def ens(self) -> "ENS":
         """
-        Ape's wrapper around ENS functionality.
+        Ape's wrapper around ENS functionality, created on first use.
         """
         if ens := self._ens:
             return ens
 
+        # Imported here so that loading the converter stays cheap
+        # until a value actually needs an ENS look-up.
+        from ape_ens.ens import ENS
+
         ens = ENS()  # Default behavior.
         self._ens = ens
         return ens
 
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Counts of how ``is_convertible()`` checks were answered:
+        ``prefiltered`` (ruled out without a look-up), ``negative_cache_hits``
+        (previously rejected), and ``lookups`` (checked using ENS).
+        """
+        return {key: self._counts[key] for key in ("prefiltered", "negative_cache_hits", "lookups")}
+
+    @property
+    def rejected_cache(self) -> MemoryCache:
+        """
+        Values recently found to not be convertible.
+        """
+        if (cache := self._rejected) is None:
+            config: "ENSConfig" = self.config_manager.ens
+            cache = MemoryCache(
+                max_entries=config.local_cache_max_entries,
+                negative_ttl=config.negative_cache_ttl,
+                name="rejected_cache",
+            )
+            self._rejected = cache
+
+        return cache
+
     def is_convertible(self, value: Any) -> bool:
         if not isinstance(value, str):
             return False
 
+        elif not is_plausible_name(value) or not self.ens.is_allowed(value):
+            # Ruled out without connecting (the same way ``ENS.can_resolve()`` does).
+            # Checking plausibility first avoids loading ENS for most other values.
+            self._counts["prefiltered"] += 1
+            return False
+
+        elif self.rejected_cache.lookup(value)[0] and value not in self.address_cache:
+            self._counts["negative_cache_hits"] += 1
+            return False
+
+        self._counts["lookups"] += 1
         try:
-            return self.ens.can_resolve(value)
+            convertible = self.ens.can_resolve(value)
         except Exception:
+            # NOTE: Errors (e.g. connection issues) are not cached.
             return False
 
+        if not convertible:
+            self.rejected_cache.set_negative(value)
+
+        return convertible
+
     def convert(self, value: str) -> "AddressType":
         try:
             return self.ens.resolve(value)
         except Exception as err:
             raise ConversionError(str(err)) from err
+
+    def convert_many(self, values: Iterable[str]) -> list["AddressType"]:
+        """
+        Convert many ENS names at once, resolving them in batches. Ape's conversion
+        manager converts one value at a time and never calls this, so call it
+        directly, such as before passing a list of names to a contract.
+
+        Args:
+            values (Iterable[str]): The ENS names to convert.
+
+        Raises:
+            :class:`~ape.exceptions.ConversionError`: When any of the names did not resolve.
+
+        Returns:
+            list[AddressType]: The addresses, in the same order as ``values``.
+        """
+        values = list(values)
+        try:
+            addresses = self.ens.resolve_many(values)
+        except Exception as err:
+            raise ConversionError(str(err)) from err
+
+        if missing := [v for v in values if addresses.get(v) is None]:
+            raise ConversionError(f"Unable to resolve ENS name(s): {', '.join(missing)}.")
+
+        return [addresses[v] for v in values]  # type: ignore[misc]
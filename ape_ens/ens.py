@@ -1,34 +1,153 @@
-from functools import cached_property
-from typing import TYPE_CHECKING, Optional
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import Future
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, TypeVar
 
 from ape.exceptions import ProviderError
 from ape.logging import logger
 from ape.utils.basemodel import ManagerAccessMixin
-from web3.exceptions import BadFunctionCallOutput, CannotHandleRequest, Web3RPCError
-from web3.main import ENS as Web3ENS
+from eth_abi.exceptions import DecodingError
+from eth_utils import to_checksum_address, to_hex
 
+from ape_ens.cache import DiskCache, MemoryCache
+from ape_ens.ccip import MAX_REDIRECTS, decode_offchain_lookup, gateway_client
 from ape_ens.exceptions import MissingRegistryError
+from ape_ens.instrumentation import instrumented, record_cache, save_session_stats_at_exit
+from ape_ens.pool import connection_pool
+from ape_ens.scheduler import RPCScheduler, get_scheduler
+from ape_ens.snapshot import Snapshot
+from ape_ens.utils.concurrency import DaemonExecutor, SingleFlight, locked_cached_property
+from ape_ens.utils.multicall import (
+    ADDR_SELECTOR,
+    CONTENTHASH_SELECTOR,
+    NAME_SELECTOR,
+    OWNER_SELECTOR,
+    RESOLVER_SELECTOR,
+    decode_address,
+    decode_bytes,
+    decode_string,
+    encode_coin_addr_call,
+    encode_node_call,
+    encode_resolve_call,
+    encode_text_call,
+)
 from ape_ens.utils.namehash import namehash
+from ape_ens.utils.names import SuffixAllowlist, get_suffix_allowlist, is_plausible_name
 
 if TYPE_CHECKING:
     from ape.types import AddressType
     from ape_ethereum.provider import Web3Provider
     from hexbytes import HexBytes
+    from web3 import AsyncWeb3
+    from web3.main import ENS as Web3ENS
+    from web3.main import AsyncENS as Web3AsyncENS
+    from web3.types import BlockIdentifier
 
+    from ape_ens.cache import CacheRecord
     from ape_ens.config import ENSConfig
+    from ape_ens.utils.multicall import Call, Result
 
+T = TypeVar("T")
 
-# TODO: Use `ape.logging.silenced` in 0.8.26.
-def silenced(func):
-    def wrapper(*args, **kwargs):
-        level = logger.level
-        logger.set_level(100_000)
-        try:
-            return func(*args, **kwargs)
-        finally:
-            logger.set_level(level)
+# Roughly the mainnet block time, used to avoid re-requesting the block number.
+BLOCK_TIME = 12
+
+# How many blocks behind the latest block are considered final,
+# on chains without the ``"finalized"`` block tag.
+FINALITY_DEPTH = 64
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Refreshes and warm-ups of all instances run here.
+_background_executor = DaemonExecutor("ape-ens-background")
+
+# The warm-ups started in this process, by config, so each runs once.
+_warm_ups: set[tuple] = set()
+_warm_ups_lock = threading.Lock()
+
+# The SLIP-44 coin type of ETH, which the ``addr(bytes32)`` record holds.
+ETH_COIN_TYPE = 60
+
+# EVM chains use coin type ``EVM_COIN_TYPE | chain_id`` (ENSIP-11).
+EVM_COIN_TYPE = 0x80000000
+
+
+class ENSRecords(NamedTuple):
+    """
+    The records of an ENS name, as returned by :meth:`~ape_ens.ens.ENS.records`.
+    Records that are not set (or were not requested) are ``None``.
+    """
+
+    addresses: dict[int, Optional[str]]
+    """
+    Addresses by coin type (ENSIP-9). EVM addresses are checksummed;
+    others are the hex of their binary format.
+    """
+
+    contenthash: Optional[str]
+    """The hex of the ENSIP-7 content hash."""
+
+    texts: dict[str, Optional[str]]
+    """Text records by key, such as ``"avatar"`` or ``"url"``."""
+
+
+def _reverse_domain(address: "AddressType") -> str:
+    return f"{address.lower()[2:]}.addr.reverse"
+
+
+def _record_key(name: str, record: str) -> str:
+    # E.g. ``addr/60@vitalik.eth`` or ``text/avatar@vitalik.eth``.
+    return f"{record}@{name}"
+
+
+def _is_evm_coin_type(coin_type: int) -> bool:
+    return coin_type == ETH_COIN_TYPE or coin_type & EVM_COIN_TYPE != 0
+
+
+def _encode_record_call(node: bytes, record: str) -> bytes:
+    kind, _, arg = record.partition("/")
+    if kind == "addr":
+        coin_type = int(arg)
+        if coin_type == ETH_COIN_TYPE:
+            # Older resolvers only support ``addr(bytes32)`` for ETH.
+            return encode_node_call(ADDR_SELECTOR, node)
+
+        return encode_coin_addr_call(node, coin_type)
+
+    elif kind == "contenthash":
+        return encode_node_call(CONTENTHASH_SELECTOR, node)
+
+    return encode_text_call(node, arg)
+
+
+def _decode_record(record: str, data: bytes) -> Optional[str]:
+    kind, _, arg = record.partition("/")
+    try:
+        if kind == "addr" and int(arg) == ETH_COIN_TYPE:
+            address = decode_address(data)
+            return to_checksum_address(address) if int(address, 16) else None
+
+        elif kind == "addr":
+            raw = decode_bytes(data)
+            if not raw:
+                return None
+
+            elif _is_evm_coin_type(int(arg)) and len(raw) == 20:
+                return to_checksum_address(raw)
+
+            return to_hex(raw)
 
-    return wrapper
+        elif kind == "contenthash":
+            return to_hex(raw) if (raw := decode_bytes(data)) else None
+
+        return decode_string(data) or None
+
+    except DecodingError:
+        return None
 
 
 class ENS(ManagerAccessMixin):
@@ -39,7 +158,26 @@ class ENS(ManagerAccessMixin):
 
     def __init__(self, backend: Optional["Web3ENS"] = None) -> None:
         self.__initialized_ens = backend
-        self.local_registry: dict[str, AddressType] = {}
+        self._disk_cache_instance: Optional[DiskCache] = None
+        self._snapshot_instance: Optional[Snapshot] = None
+        self._lock = threading.RLock()
+        self._single_flight: SingleFlight = SingleFlight()
+        self._block_number: Optional[tuple[int, float]] = None
+        self._finalized_block_number: Optional[tuple[int, float]] = None
+        self._universal_resolvers: dict[str, bool] = {}
+        config = self.config
+        if config.persistent_stats:
+            save_session_stats_at_exit(self.stats_path)
+
+        if config.warm_up_names or config.warm_up_top_n:
+            key = (tuple(config.warm_up_names), config.warm_up_top_n, config.registry_address)
+            with _warm_ups_lock:
+                first = key not in _warm_ups
+                _warm_ups.add(key)
+
+            if first:
+                # Resolve the configured names in the background, ready for the first look-ups.
+                self._submit_background(self.warm_up)
 
     @classmethod
     def is_valid_name(cls, name: str) -> bool:
@@ -53,91 +191,594 @@ class ENS(ManagerAccessMixin):
         Returns:
             bool
         """
+        from web3.main import ENS as Web3ENS
+
         return Web3ENS.is_valid_name(name)
 
-    @cached_property
+    @classmethod
+    def is_plausible_name(cls, name: str) -> bool:
+        """
+        Returns False if the value cannot be an ENS name, using only cheap checks
+        (no normalization or network connection). Use this to quickly rule out
+        values such as ``"v1.2"`` or ``"data.txt"`` before checking further.
+
+        Args:
+            name (str): The name to check.
+
+        Returns:
+            bool
+        """
+        return is_plausible_name(name)
+
+    def is_allowed(self, name: str) -> bool:
+        """
+        Returns ``False`` when the name is not plausible (see
+        :meth:`~ape_ens.ens.ENS.is_plausible_name`) or does not end in an allowed
+        suffix (see :attr:`~ape_ens.ens.ENS.suffix_allowlist`). Neither needs
+        normalization or a connection. Names in the ``registry`` config are
+        always allowed.
+
+        Args:
+            name (str): The name to check.
+
+        Returns:
+            bool
+        """
+        if not self.is_plausible_name(name):
+            return False
+
+        config = self.config
+        return name in config.registry or name in get_suffix_allowlist(config.allowed_suffixes)
+
+    @property
+    def suffix_allowlist(self) -> SuffixAllowlist:
+        """
+        The suffixes :meth:`~ape_ens.ens.ENS.can_resolve` allows, from the
+        current ``allowed_suffixes`` config.
+        """
+        return get_suffix_allowlist(self.config.allowed_suffixes)
+
+    @property
     def _mainnet_provider(self) -> "Web3Provider":
         """
         An Ethereum mainnet connect is required to use ENS.
         Use this helper method across the ape-ens plugin to obtain
         the connected Ethereum provider for interacting with ENS.
+        The provider is shared by all instances (see :mod:`ape_ens.pool`).
+        """
+        return connection_pool.provider
+
+    @locked_cached_property
+    def _web3_ens(self) -> "Web3ENS":
+        # Initialized with ENS (testing?)
+        return self.__initialized_ens or self._create_web3_ens()
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.config_manager.ens
+
+    @property
+    def stats_path(self) -> Path:
+        """
+        Where the session counters are saved, when ``persistent_stats`` is enabled.
+        """
+        return self.config_manager.DATA_FOLDER / "ens" / "stats.db"
+
+    def _create_web3_ens(self, registry_address: Optional["AddressType"] = None) -> "Web3ENS":
+        # NOTE: When neither are set, uses the default (mainnet) registry.
+        # The objects are shared by all instances (see :mod:`ape_ens.pool`).
+        return connection_pool.get(registry_address or self.config.registry_address)
+
+    def _memory_cache(self, key: str, **settings: Any) -> MemoryCache:
+        # Uses the local cache config, unless overridden in ``settings``.
+        config = self.config
+        return MemoryCache(
+            **{
+                "max_entries": config.local_cache_max_entries,
+                "ttl": config.cache_ttl,
+                "negative_ttl": config.negative_cache_ttl,
+                "max_block_age": config.cache_max_block_age,
+                "name": key,
+                **settings,
+            }
+        )
+
+    @property
+    def local_registry(self) -> MemoryCache:
+        """
+        The in-memory cache of resolved names. It is bounded and its entries
+        may expire, depending on the config.
+        """
+        return self._local_registry
+
+    @local_registry.setter
+    def local_registry(self, value: dict[str, "AddressType"]) -> None:
+        cache = self.local_registry
+        cache.clear()
+        cache.update(value)
+
+    @locked_cached_property
+    def _local_registry(self) -> MemoryCache:
+        return self._memory_cache(
+            "local_registry",
+            refresh_ahead=self.config.refresh_ahead,
+            refresh_min_hits=self.config.refresh_ahead_min_hits,
+            index_values=True,
+        )
+
+    @locked_cached_property
+    def record_cache(self) -> MemoryCache:
+        """
+        The in-memory cache of records (see :meth:`~ape_ens.ens.ENS.records`).
+        It uses the same config as :attr:`~ape_ens.ens.ENS.local_registry`.
+        """
+        return self._memory_cache("record_cache")
+
+    @locked_cached_property
+    def name_cache(self) -> MemoryCache:
+        """
+        The in-memory cache of reverse look-ups (see :meth:`~ape_ens.ens.ENS.name`),
+        keyed by lowercase address. Together with
+        :attr:`~ape_ens.ens.ENS.local_registry`, it forms an index of both directions:
+        a cached name that has since resolved to another address is dropped.
+        It uses the same config as :attr:`~ape_ens.ens.ENS.local_registry`.
+        """
+        return self._memory_cache("name_cache", index_values=True)
+
+    @locked_cached_property
+    def owner_cache(self) -> MemoryCache:
+        """
+        The in-memory cache of owners (see :meth:`~ape_ens.ens.ENS.owner`).
+        It uses the same config as :attr:`~ape_ens.ens.ENS.local_registry`.
+        """
+        return self._memory_cache("owner_cache")
+
+    @locked_cached_property
+    def resolver_cache(self) -> MemoryCache:
+        """
+        The in-memory cache of resolver addresses, keyed by registry and node.
+        Look-ups of names whose resolver is cached skip the registry call.
+        Its ``hits``, ``misses``, and ``hit_rate`` show how often that happens.
+        """
+        return self._memory_cache(
+            "resolver_cache",
+            max_entries=self.config.resolver_cache_max_entries,
+            ttl=None,
+            # Names without a resolver may be registered any time.
+            max_block_age=self.config.resolver_cache_max_block_age,
+        )
+
+    @locked_cached_property
+    def pinned_cache(self) -> MemoryCache:
+        """
+        The in-memory cache of results at finalized blocks (when
+        using ``block_identifier``). These never change, so they do not expire.
+        """
+        return self._memory_cache(
+            "pinned_cache",
+            max_entries=self.config.pinned_cache_max_entries,
+            ttl=None,
+            negative_ttl=None,
+            max_block_age=None,
+        )
+
+    @property
+    def _disk_cache(self) -> Optional[DiskCache]:
+        """
+        The persistent cache, when enabled in the config.
+        """
+        if not self.config.persistent_cache:
+            return None
+
+        path = self.config.cache_path or self.config_manager.DATA_FOLDER / "ens" / "cache.db"
+        with self._lock:
+            if (cache := self._disk_cache_instance) is None or cache.path != path:
+                cache = DiskCache(path, max_entries=self.config.cache_max_entries)
+                self._disk_cache_instance = cache
+
+        return cache
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        """
+        The offline snapshot of resolved names, when configured.
+        """
+        if (path := self.config.snapshot_path) is None:
+            return None
+
+        with self._lock:
+            if (snapshot := self._snapshot_instance) is None or snapshot.path != path:
+                snapshot = Snapshot(path)
+                self._snapshot_instance = snapshot
+
+        return snapshot
+
+    def _lookup_snapshot(
+        self, name: str, registry_address: Optional["AddressType"] = None
+    ) -> tuple[bool, Optional["AddressType"]]:
+        if (snapshot := self.snapshot) is None:
+            return False, None
+
+        elif registry := snapshot.registry:
+            from ens.constants import ENS_MAINNET_ADDR  # type: ignore
+
+            # The same registry the look-up would use when connected.
+            address = registry_address or self.config.registry_address or ENS_MAINNET_ADDR
+            if registry.lower() != address.lower():
+                # The snapshot was made using a different registry.
+                return False, None
+
+        return snapshot.lookup(name)  # type: ignore[return-value]
+
+    @instrumented("export_snapshot")
+    def export_snapshot(
+        self,
+        path: Path,
+        names: Iterable[str],
+        block_number: Optional[int] = None,
+        registry_address: Optional["AddressType"] = None,
+        batch_size: Optional[int] = None,
+    ) -> Snapshot:
+        """
+        Resolve names at a pinned block and write them to an offline snapshot.
+        The names are resolved and written in batches, so they may be a stream.
+
+        Args:
+            path (Path): Where to write the snapshot.
+            names (Iterable[str]): The names to resolve.
+            block_number (Optional[int]): The block to resolve the names at.
+              Defaults to the latest block.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+            batch_size (Optional[int]): The number of names to resolve at once.
+              Defaults to the ``multicall_batch_size`` config.
+
+        Returns:
+            :class:`~ape_ens.snapshot.Snapshot`
         """
-        return self._get_mainnet_provider()
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if block_number is None:
+            block_number = self._rpc(ens, "eth_blockNumber", lambda: ens.w3.eth.block_number)
+
+        batch_size = batch_size or self.config.multicall_batch_size
+        names = iter(names)
+
+        def records():
+            while batch := list(dict.fromkeys(islice(names, batch_size))):
+                try:
+                    resolved = self._batch_resolve(ens, batch, block_identifier=block_number)
+                except (Web3RPCError, BadFunctionCallOutput) as err:
+                    raise MissingRegistryError(str(err))
+
+                yield from resolved.items()
+
+        return Snapshot.write(path, records(), block_number=block_number, registry=ens.ens.address)
+
+    def _get_block_number(self, ens: "Web3ENS") -> int:
+        # Only request the block number about once per block.
+        now = time.monotonic()
+        if self._block_number is not None and now - self._block_number[1] < BLOCK_TIME:
+            return self._block_number[0]
+
+        number = self._rpc(ens, "eth_blockNumber", lambda: ens.w3.eth.block_number)
+        self._block_number = (number, now)
+        return number
 
-    @silenced
-    def _get_mainnet_provider(self) -> "Web3Provider":
-        provider = self.network_manager.active_provider
+    def _cache_block_number(self, ens: "Web3ENS") -> Optional[int]:
+        # Only needed when expiring cached results by block height.
+        if self.config.cache_max_block_age is None:
+            return None
+
+        return self._get_block_number(ens)
+
+    def _get_finalized_block_number(self, ens: "Web3ENS") -> int:
+        from web3.exceptions import Web3RPCError
+
+        now = time.monotonic()
         if (
-            provider
-            and hasattr(provider, "web3")
-            and provider.network.name in ("mainnet", "mainnet-fork")
-            and provider.network.ecosystem.name == "ethereum"
+            self._finalized_block_number is not None
+            and now - self._finalized_block_number[1] < BLOCK_TIME
         ):
-            return provider
-
-        ethereum = self.network_manager.ethereum
-
-        # Find a provider with access to web3.ens.
-        # First, try the default ethereum mainnet provider.
-        web3_provider = None
-        if provider := ethereum.mainnet.default_provider:
-            if "web3" in dir(provider):
-                web3_provider = provider
-
-        if web3_provider is None:
-            # Loop through other providers to find a valid one.
-            # It should minimally find ape-node which comes with Ape.
-            for provider in ethereum.mainnet.providers:
-                if "web3" in dir(provider):
-                    web3_provider = provider
-                    break
-
-        if web3_provider is None:
-            raise ValueError("Never found a valid Ethereum mainnet provider.")
-
-        # Connect the provider so we can access web3.ens.
-        if not web3_provider.is_connected:
-            try:
-                web3_provider.connect()
+            return self._finalized_block_number[0]
+
+        try:
+            block = self._rpc(
+                ens, "eth_getBlockByNumber", lambda: ens.w3.eth.get_block("finalized")
+            )
+            number = block["number"]
+        except (Web3RPCError, ValueError):
+            # The chain does not support the "finalized" block tag.
+            number = self._rpc(ens, "eth_blockNumber", lambda: ens.w3.eth.block_number)
+            number -= FINALITY_DEPTH
+
+        self._finalized_block_number = (number, now)
+        return number
+
+    def _pinned_block_key(
+        self, ens: "Web3ENS", block_identifier: "BlockIdentifier"
+    ) -> Optional[str]:
+        """
+        The cache key of a block, when results at it can never change:
+        a block hash, or the number of a finalized block.
+        """
+        if isinstance(block_identifier, bytes) and len(block_identifier) == 32:
+            return to_hex(block_identifier)
 
-            except ProviderError:
-                # There might be an issue, but attempt anyway.
-                return web3_provider
+        elif isinstance(block_identifier, str) and block_identifier.startswith("0x"):
+            if len(block_identifier) == 66:
+                return block_identifier.lower()
 
-            except KeyError:
-                # Once https://github.com/ApeWorX/ape/pull/2496 is released,
-                # (Ape 0.8.26) we can remove this except block.
-                return web3_provider
+            block_identifier = int(block_identifier, 16)
 
-        return web3_provider
+        if (
+            isinstance(block_identifier, int)
+            and not isinstance(block_identifier, bool)
+            and 0 <= block_identifier <= self._get_finalized_block_number(ens)
+        ):
+            return str(block_identifier)
 
-    @cached_property
-    def _web3_ens(self) -> "Web3ENS":
-        if ens := self.__initialized_ens:
-            # Initialized with ENS (testing?)
-            return ens
+        # A block tag (e.g. "latest") or a block that is not final yet.
+        return None
+
+    def _read_pinned_cache(
+        self, kind: str, ens: "Web3ENS", block_key: str, keys: list[str]
+    ) -> dict[str, Optional[str]]:
+        registry = ens.ens.address
+        results: dict[str, Optional[str]] = {}
+        for key in keys:
+            found, value = self.pinned_cache.lookup(f"{kind}:{registry}:{block_key}:{key}")
+            if found:
+                results[key] = value
+
+        if (disk_cache := self._disk_cache) is not None and (
+            missing := [k for k in keys if k not in results]
+        ):
+            for key, record in disk_cache.get_many(
+                f"{kind}@{block_key}", registry, missing
+            ).items():
+                # Empty values are negative results.
+                results[key] = record.value or None
+                self.pinned_cache.set(f"{kind}:{registry}:{block_key}:{key}", results[key])
+
+        return results
+
+    def _write_pinned_cache(
+        self, kind: str, ens: "Web3ENS", block_key: str, items: dict[str, Optional[str]]
+    ) -> None:
+        registry = ens.ens.address
+        for key, value in items.items():
+            self.pinned_cache.set(f"{kind}:{registry}:{block_key}:{key}", value)
+
+        if items and (disk_cache := self._disk_cache) is not None:
+            values = {key: value or "" for key, value in items.items()}
+            disk_cache.set_many(f"{kind}@{block_key}", registry, values)
+
+    def _look_up_at_block(
+        self,
+        kind: str,
+        keys: Iterable[str],
+        look_up: Callable[["Web3ENS", list[str], set[str]], dict[str, Any]],
+        use_cache: Optional[bool],
+        registry_address: Optional["AddressType"],
+        block_identifier: "BlockIdentifier",
+    ) -> dict[str, Any]:
+        """
+        Look up keys at a block using ``look_up(ens, keys, live)``, caching the results
+        forever when the block is final. ``look_up`` adds the keys whose results were not
+        read at the block (e.g. offchain look-ups) to ``live``, so they are not cached.
+        """
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        results: dict[str, Any] = dict.fromkeys(keys)
+        pending = list(results)
+        block_key = self._pinned_block_key(ens, block_identifier) if use_cache else None
+        if block_key is not None:
+            cached = self._read_pinned_cache(kind, ens, block_key, pending)
+            results.update(cached)
+            pending = [k for k in pending if k not in cached]
+
+        if not pending:
+            return results
+
+        live: set[str] = set()
+        try:
+            looked_up = look_up(ens, pending, live)
+        except (Web3RPCError, BadFunctionCallOutput) as err:
+            raise MissingRegistryError(str(err))
+
+        results.update(looked_up)
+        if block_key is not None:
+            pinned = {k: v for k, v in looked_up.items() if k not in live}
+            self._write_pinned_cache(kind, ens, block_key, pinned)
+
+        return results
+
+    def _call(self, ens: "Web3ENS", call: "Call", block_identifier: "BlockIdentifier") -> "Result":
+        from web3.exceptions import ContractLogicError
+
+        target, data = call
+        try:
+            return True, bytes(
+                self._rpc(
+                    ens,
+                    "eth_call",
+                    lambda: ens.w3.eth.call({"to": target, "data": data}, block_identifier),
+                )
+            )
+        except ContractLogicError:
+            return False, b""
+
+    def _aggregate(
+        self,
+        ens: "Web3ENS",
+        calls: list["Call"],
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> list["Result"]:
+        from web3.exceptions import ContractLogicError
+
+        try:
+            # Packed with the concurrent calls of other threads, sized to the provider's limits.
+            return self._scheduler(ens).aggregate(
+                ens.w3,
+                calls,
+                block_identifier=block_identifier,
+                address=self.config.multicall_address,
+            )
+        except (ContractLogicError, DecodingError):
+            if block_identifier is None:
+                raise
+
+            # Multicall3 may not be deployed yet at the block; make each call instead.
+            return [self._call(ens, call, block_identifier) for call in calls]
+
+    def _scheduler(self, ens: "Web3ENS") -> RPCScheduler:
+        # Calls to the same provider share its rate limit (see :mod:`ape_ens.scheduler`).
+        return get_scheduler(connection_pool.provider_name(ens.w3))
+
+    def _rpc(self, ens: "Web3ENS", method: str, fn: Callable[[], T]) -> T:
+        return self._scheduler(ens).run(method, fn, web3=ens.w3)
 
-        return self._create_web3_ens()
+    def _resolver_cache_block_number(self, ens: "Web3ENS") -> Optional[int]:
+        if self.config.resolver_cache_max_block_age is None:
+            return None
+
+        return self._get_block_number(ens)
+
+    def _has_universal_resolver(self, ens: "Web3ENS") -> bool:
+        # web3 looks up single names using the Universal Resolver, which is not
+        # deployed on every chain (such as a local network with ENS deployed).
+        registry = ens.ens.address
+        if (deployed := self._universal_resolvers.get(registry)) is None:
+            address = ens._universal_resolver.address
+            deployed = bool(self._rpc(ens, "eth_getCode", lambda: ens.w3.eth.get_code(address)))
+            self._universal_resolvers[registry] = deployed
+
+        return deployed
+
+    def _lookup_local(self, ens: "Web3ENS", name: str) -> tuple[bool, Optional["AddressType"]]:
+        result = self.local_registry.lookup(name, block_number=self._cache_block_number(ens))
+        if due := self.local_registry.pop_due():
+            # Often used names about to expire; serve the cached address meanwhile.
+            self._submit_background(self._refresh_names, ens, due)
+
+        return result
 
     @property
-    def config(self) -> "ENSConfig":
-        return self.config_manager.ens
+    def _background_executor(self) -> DaemonExecutor:
+        return _background_executor
 
-    def _create_web3_ens(self, registry_address: Optional["AddressType"] = None) -> "Web3ENS":
-        if registry_address:
-            return Web3ENS.from_web3(self._mainnet_provider.web3, registry_address)
+    def _submit_background(self, fn: Callable[..., Any], *args: Any) -> Future:
+        def run() -> None:
+            try:
+                fn(*args)
+            except Exception as err:
+                logger.debug(f"ENS background look-up failed: {err}")
 
-        else:
-            # Check config.
-            if address := self.config.registry_address:
-                return Web3ENS.from_web3(self._mainnet_provider.web3, address)
+        return self._background_executor.submit(run)
+
+    def _refresh_names(self, ens: "Web3ENS", names: list[str]) -> None:
+        resolved = self._batch_resolve(ens, names)
+        for name, address in resolved.items():
+            self._cache_local(ens, name, address)
+
+        self._write_disk_cache("address", ens, {n: a for n, a in resolved.items() if a})
+
+    def _cache_local(self, ens: "Web3ENS", name: str, address: Optional["AddressType"]) -> None:
+        self.local_registry.set(name, address, block_number=self._cache_block_number(ens))
+
+    def _lookup_name(
+        self, address: "AddressType", block_number: Optional[int]
+    ) -> tuple[bool, Optional[str]]:
+        key = address.lower()
+        found, name = self.name_cache.lookup(key, block_number=block_number)
+        if name is not None:
+            if (resolved := self.local_registry.get(name)) is None or resolved.lower() == key:
+                return True, name
+
+            # The name has since resolved to another address, so it is not this one's.
+            self.name_cache.invalidate((key,))
+            found = False
+
+        # Check config cache.
+        config = self.config
+        for hardcoded_name, hardcoded_address in config.registry.items():
+            if hardcoded_address.lower() == key:
+                return True, hardcoded_name
+
+        if config.reverse_from_forward and (
+            names := self.local_registry.keys_for(key, block_number=block_number)
+        ):
+            return True, names[0]
+
+        # May be a cached negative result.
+        return found, None
+
+    def _cache_name(
+        self, address: "AddressType", name: Optional[str], block_number: Optional[int]
+    ) -> None:
+        self.name_cache.set(address.lower(), name, block_number=block_number)
+        if name is not None:
+            # The name was verified to resolve to the address.
+            self.local_registry.set(name, to_checksum_address(address), block_number=block_number)
+
+    def _read_disk_cache(self, kind: str, ens: "Web3ENS", keys: Iterable[str]) -> dict[str, str]:
+        if (disk_cache := self._disk_cache) is None:
+            return {}
+
+        keys = list(keys)
+        records = disk_cache.get_many(kind, ens.ens.address, keys)
+        values = self._fresh_values(records, self._cache_block_number(ens))
+        record_cache("persistent_cache", "hits", len(values))
+        record_cache("persistent_cache", "misses", len(keys) - len(values))
+        return values
+
+    def _fresh_values(
+        self, records: dict[str, "CacheRecord"], block_number: Optional[int]
+    ) -> dict[str, str]:
+        # Filter out persisted records that expired (by time or block height).
+        ttl = self.config.cache_ttl
+        max_block_age = self.config.cache_max_block_age
+        now = time.time()
+        return {
+            key: record.value
+            for key, record in records.items()
+            if (ttl is None or now - record.timestamp < ttl)
+            and (
+                max_block_age is None
+                or block_number is None
+                or record.block_number is None
+                or block_number - record.block_number <= max_block_age
+            )
+        }
 
-        # Use default (most common).
-        return self._mainnet_provider.web3.ens
+    def _write_disk_cache(self, kind: str, ens: "Web3ENS", items: dict[str, str]) -> None:
+        if not items or (disk_cache := self._disk_cache) is None:
+            return
 
+        block_number = self._get_block_number(ens)
+        disk_cache.set_many(kind, ens.ens.address, items, block_number=block_number)
+
+    def _get_web3_ens(self, registry_address: Optional["AddressType"] = None) -> "Web3ENS":
+        return (
+            self._create_web3_ens(registry_address=registry_address)
+            if registry_address
+            else self._web3_ens
+        )
+
+    @instrumented("can_resolve")
     def can_resolve(self, name: str) -> bool:
         """
-        Returns ``True`` when ENS can resolve the name.
+        Returns ``True`` when ENS can resolve the name. Names that are
+        not plausible or that do not end in an allowed suffix (see
+        :attr:`~ape_ens.ens.ENS.suffix_allowlist`) are rejected without
+        connecting.
 
         Args:
             name (str): The name to check.
@@ -145,7 +786,9 @@ class ENS(ManagerAccessMixin):
         Returns:
             bool
         """
-        if "." not in name or not self.is_valid_name(name):
+        from web3.exceptions import CannotHandleRequest
+
+        if not self.is_allowed(name) or not self.is_valid_name(name):
             return False
 
         try:
@@ -157,11 +800,13 @@ class ENS(ManagerAccessMixin):
 
         return address is not None
 
+    @instrumented("resolve")
     def resolve(
         self,
         name: str,
         use_cache: Optional[bool] = None,
         registry_address: Optional["AddressType"] = None,
+        block_identifier: Optional["BlockIdentifier"] = None,
     ) -> Optional["AddressType"]:
         """
         Resolve an ENS name.
@@ -171,77 +816,992 @@ class ENS(ManagerAccessMixin):
             use_cache (bool): Set to ``False`` to not use the in-memory cache.
             registry_address (Optional[AddressType]): Optionally, change the registry
               address.
+            block_identifier (Optional[BlockIdentifier]): Resolve at this block, rather
+              than the latest. Results at finalized blocks are cached forever.
 
         Returns:
             AddressType | None
         """
-        ens = (
-            self._create_web3_ens(registry_address=registry_address)
-            if registry_address
-            else self._web3_ens
-        )
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
+
+        if block_identifier is not None:
+            return self.resolve_many(
+                [name],
+                use_cache=use_cache,
+                registry_address=registry_address,
+                block_identifier=block_identifier,
+            )[name]
+
         if use_cache is None:
             # Use default from config.
             use_cache = self.config.use_cache
 
         if use_cache:
-            if address := self.local_registry.get(name):
+            # Check the offline snapshot, which does not need a connection.
+            found, address = self._lookup_snapshot(name, registry_address=registry_address)
+            if found:
+                return address
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if use_cache:
+            found, address = self._lookup_local(ens, name)
+            if address:
                 return address
 
             # Check config cache.
             if address := self.config.registry.get(name):
-                self.local_registry[name] = address
+                self._cache_local(ens, name, address)
+                return address
+
+            if found:
+                # Cached negative result.
+                return None
+
+            # Check persistent cache.
+            if address := self._read_disk_cache("address", ens, (name,)).get(name):
+                self._cache_local(ens, name, address)
                 return address
 
         try:
-            address = ens.address(name)
+            # Concurrent look-ups of the same name share a single call.
+            address = self._single_flight.do(
+                ("address", ens.ens.address, name), lambda: self._resolve_address(ens, name)
+            )
         except (Web3RPCError, BadFunctionCallOutput) as err:
             raise MissingRegistryError(str(err))
 
-        if use_cache and address is not None:
-            self.local_registry[name] = address
+        if use_cache:
+            self._cache_local(ens, name, address)
+            if address is not None:
+                self._write_disk_cache("address", ens, {name: address})
 
         return address
 
-    def name(
-        self, address: "AddressType", registry_address: Optional["AddressType"] = None
-    ) -> Optional[str]:
+    @instrumented("resolve_many")
+    def resolve_many(
+        self,
+        names: Iterable[str],
+        use_cache: Optional[bool] = None,
+        registry_address: Optional["AddressType"] = None,
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> dict[str, Optional["AddressType"]]:
         """
-        Reverse look-up an address to get the ENS name.
+        Resolve many ENS names at once. Rather than making two calls per name
+        (registry ``resolver()`` and then resolver ``addr()``), the registry calls
+        are grouped into a single Multicall3 ``aggregate3`` call, followed by
+        another for all the resolver calls.
 
         Args:
-            address (AddressType): The address to resolve.
-            registry_address (Optional[AddressType]): Optionally, change the registry.
+            names (Iterable[str]): The names to resolve.
+            use_cache (bool): Set to ``False`` to not use the in-memory cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+            block_identifier (Optional[BlockIdentifier]): Resolve at this block, rather
+              than the latest. Results at finalized blocks are cached forever.
 
         Returns:
-            str | None: The ENS name.
+            dict[str, AddressType | None]: Each name mapped to its address.
         """
-        ens = (
-            self._create_web3_ens(registry_address=registry_address)
-            if registry_address
-            else self._web3_ens
-        )
-        return ens.name(address)
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
 
-    def owner(
-        self, name: str, registry_address: Optional["AddressType"] = None
-    ) -> Optional["AddressType"]:
-        """
-        Get the owner of an ENS domain.
+        if block_identifier is not None:
 
-        Args:
-            name (str): The ENS name to check.
-            registry_address (Optional[AddressType]): Optionally, change the registry.
+            def look_up(ens, names, live):
+                return self._batch_resolve(ens, names, block_identifier=block_identifier, live=live)
 
-        Returns:
-            AddressType | None
-        """
-        ens = (
-            self._create_web3_ens(registry_address=registry_address)
-            if registry_address
-            else self._web3_ens
+            return self._look_up_at_block(
+                "address", names, look_up, use_cache, registry_address, block_identifier
+            )
+
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        results: dict[str, Optional["AddressType"]] = dict.fromkeys(names)
+        remaining = list(results)
+        if use_cache and self.snapshot is not None:
+            # Check the offline snapshot, which does not need a connection.
+            remaining = []
+            for name in results:
+                found, address = self._lookup_snapshot(name, registry_address=registry_address)
+                if found:
+                    results[name] = address
+                else:
+                    remaining.append(name)
+
+            if not remaining:
+                return results
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        pending: list[str] = []
+        for name in remaining:
+            if use_cache:
+                found, address = self._lookup_local(ens, name)
+                if address:
+                    results[name] = address
+                    continue
+
+                # Check config cache.
+                if address := self.config.registry.get(name):
+                    self._cache_local(ens, name, address)
+                    results[name] = address
+                    continue
+
+                if found:
+                    # Cached negative result.
+                    continue
+
+            pending.append(name)
+
+        if use_cache and pending:
+            # Check persistent cache.
+            for name, address in self._read_disk_cache("address", ens, pending).items():
+                self._cache_local(ens, name, address)
+                results[name] = address
+
+            pending = [name for name in pending if results[name] is None]
+
+        if not pending:
+            return results
+
+        try:
+            resolved = self._batch_resolve(ens, pending)
+        except (Web3RPCError, BadFunctionCallOutput) as err:
+            raise MissingRegistryError(str(err))
+
+        for name, address in resolved.items():
+            results[name] = address
+            if use_cache:
+                self._cache_local(ens, name, address)
+
+        if use_cache:
+            addresses = {name: address for name, address in resolved.items() if address}
+            self._write_disk_cache("address", ens, addresses)
+
+        return results
+
+    @instrumented("warm_up")
+    def warm_up(
+        self,
+        names: Optional[Iterable[str]] = None,
+        registry_address: Optional["AddressType"] = None,
+    ) -> dict[str, Optional["AddressType"]]:
+        """
+        Resolve names in one batch, filling the caches, so later look-ups of them do
+        not wait for a round trip. This happens in the background when the first
+        instance of a process is created, when the ``warm_up_names`` or
+        ``warm_up_top_n`` config is set.
+
+        Args:
+            names (Optional[Iterable[str]]): The names to resolve. Defaults to the
+              ``warm_up_names`` config and the ``warm_up_top_n`` most recently cached
+              names in the persistent cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+
+        Returns:
+            dict[str, AddressType | None]: Each name mapped to its address.
+        """
+        if names is None:
+            names = list(self.config.warm_up_names)
+            if (top_n := self.config.warm_up_top_n) and (disk_cache := self._disk_cache):
+                registry = self._get_web3_ens(registry_address=registry_address).ens.address
+                names.extend(disk_cache.recent_keys("address", registry, top_n))
+
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        return self.resolve_many(names, registry_address=registry_address)
+
+    def _resolve_address(self, ens: "Web3ENS", name: str) -> Optional["AddressType"]:
+        # The same way as ``resolve_many()``, rather than web3's ``ens.address``, so the
+        # resolver cache and the cached CCIP-Read gateway responses are used.
+        return self._batch_resolve(ens, [name])[name]
+
+    def _batch_resolve(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        block_identifier: Optional["BlockIdentifier"] = None,
+        live: Optional[set[str]] = None,
+    ) -> dict[str, Optional["AddressType"]]:
+        from web3.exceptions import ContractLogicError
+
+        nodes = [bytes(self.namehash(name)) for name in names]
+        try:
+            addr_results = self._batch_resolver_call(
+                ens,
+                names,
+                nodes,
+                ADDR_SELECTOR,
+                wildcard=True,
+                block_identifier=block_identifier,
+                offchain=live,
+            )
+        except (ContractLogicError, DecodingError):
+            if block_identifier is not None:
+                # web3 only resolves at the latest block.
+                if live is not None:
+                    live.update(names)
+
+                return dict.fromkeys(names)
+
+            # Multicall3 is likely not deployed on this chain; resolve one-by-one.
+            return {
+                name: self._rpc(ens, "ens.address", lambda: ens.address(name)) for name in names
+            }
+
+        return self._decode_addresses(
+            ens, names, addr_results, block_identifier=block_identifier, live=live
+        )
+
+    def _decode_addresses(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        addr_results: list[Optional["Result"]],
+        block_identifier: Optional["BlockIdentifier"] = None,
+        live: Optional[set[str]] = None,
+    ) -> dict[str, Optional["AddressType"]]:
+        results: dict[str, Optional["AddressType"]] = {}
+        for name, result in zip(names, addr_results):
+            if result is None:
+                # Neither the name nor its parents have a resolver.
+                results[name] = None
+                continue
+
+            elif not result[0] or len(result[1]) < 32:
+                # The call reverted, such as for a failed offchain (CCIP-Read) look-up
+                # or a parent resolver without wildcard support. The single
+                # look-up handles these, but only at the latest block.
+                results[name] = None
+                if block_identifier is None and self._has_universal_resolver(ens):
+                    results[name] = self._rpc(ens, "ens.address", lambda: ens.address(name))
+
+                if live is not None:
+                    live.add(name)
+
+                continue
+
+            address = decode_address(result[1])
+            results[name] = to_checksum_address(address) if int(address, 16) else None
+
+        return results
+
+    def _find_resolvers(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        nodes: list[bytes],
+        wildcard: bool = False,
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> list[Optional[tuple[Optional[str], bool]]]:
+        """
+        Find the resolver of each name, as ``(resolver, is_wildcard)`` pairs. Only
+        nodes missing from the resolver cache are looked up in the registry, using
+        one multicall per level. With ``wildcard=True``, names without a resolver use
+        their closest parent's resolver (ENSIP-10). Look-ups at a given
+        ``block_identifier`` do not use the cache.
+        """
+        # Resolvers at a pinned block may differ from the latest ones.
+        cache = MemoryCache(max_entries=None) if block_identifier else self.resolver_cache
+        registry = ens.ens.address
+        block_number = None if block_identifier else self._resolver_cache_block_number(ens)
+        results: list[Optional[tuple[Optional[str], bool]]] = [None] * len(names)
+
+        # The (parent) name and node checked next for each name still searched.
+        searching = {index: (name, node) for index, (name, node) in enumerate(zip(names, nodes))}
+        while searching:
+            resolvers: dict[bytes, Optional[str]] = {}
+            uncached: dict[bytes, str] = {}
+            for _, node in searching.values():
+                if node in resolvers or node in uncached:
+                    continue
+
+                key = f"{registry}:{node.hex()}"
+                found, resolver = cache.lookup(key, block_number=block_number)
+                if found:
+                    resolvers[node] = resolver
+                else:
+                    uncached[node] = key
+
+            if uncached:
+                nodes_to_query = list(uncached)
+                registry_results = self._aggregate(
+                    ens,
+                    [(registry, encode_node_call(RESOLVER_SELECTOR, n)) for n in nodes_to_query],
+                    block_identifier=block_identifier,
+                )
+                for node, (success, data) in zip(nodes_to_query, registry_results):
+                    resolver = decode_address(data) if success and data else None
+                    resolvers[node] = resolver if resolver and int(resolver, 16) else None
+                    if success:
+                        cache.set(uncached[node], resolvers[node], block_number=block_number)
+
+            next_searching: dict[int, tuple[str, bytes]] = {}
+            for index, (name, node) in searching.items():
+                if (resolver := resolvers[node]) is not None:
+                    results[index] = (resolver, name != names[index])
+
+                elif wildcard and "." in name:
+                    parent = name.split(".", 1)[1]
+                    next_searching[index] = (parent, bytes(self.namehash(parent)))
+
+                else:
+                    results[index] = (None, False)
+
+            searching = next_searching
+
+        return results
+
+    def _batch_resolver_call(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        nodes: list[bytes],
+        selector: bytes,
+        wildcard: bool = False,
+        block_identifier: Optional["BlockIdentifier"] = None,
+        offchain: Optional[set[str]] = None,
+    ) -> list[Optional["Result"]]:
+        """
+        Find the resolver of each node and then call ``selector(node)`` on it,
+        using multicalls. A ``None`` result means the node has no resolver.
+        """
+        resolvers = self._find_resolvers(
+            ens, names, nodes, wildcard=wildcard, block_identifier=block_identifier
+        )
+        return self._call_resolvers(
+            ens,
+            names,
+            nodes,
+            resolvers,
+            selector,
+            block_identifier=block_identifier,
+            offchain=offchain,
+        )
+
+    def _call_resolvers(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        nodes: list[bytes],
+        resolvers: list[Optional[tuple[Optional[str], bool]]],
+        selector: bytes,
+        block_identifier: Optional["BlockIdentifier"] = None,
+        offchain: Optional[set[str]] = None,
+    ) -> list[Optional["Result"]]:
+        calldata = [[encode_node_call(selector, node)] for node in nodes]
+        results = self._multicall_resolvers(
+            ens, names, resolvers, calldata, block_identifier=block_identifier, offchain=offchain
+        )
+        return [None if r is None else r[0] for r in results]
+
+    def _multicall_resolvers(
+        self,
+        ens: "Web3ENS",
+        names: list[str],
+        resolvers: list[Optional[tuple[Optional[str], bool]]],
+        calldata: list[list[bytes]],
+        block_identifier: Optional["BlockIdentifier"] = None,
+        offchain: Optional[set[str]] = None,
+    ) -> list[Optional[list["Result"]]]:
+        """
+        Make each name's calls (``calldata``) to its resolver, all in one multicall.
+        Offchain (CCIP-Read) look-ups are then made together, and the names looked up
+        offchain are added to ``offchain``. A ``None`` result means the name has no
+        resolver.
+        """
+        from ens.utils import dns_encode_name  # type: ignore
+
+        calls: list["Call"] = []
+        indices: list[int] = []
+        for index, (name, found, name_calldata) in enumerate(zip(names, resolvers, calldata)):
+            if found is None or (resolver := found[0]) is None:
+                continue
+
+            dns_name = bytes(dns_encode_name(name)) if found[1] else None
+            for data in name_calldata:
+                if dns_name is not None:
+                    # Wildcard (ENSIP-10): ask the parent's resolver to resolve the name.
+                    data = encode_resolve_call(dns_name, data)
+
+                calls.append((resolver, data))
+                indices.append(index)
+
+        results: list[Optional[list["Result"]]] = [None] * len(names)
+        if not calls:
+            return results
+
+        call_results = self._aggregate(ens, calls, block_identifier=block_identifier)
+        if self.config.ccip_read:
+            looked_up = self._offchain_lookup(ens, calls, call_results, block_identifier)
+            if offchain is not None:
+                offchain.update(names[indices[i]] for i in looked_up)
+
+        for index, (success, data) in zip(indices, call_results):
+            if success and resolvers[index][1]:  # type: ignore[index]
+                try:
+                    data = decode_bytes(data)
+                except DecodingError:
+                    success, data = False, b""
+
+            if (name_results := results[index]) is None:
+                name_results = []
+                results[index] = name_results
+
+            name_results.append((success, data))
+
+        return results
+
+    def _offchain_lookup(
+        self,
+        ens: "Web3ENS",
+        calls: list["Call"],
+        results: list["Result"],
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> set[int]:
+        """
+        Handle the calls that reverted with an EIP-3668 ``OffchainLookup``: fetch their
+        gateway responses in parallel and then make all the callbacks in one multicall,
+        updating ``results`` in place. Look-ups that fail stay reverted.
+
+        Returns:
+            set[int]: The indices of the calls looked up offchain.
+        """
+        looked_up: set[int] = set()
+        pending: Iterable[int] = range(len(calls))
+        for _ in range(MAX_REDIRECTS):
+            lookups = {}
+            for index in pending:
+                success, data = results[index]
+                if success or (lookup := decode_offchain_lookup(data)) is None:
+                    continue
+
+                elif lookup.sender.lower() != calls[index][0].lower():
+                    # Only the contract called may ask for an offchain look-up.
+                    continue
+
+                lookups[index] = lookup
+
+            if not lookups:
+                break
+
+            looked_up.update(lookups)
+            responses = gateway_client.fetch_many(list(lookups.values()))
+            callbacks = {
+                index: (calls[index][0], lookup.encode_callback(response))
+                for (index, lookup), response in zip(lookups.items(), responses)
+                if response is not None
+            }
+            if not callbacks:
+                break
+
+            callback_results = self._aggregate(
+                ens, list(callbacks.values()), block_identifier=block_identifier
+            )
+            for index, result in zip(callbacks, callback_results):
+                results[index] = result
+
+            # A callback may ask for another look-up.
+            pending = list(callbacks)
+
+        return looked_up
+
+    @instrumented("name")
+    def name(
+        self,
+        address: "AddressType",
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> Optional[str]:
+        """
+        Reverse look-up an address to get the ENS name.
+
+        Args:
+            address (AddressType): The address to resolve.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            block_identifier (Optional[BlockIdentifier]): Look up at this block, rather
+              than the latest. Results at finalized blocks are cached forever.
+
+        Returns:
+            str | None: The ENS name.
+        """
+        if block_identifier is not None:
+            return self.name_many(
+                [address],
+                registry_address=registry_address,
+                use_cache=use_cache,
+                block_identifier=block_identifier,
+            )[address]
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        key = address.lower()
+        if use_cache:
+            block_number = self._cache_block_number(ens)
+            found, name = self._lookup_name(address, block_number)
+            if found:
+                return name
+
+            # Check persistent cache.
+            if name := self._read_disk_cache("name", ens, (key,)).get(key):
+                self._cache_name(address, name, block_number)
+                return name
+
+        # Concurrent look-ups of the same address share a single call.
+        def look_up_name() -> Optional[str]:
+            if not self._has_universal_resolver(ens):
+                return self._batch_name(ens, [address], registry_address, use_cache)[address]
+
+            return self._rpc(ens, "ens.name", lambda: ens.name(address))
+
+        name = self._single_flight.do(("name", ens.ens.address, key), look_up_name)
+        if use_cache:
+            self._cache_name(address, name, self._cache_block_number(ens))
+            if name:
+                self._write_disk_cache("name", ens, {key: name})
+
+        return name
+
+    @instrumented("name_many")
+    def name_many(
+        self,
+        addresses: Iterable["AddressType"],
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> dict["AddressType", Optional[str]]:
+        """
+        Reverse look-up many addresses at once. The reverse nodes are computed
+        locally, the resolvers and names are fetched using Multicall3, and then
+        the names are verified by resolving them forward in a batch as well.
+
+        Args:
+            addresses (Iterable[AddressType]): The addresses to look up.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            block_identifier (Optional[BlockIdentifier]): Look up at this block, rather
+              than the latest. Results at finalized blocks are cached forever.
+
+        Returns:
+            dict[AddressType, str | None]: Each address mapped to its ENS name.
+        """
+        if block_identifier is not None:
+
+            def look_up(ens, addresses, live):
+                return self._batch_name(
+                    ens,
+                    addresses,
+                    registry_address,
+                    use_cache,
+                    block_identifier=block_identifier,
+                    live=live,
+                )
+
+            return self._look_up_at_block(
+                "name", addresses, look_up, use_cache, registry_address, block_identifier
+            )
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        addresses = list(dict.fromkeys(addresses))
+        results: dict["AddressType", Optional[str]] = {a: None for a in addresses}
+        if use_cache:
+            block_number = self._cache_block_number(ens)
+            pending = []
+            for address in addresses:
+                found, results[address] = self._lookup_name(address, block_number)
+                if not found:
+                    pending.append(address)
+
+            # Check persistent cache.
+            cached = self._read_disk_cache("name", ens, (a.lower() for a in pending))
+            for address in pending:
+                if name := cached.get(address.lower()):
+                    results[address] = name
+                    self._cache_name(address, name, block_number)
+
+            addresses = [a for a in pending if results[a] is None]
+
+        if not addresses:
+            return results
+
+        looked_up = self._batch_name(ens, addresses, registry_address, use_cache)
+        results.update(looked_up)
+        if use_cache:
+            block_number = self._cache_block_number(ens)
+            for address, name in looked_up.items():
+                self._cache_name(address, name, block_number)
+
+            named = {a.lower(): name for a, name in looked_up.items() if name}
+            self._write_disk_cache("name", ens, named)
+
+        return results
+
+    def _batch_name(
+        self,
+        ens: "Web3ENS",
+        addresses: list["AddressType"],
+        registry_address: Optional["AddressType"],
+        use_cache: Optional[bool],
+        block_identifier: Optional["BlockIdentifier"] = None,
+        live: Optional[set[str]] = None,
+    ) -> dict["AddressType", Optional[str]]:
+        from web3.exceptions import ContractLogicError
+
+        reverse_names = [_reverse_domain(a) for a in addresses]
+        nodes = [bytes(self.namehash(n)) for n in reverse_names]
+        offchain: set[str] = set()
+        try:
+            name_results = self._batch_resolver_call(
+                ens,
+                reverse_names,
+                nodes,
+                NAME_SELECTOR,
+                block_identifier=block_identifier,
+                offchain=offchain,
+            )
+        except (ContractLogicError, DecodingError):
+            if block_identifier is not None:
+                # web3 only looks up at the latest block.
+                if live is not None:
+                    live.update(addresses)
+
+                return dict.fromkeys(addresses)
+
+            # Multicall3 is likely not deployed on this chain; look-up one-by-one.
+            return {
+                address: self._rpc(ens, "ens.name", lambda: ens.name(address))
+                for address in addresses
+            }
+
+        if live is not None:
+            # Offchain names are not read from the block.
+            live.update(a for a, n in zip(addresses, reverse_names) if n in offchain)
+
+        results: dict["AddressType", Optional[str]] = {a: None for a in addresses}
+        claimed: dict["AddressType", str] = {}
+        for address, result in zip(addresses, name_results):
+            if result is None:
+                # No reverse record.
+                continue
+
+            elif not result[0]:
+                # Reverted (e.g. a failed offchain lookup). The single look-up handles
+                # these, but only at the latest block.
+                if block_identifier is None and self._has_universal_resolver(ens):
+                    results[address] = self._rpc(ens, "ens.name", lambda: ens.name(address))
+
+                if live is not None:
+                    live.add(address)
+
+            elif (name := decode_string(result[1])) and self.is_valid_name(name):
+                claimed[address] = name
+
+        # To be absolutely certain of the name, via reverse resolution,
+        # the address must match in the forward resolution.
+        forward = self.resolve_many(
+            set(claimed.values()),
+            use_cache=use_cache,
+            registry_address=registry_address,
+            block_identifier=block_identifier,
         )
-        return ens.owner(name)
+        for address, name in claimed.items():
+            if (resolved := forward.get(name)) and resolved.lower() == address.lower():
+                results[address] = name
+
+        return results
+
+    @instrumented("owner")
+    def owner(
+        self,
+        name: str,
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+        block_identifier: Optional["BlockIdentifier"] = None,
+    ) -> Optional["AddressType"]:
+        """
+        Get the owner of an ENS domain.
+
+        Args:
+            name (str): The ENS name to check.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            block_identifier (Optional[BlockIdentifier]): Look up at this block, rather
+              than the latest. Results at finalized blocks are cached forever.
+
+        Returns:
+            AddressType | None
+        """
+        if block_identifier is not None:
+
+            def look_up(ens, names, live):
+                return self._batch_owner(ens, names, block_identifier)
+
+            return self._look_up_at_block(
+                "owner", [name], look_up, use_cache, registry_address, block_identifier
+            )[name]
+
+        ens = self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        if use_cache:
+            block_number = self._cache_block_number(ens)
+            if owner := self.owner_cache.lookup(name, block_number=block_number)[1]:
+                return owner
+
+            # Check persistent cache.
+            if owner := self._read_disk_cache("owner", ens, (name,)).get(name):
+                self.owner_cache.set(name, owner, block_number=block_number)
+                return owner
+
+        # Concurrent look-ups of the same name share a single call.
+        def look_up_owner() -> Optional["AddressType"]:
+            return self._rpc(ens, "ens.owner", lambda: ens.owner(name))
+
+        owner = self._single_flight.do(("owner", ens.ens.address, name), look_up_owner)
+        if use_cache and owner and int(owner, 16):
+            self.owner_cache.set(name, owner, block_number=self._cache_block_number(ens))
+            self._write_disk_cache("owner", ens, {name: owner})
+
+        return owner
+
+    def _batch_owner(
+        self, ens: "Web3ENS", names: list[str], block_identifier: "BlockIdentifier"
+    ) -> dict[str, "AddressType"]:
+        registry = ens.ens.address
+        calls: list["Call"] = [
+            (registry, encode_node_call(OWNER_SELECTOR, bytes(self.namehash(name))))
+            for name in names
+        ]
+        results = self._aggregate(ens, calls, block_identifier=block_identifier)
+        return {
+            name: to_checksum_address(decode_address(data) if success and data else ZERO_ADDRESS)
+            for name, (success, data) in zip(names, results)
+        }
+
+    @instrumented("records")
+    def records(
+        self,
+        name: str,
+        coin_types: Iterable[int] = (ETH_COIN_TYPE,),
+        text_keys: Iterable[str] = (),
+        contenthash: bool = True,
+        use_cache: Optional[bool] = None,
+        registry_address: Optional["AddressType"] = None,
+    ) -> ENSRecords:
+        """
+        Get the records of an ENS name: its addresses for other coins and
+        chains (ENSIP-9 and ENSIP-11), its content hash, and text records.
+        All the records are fetched from the resolver in a single multicall.
+
+        Args:
+            name (str): The ENS name.
+            coin_types (Iterable[int]): The coin types of the addresses to get.
+              Defaults to ETH (``60``). For EVM chains, use ``0x80000000 | chain_id``.
+            text_keys (Iterable[str]): The text records to get, such as ``"avatar"``.
+            contenthash (bool): Set to ``False`` to not get the content hash.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+
+        Returns:
+            :class:`~ape_ens.ens.ENSRecords`
+        """
+        return self.records_many(
+            [name],
+            coin_types=coin_types,
+            text_keys=text_keys,
+            contenthash=contenthash,
+            use_cache=use_cache,
+            registry_address=registry_address,
+        )[name]
+
+    @instrumented("records_many")
+    def records_many(
+        self,
+        names: Iterable[str],
+        coin_types: Iterable[int] = (ETH_COIN_TYPE,),
+        text_keys: Iterable[str] = (),
+        contenthash: bool = True,
+        use_cache: Optional[bool] = None,
+        registry_address: Optional["AddressType"] = None,
+    ) -> dict[str, ENSRecords]:
+        """
+        Get the records of many ENS names at once (see :meth:`~ape_ens.ens.ENS.records`).
+        The resolvers of all the names are found together, and then all the
+        records are fetched using Multicall3.
+
+        Args:
+            names (Iterable[str]): The ENS names.
+            coin_types (Iterable[int]): The coin types of the addresses to get.
+              Defaults to ETH (``60``).
+            text_keys (Iterable[str]): The text records to get.
+            contenthash (bool): Set to ``False`` to not get the content hashes.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+
+        Returns:
+            dict[str, :class:`~ape_ens.ens.ENSRecords`]: Each name mapped to its records.
+        """
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
+
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        coin_types = tuple(dict.fromkeys(coin_types))
+        text_keys = tuple(dict.fromkeys(text_keys))
+        record_names = [
+            *(f"addr/{coin_type}" for coin_type in coin_types),
+            *(["contenthash"] if contenthash else []),
+            *(f"text/{key}" for key in text_keys),
+        ]
+        names = list(dict.fromkeys(names))
+        ens = self._get_web3_ens(registry_address=registry_address)
+        values: dict[str, dict[str, Optional[str]]] = {name: {} for name in names}
+        if use_cache:
+            pending = self._read_record_cache(ens, values, record_names)
+        else:
+            pending = {name: list(record_names) for name in names}
+
+        if pending:
+            try:
+                looked_up = self._batch_records(ens, pending)
+            except (Web3RPCError, BadFunctionCallOutput) as err:
+                raise MissingRegistryError(str(err))
+
+            for name, items in looked_up.items():
+                values[name].update(items)
+
+            if use_cache:
+                self._cache_records(ens, looked_up)
+
+        return {
+            name: ENSRecords(
+                addresses={c: items.get(f"addr/{c}") for c in coin_types},
+                contenthash=items.get("contenthash"),
+                texts={key: items.get(f"text/{key}") for key in text_keys},
+            )
+            for name, items in values.items()
+        }
+
+    def _read_record_cache(
+        self,
+        ens: "Web3ENS",
+        values: dict[str, dict[str, Optional[str]]],
+        record_names: list[str],
+    ) -> dict[str, list[str]]:
+        # Fill in ``values`` from the caches and return the records still needed.
+        block_number = self._cache_block_number(ens)
+        missing: dict[str, str] = {}
+        for name, items in values.items():
+            for record in record_names:
+                key = _record_key(name, record)
+                found, value = self.record_cache.lookup(key, block_number=block_number)
+                if found:
+                    items[record] = value
+                else:
+                    missing[key] = name
+
+        for key, value in self._read_disk_cache("record", ens, missing).items():
+            self.record_cache.set(key, value, block_number=block_number)
+            values[missing.pop(key)][key.rpartition("@")[0]] = value
+
+        pending: dict[str, list[str]] = {}
+        for key, name in missing.items():
+            pending.setdefault(name, []).append(key.rpartition("@")[0])
+
+        return pending
+
+    def _cache_records(self, ens: "Web3ENS", records: dict[str, dict[str, Optional[str]]]) -> None:
+        block_number = self._cache_block_number(ens)
+        found: dict[str, str] = {}
+        for name, items in records.items():
+            for record, value in items.items():
+                key = _record_key(name, record)
+                self.record_cache.set(key, value, block_number=block_number)
+                if value is not None:
+                    found[key] = value
+
+        self._write_disk_cache("record", ens, found)
+
+    def _batch_records(
+        self, ens: "Web3ENS", pending: dict[str, list[str]]
+    ) -> dict[str, dict[str, Optional[str]]]:
+        from web3.exceptions import ContractLogicError
+
+        names = list(pending)
+        nodes = [bytes(self.namehash(name)) for name in names]
+        calldata = [
+            [_encode_record_call(node, record) for record in pending[name]]
+            for name, node in zip(names, nodes)
+        ]
+        try:
+            resolvers = self._find_resolvers(ens, names, nodes, wildcard=True)
+            results = self._multicall_resolvers(ens, names, resolvers, calldata)
+        except (ContractLogicError, DecodingError):
+            # Multicall3 is likely not deployed on this chain; look-up one-by-one.
+            return {
+                name: {record: self._look_up_record(ens, name, record) for record in records}
+                for name, records in pending.items()
+            }
+
+        looked_up: dict[str, dict[str, Optional[str]]] = {}
+        for name, name_results in zip(names, results):
+            records = pending[name]
+            if name_results is None:
+                # Neither the name nor its parents have a resolver.
+                looked_up[name] = dict.fromkeys(records)
+                continue
+
+            looked_up[name] = {
+                record: (
+                    _decode_record(record, data)
+                    if success
+                    # Reverted, such as for a failed offchain (CCIP-Read) look-up
+                    # or a resolver without the record type.
+                    else self._look_up_record(ens, name, record)
+                )
+                for record, (success, data) in zip(records, name_results)
+            }
+
+        return looked_up
+
+    def _look_up_record(self, ens: "Web3ENS", name: str, record: str) -> Optional[str]:
+        # A single look-up using web3, for records the multicall could not read.
+        if not self._has_universal_resolver(ens):
+            return None
+
+        kind, _, arg = record.partition("/")
+        try:
+            if kind == "addr" and _is_evm_coin_type(coin_type := int(arg)):
+                if coin_type == ETH_COIN_TYPE:
+                    return self._rpc(ens, "ens.address", lambda: ens.address(name))
+
+                return self._rpc(ens, "ens.address", lambda: ens.address(name, coin_type=coin_type))
+
+            elif kind == "text":
+                return self._rpc(ens, "ens.get_text", lambda: ens.get_text(name, arg)) or None
+
+        except ValueError:
+            # E.g. the resolver does not support the record.
+            pass
+
+        return None
 
     def namehash(self, name: str) -> "HexBytes":
         """
@@ -254,3 +1814,382 @@ class ENS(ManagerAccessMixin):
             HexBytes
         """
         return namehash(name)
+
+
+class AsyncENS(ManagerAccessMixin):
+    """
+    An asyncio counterpart to :class:`~ape_ens.ens.ENS`, built on web3's
+    ``AsyncENS``, so look-ups do not block the event loop. It shares the
+    config and caches of an :class:`~ape_ens.ens.ENS` instance.
+
+    Args:
+        ens (Optional[:class:`~ape_ens.ens.ENS`]): The instance to share the
+          caches and mainnet provider of. Defaults to a new one.
+        backend (Optional[Web3AsyncENS]): Optionally, the web3 ``AsyncENS`` to use.
+    """
+
+    def __init__(self, ens: Optional[ENS] = None, backend: Optional["Web3AsyncENS"] = None) -> None:
+        self.ens = ens or ENS()
+        self.__initialized_ens = backend
+        self._async_web3: Optional["AsyncWeb3"] = None
+        self._default_web3_ens: Optional["Web3AsyncENS"] = None
+        self._provider_name: Optional[str] = None
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.ens.config
+
+    async def _get_async_web3(self) -> "AsyncWeb3":
+        if (web3 := self._async_web3) is None:
+            # Finding the mainnet provider may connect to it, which would block the loop.
+            web3 = await asyncio.to_thread(self._create_async_web3)
+            self._async_web3 = web3
+
+        return web3
+
+    def _create_async_web3(self) -> "AsyncWeb3":
+        from web3 import AsyncHTTPProvider, AsyncWeb3
+
+        provider = self.ens._mainnet_provider
+        uri = getattr(provider, "http_uri", None) or getattr(provider, "uri", None)
+        if not isinstance(uri, str) or not uri.startswith(("http://", "https://")):
+            # Such as an IPC, WebSocket-only, or in-process (testing?) provider.
+            raise ProviderError(
+                f"AsyncENS needs an HTTP RPC URI, but the mainnet provider "
+                f"'{provider.name}' has none. Use ENS instead, or pass a web3 AsyncENS "
+                "as the `backend`."
+            )
+
+        # Shares the rate limit of the provider's sync calls.
+        self._provider_name = provider.name
+        return AsyncWeb3(AsyncHTTPProvider(uri))
+
+    async def _create_web3_ens(
+        self, registry_address: Optional["AddressType"] = None
+    ) -> "Web3AsyncENS":
+        from web3.main import AsyncENS as Web3AsyncENS
+
+        # NOTE: When neither are set, uses the default (mainnet) registry.
+        address = registry_address or self.config.registry_address
+        return Web3AsyncENS.from_web3(await self._get_async_web3(), address)
+
+    async def _get_web3_ens(
+        self, registry_address: Optional["AddressType"] = None
+    ) -> "Web3AsyncENS":
+        if registry_address:
+            return await self._create_web3_ens(registry_address=registry_address)
+
+        elif ens := self.__initialized_ens:
+            # Initialized with ENS (testing?)
+            return ens
+
+        elif (ens := self._default_web3_ens) is None:
+            ens = await self._create_web3_ens()
+            self._default_web3_ens = ens
+
+        return ens
+
+    async def _get_block_number(self, ens: "Web3AsyncENS") -> int:
+        # Shares the recent block number with the sync ENS instance.
+        now = time.monotonic()
+        if (cached := self.ens._block_number) is not None and now - cached[1] < BLOCK_TIME:
+            return cached[0]
+
+        number = await self._rpc(ens, "eth_blockNumber", lambda: ens.w3.eth.block_number)
+        self.ens._block_number = (number, now)
+        return number
+
+    async def _cache_block_number(self, ens: "Web3AsyncENS") -> Optional[int]:
+        # Only needed when expiring cached results by block height.
+        if self.config.cache_max_block_age is None:
+            return None
+
+        return await self._get_block_number(ens)
+
+    async def _rpc(self, ens: "Web3AsyncENS", method: str, fn: Callable[[], Awaitable[T]]) -> T:
+        # Waits for the same rate limit as the sync calls (see :mod:`ape_ens.scheduler`).
+        scheduler = get_scheduler(self._provider_name)
+        return await scheduler.run_async(method, fn, web3=ens.w3)
+
+    async def _resolve_address(self, ens: "Web3AsyncENS", name: str) -> Optional["AddressType"]:
+        from web3.exceptions import ContractLogicError
+
+        # When the sync look-ups found the name's resolver, call it directly.
+        node = bytes(self.namehash(name))
+        key = f"{ens.ens.address}:{node.hex()}"
+        resolver_cache = self.ens.resolver_cache
+        resolver = None
+        if key in resolver_cache:
+            block_number = None
+            if self.config.resolver_cache_max_block_age is not None:
+                block_number = await self._get_block_number(ens)
+
+            resolver = resolver_cache.lookup(key, block_number=block_number)[1]
+
+        if resolver:
+            tx = {"to": resolver, "data": encode_node_call(ADDR_SELECTOR, node)}
+            try:
+                data = await self._rpc(
+                    ens, "eth_call", lambda: ens.w3.eth.call(tx, ccip_read_enabled=False)
+                )
+            except (ContractLogicError, DecodingError):
+                # Such as an offchain (CCIP-Read) look-up, which web3 handles.
+                pass
+            else:
+                if len(data) >= 32:
+                    address = decode_address(data)
+                    return to_checksum_address(address) if int(address, 16) else None
+
+        return await self._rpc(ens, "ens.address", lambda: ens.address(name))
+
+    async def _read_disk_cache(
+        self, kind: str, ens: "Web3AsyncENS", keys: Iterable[str]
+    ) -> dict[str, str]:
+        if (disk_cache := self.ens._disk_cache) is None:
+            return {}
+
+        # SQLite blocks, so read in a thread rather than on the event loop.
+        records = await asyncio.to_thread(disk_cache.get_many, kind, ens.ens.address, keys)
+        return self.ens._fresh_values(records, await self._cache_block_number(ens))
+
+    async def _write_disk_cache(
+        self, kind: str, ens: "Web3AsyncENS", items: dict[str, str]
+    ) -> None:
+        if not items or (disk_cache := self.ens._disk_cache) is None:
+            return
+
+        block_number = await self._get_block_number(ens)
+        await asyncio.to_thread(
+            disk_cache.set_many, kind, ens.ens.address, items, block_number=block_number
+        )
+
+    async def _gather(
+        self, fn: Callable[[str], Awaitable[Any]], keys: Iterable[str], concurrency: Optional[int]
+    ) -> dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        semaphore = asyncio.Semaphore(concurrency or self.config.async_concurrency)
+
+        async def run(key: str) -> Any:
+            async with semaphore:
+                return await fn(key)
+
+        values = await asyncio.gather(*(run(key) for key in keys))
+        return dict(zip(keys, values))
+
+    @instrumented("resolve")
+    async def resolve(
+        self,
+        name: str,
+        use_cache: Optional[bool] = None,
+        registry_address: Optional["AddressType"] = None,
+    ) -> Optional["AddressType"]:
+        """
+        Resolve an ENS name.
+
+        Args:
+            name (str): The name to resolve.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+
+        Returns:
+            AddressType | None
+        """
+        from web3.exceptions import BadFunctionCallOutput, Web3RPCError
+
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        if use_cache and self.config.snapshot_path is not None:
+            # Check the offline snapshot (a file read, so not on the event loop).
+            found, address = await asyncio.to_thread(
+                self.ens._lookup_snapshot, name, registry_address=registry_address
+            )
+            if found:
+                return address
+
+        ens = await self._get_web3_ens(registry_address=registry_address)
+        local_registry = self.ens.local_registry
+        if use_cache:
+            block_number = await self._cache_block_number(ens)
+            found, address = local_registry.lookup(name, block_number=block_number)
+            if address:
+                return address
+
+            # Check config cache.
+            if address := self.config.registry.get(name):
+                local_registry.set(name, address, block_number=block_number)
+                return address
+
+            if found:
+                # Cached negative result.
+                return None
+
+            # Check persistent cache.
+            if address := (await self._read_disk_cache("address", ens, (name,))).get(name):
+                local_registry.set(name, address, block_number=block_number)
+                return address
+
+        try:
+            address = await self._resolve_address(ens, name)
+        except (Web3RPCError, BadFunctionCallOutput) as err:
+            raise MissingRegistryError(str(err))
+
+        if use_cache:
+            local_registry.set(name, address, block_number=await self._cache_block_number(ens))
+            if address is not None:
+                await self._write_disk_cache("address", ens, {name: address})
+
+        return address
+
+    @instrumented("resolve_many")
+    async def resolve_many(
+        self,
+        names: Iterable[str],
+        use_cache: Optional[bool] = None,
+        registry_address: Optional["AddressType"] = None,
+        concurrency: Optional[int] = None,
+    ) -> dict[str, Optional["AddressType"]]:
+        """
+        Resolve many ENS names concurrently.
+
+        Args:
+            names (Iterable[str]): The names to resolve.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            registry_address (Optional[AddressType]): Optionally, change the registry
+              address.
+            concurrency (Optional[int]): The max number of look-ups in flight at once.
+              Defaults to the ``async_concurrency`` config.
+
+        Returns:
+            dict[str, AddressType | None]: Each name mapped to its address.
+        """
+
+        async def resolve(name: str) -> Optional["AddressType"]:
+            return await self.resolve(name, use_cache=use_cache, registry_address=registry_address)
+
+        return await self._gather(resolve, names, concurrency)
+
+    @instrumented("name")
+    async def name(
+        self,
+        address: "AddressType",
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+    ) -> Optional[str]:
+        """
+        Reverse look-up an address to get the ENS name.
+
+        Args:
+            address (AddressType): The address to resolve.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+
+        Returns:
+            str | None: The ENS name.
+        """
+        ens = await self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        key = address.lower()
+        if use_cache:
+            block_number = await self._cache_block_number(ens)
+            found, name = self.ens._lookup_name(address, block_number)
+            if found:
+                return name
+
+            # Check persistent cache.
+            if name := (await self._read_disk_cache("name", ens, (key,))).get(key):
+                self.ens._cache_name(address, name, block_number)
+                return name
+
+        name = await self._rpc(ens, "ens.name", lambda: ens.name(address))
+        if use_cache:
+            self.ens._cache_name(address, name, await self._cache_block_number(ens))
+            if name:
+                await self._write_disk_cache("name", ens, {key: name})
+
+        return name
+
+    @instrumented("name_many")
+    async def name_many(
+        self,
+        addresses: Iterable["AddressType"],
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+        concurrency: Optional[int] = None,
+    ) -> dict["AddressType", Optional[str]]:
+        """
+        Reverse look-up many addresses concurrently.
+
+        Args:
+            addresses (Iterable[AddressType]): The addresses to look up.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+            concurrency (Optional[int]): The max number of look-ups in flight at once.
+              Defaults to the ``async_concurrency`` config.
+
+        Returns:
+            dict[AddressType, str | None]: Each address mapped to its ENS name.
+        """
+
+        async def name(address: "AddressType") -> Optional[str]:
+            return await self.name(address, registry_address=registry_address, use_cache=use_cache)
+
+        return await self._gather(name, addresses, concurrency)
+
+    @instrumented("owner")
+    async def owner(
+        self,
+        name: str,
+        registry_address: Optional["AddressType"] = None,
+        use_cache: Optional[bool] = None,
+    ) -> Optional["AddressType"]:
+        """
+        Get the owner of an ENS domain.
+
+        Args:
+            name (str): The ENS name to check.
+            registry_address (Optional[AddressType]): Optionally, change the registry.
+            use_cache (bool): Set to ``False`` to not use the cache.
+
+        Returns:
+            AddressType | None
+        """
+        ens = await self._get_web3_ens(registry_address=registry_address)
+        if use_cache is None:
+            # Use default from config.
+            use_cache = self.config.use_cache
+
+        owner_cache = self.ens.owner_cache
+        if use_cache:
+            block_number = await self._cache_block_number(ens)
+            if owner := owner_cache.lookup(name, block_number=block_number)[1]:
+                return owner
+
+            # Check persistent cache.
+            if owner := (await self._read_disk_cache("owner", ens, (name,))).get(name):
+                owner_cache.set(name, owner, block_number=block_number)
+                return owner
+
+        owner = await self._rpc(ens, "ens.owner", lambda: ens.owner(name))
+        if use_cache and owner and int(owner, 16):
+            owner_cache.set(name, owner, block_number=await self._cache_block_number(ens))
+            await self._write_disk_cache("owner", ens, {name: owner})
+
+        return owner
+
+    def namehash(self, name: str) -> "HexBytes":
+        """
+        Get the namehash of an ENS name. No network connection is required.
+
+        Args:
+            name (str): The ENS name to check.
+
+        Returns:
+            HexBytes
+        """
+        return namehash(name)
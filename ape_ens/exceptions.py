@@ -11,3 +11,15 @@ class MissingRegistryError(ApeENSException):
     """
     Raised when ape-ens detect the registry is missing.
     """
+
+
+class GatewayError(ApeENSException):
+    """
+    Raised when no CCIP-Read gateway of an offchain look-up returned a response.
+    """
+
+
+class RateLimitError(ApeENSException):
+    """
+    Raised when the provider still rate-limits ENS calls after retrying.
+    """
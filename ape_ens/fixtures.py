@@ -0,0 +1,44 @@
+"""
+Pytest fixtures deploying ENS to the local test network (see :mod:`ape_ens.testing`).
+Add them to your tests using ``pytest_plugins = ["ape_ens.fixtures"]`` in your
+``conftest.py``.
+"""
+
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING
+
+import pytest
+from eth_utils import to_checksum_address
+
+from ape_ens.testing import LocalENS
+
+if TYPE_CHECKING:
+    from ape.types import AddressType
+
+
+@pytest.fixture
+def local_ens(accounts) -> Iterator[LocalENS]:
+    """
+    ENS deployed to the local test network by the first test account, and used
+    for all ENS look-ups in the test. Register names using
+    :meth:`~ape_ens.testing.LocalENS.register_many`.
+    """
+    with LocalENS.deploy(accounts[0]).use() as local_ens:
+        yield local_ens
+
+
+@pytest.fixture
+def local_ens_names(local_ens, request) -> Mapping[str, "AddressType"]:
+    """
+    Registers ``count`` names (``name0.eth``, ``name1.eth``, ...) resolving to
+    distinct addresses, with reverse records. Set ``count`` (default ``100``) using
+    ``@pytest.mark.parametrize("local_ens_names", [1000], indirect=True)``.
+    """
+    count: int = getattr(request, "param", 100)
+    names = {f"name{i}.eth": _address(i + 1) for i in range(count)}
+    local_ens.register_many(names, reverse=True)
+    return names
+
+
+def _address(index: int) -> "AddressType":
+    return to_checksum_address(index.to_bytes(20, "big"))  # type: ignore[return-value]
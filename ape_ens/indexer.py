@@ -0,0 +1,362 @@
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Optional
+
+from ape.logging import logger
+from ape.utils.basemodel import ManagerAccessMixin
+from eth_utils import event_signature_to_log_topic, keccak, to_hex
+
+from ape_ens.ens import BLOCK_TIME, ENS, _reverse_domain
+from ape_ens.utils.namehash import namehash
+
+if TYPE_CHECKING:
+    from web3.main import ENS as Web3ENS
+
+    from ape_ens.config import ENSConfig
+
+# Registry events.
+NEW_OWNER_TOPIC = event_signature_to_log_topic("NewOwner(bytes32,bytes32,address)")
+TRANSFER_TOPIC = event_signature_to_log_topic("Transfer(bytes32,address)")
+NEW_RESOLVER_TOPIC = event_signature_to_log_topic("NewResolver(bytes32,address)")
+
+# Resolver events.
+ADDR_CHANGED_TOPIC = event_signature_to_log_topic("AddrChanged(bytes32,address)")
+ADDRESS_CHANGED_TOPIC = event_signature_to_log_topic("AddressChanged(bytes32,uint256,bytes)")
+NAME_CHANGED_TOPIC = event_signature_to_log_topic("NameChanged(bytes32,string)")
+CONTENTHASH_CHANGED_TOPIC = event_signature_to_log_topic("ContenthashChanged(bytes32,bytes)")
+TEXT_CHANGED_TOPIC = event_signature_to_log_topic("TextChanged(bytes32,string,string)")
+# Newer public resolvers also log the value.
+TEXT_VALUE_CHANGED_TOPIC = event_signature_to_log_topic("TextChanged(bytes32,string,string,string)")
+# Logged by ``clearRecords``, which removes all the records of a node.
+VERSION_CHANGED_TOPIC = event_signature_to_log_topic("VersionChanged(bytes32,uint64)")
+
+# The persistent cache key the last indexed block is saved under.
+CHECKPOINT_KIND = "checkpoint"
+CHECKPOINT_KEY = "indexer"
+
+
+class _ChangedNodes:
+    def __init__(self) -> None:
+        self.addresses: set[bytes] = set()
+        self.names: set[bytes] = set()
+        self.owners: set[bytes] = set()
+        self.records: set[bytes] = set()
+        self.resolvers: set[bytes] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.addresses or self.names or self.owners or self.records or self.resolvers)
+
+    def add(self, log) -> None:
+        topics = [bytes(t) for t in log["topics"]]
+        if len(topics) < 2:
+            return
+
+        topic, node = topics[0], topics[1]
+        if topic == NEW_OWNER_TOPIC and len(topics) > 2:
+            # A subnode (``node`` + ``label``) changed owner.
+            self.owners.add(keccak(node + topics[2]))
+        elif topic == TRANSFER_TOPIC:
+            self.owners.add(node)
+        elif topic == NEW_RESOLVER_TOPIC:
+            self.resolvers.add(node)
+        elif topic in (ADDR_CHANGED_TOPIC, ADDRESS_CHANGED_TOPIC):
+            self.addresses.add(node)
+        elif topic == NAME_CHANGED_TOPIC:
+            self.names.add(node)
+        elif topic in (CONTENTHASH_CHANGED_TOPIC, TEXT_CHANGED_TOPIC, TEXT_VALUE_CHANGED_TOPIC):
+            self.records.add(node)
+        elif topic == VERSION_CHANGED_TOPIC:
+            self.addresses.add(node)
+            self.names.add(node)
+            self.records.add(node)
+
+
+class _CacheIndex:
+    """
+    Maps nodes to the cache keys derived from them, built once per sync.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        owner_names: Iterable[str],
+        addresses: Iterable[str],
+        record_keys: Iterable[str] = (),
+    ):
+        self.names, self.subnames = self._index_names({name: name for name in names})
+        # Record keys are ``<record>@<name>``.
+        self.records, self.record_subnames = self._index_names(
+            {key: key.rpartition("@")[-1] for key in record_keys}
+        )
+
+        self.owner_names: dict[bytes, set[str]] = defaultdict(set)
+        for name in owner_names:
+            self.owner_names[bytes(namehash(name))].add(name)
+
+        self.addresses: dict[bytes, set[str]] = defaultdict(set)
+        for address in addresses:
+            self.addresses[bytes(namehash(_reverse_domain(address)))].add(address)
+
+    @staticmethod
+    def _index_names(
+        keys: dict[str, str],
+    ) -> tuple[dict[bytes, set[str]], dict[bytes, set[str]]]:
+        # Index keys by the nodes of their names, and by the nodes of the parents of
+        # their names, as a new resolver on a parent changes the wildcard resolution
+        # of its subnames.
+        by_node: dict[bytes, set[str]] = defaultdict(set)
+        by_parent_node: dict[bytes, set[str]] = defaultdict(set)
+        for key, name in keys.items():
+            by_node[bytes(namehash(name))].add(key)
+            labels = name.split(".")
+            for index in range(1, len(labels)):
+                by_parent_node[bytes(namehash(".".join(labels[index:])))].add(key)
+
+        return by_node, by_parent_node
+
+    @staticmethod
+    def _find(index: dict[bytes, set[str]], nodes: Iterable[bytes]) -> set[str]:
+        return {key for node in nodes for key in index.get(node, ())}
+
+    def changed_names(self, changes: _ChangedNodes) -> set[str]:
+        nodes = changes.addresses | changes.resolvers
+        return self._find(self.names, nodes) | self._find(self.subnames, changes.resolvers)
+
+    def changed_record_keys(self, changes: _ChangedNodes) -> set[str]:
+        nodes = changes.addresses | changes.records | changes.resolvers
+        return self._find(self.records, nodes) | self._find(self.record_subnames, changes.resolvers)
+
+    def changed_owner_names(self, changes: _ChangedNodes) -> set[str]:
+        return self._find(self.owner_names, changes.owners)
+
+    def changed_addresses(self, changes: _ChangedNodes) -> set[str]:
+        return self._find(self.addresses, changes.names | changes.resolvers)
+
+
+class ENSIndexer(ManagerAccessMixin):
+    """
+    Keeps the caches of an :class:`~ape_ens.ens.ENS` fresh by following the event
+    logs of the registry (``NewOwner``, ``Transfer``, ``NewResolver``) and of
+    resolvers (``AddrChanged``, ``AddressChanged``, ``NameChanged``, ``TextChanged``,
+    ``ContenthashChanged``, and ``VersionChanged``, which clears all the records of
+    a name). Only the cached entries affected by a log are removed, so long-lived
+    caches stay correct without expiring everything on a timer.
+
+    Logs are read in chunks of blocks. The last indexed block is saved in the
+    persistent cache (when enabled), so indexing resumes where it left off.
+
+    Args:
+        ens (Optional[:class:`~ape_ens.ens.ENS`]): The ENS whose caches to keep fresh.
+        chunk_size (Optional[int]): The number of blocks to read logs for at once.
+          Defaults to the ``indexer_chunk_size`` config.
+        start_block (Optional[int]): The block to start indexing at, when there is
+          no saved checkpoint. Defaults to the block of the oldest persisted cache
+          record, or else the latest block.
+    """
+
+    def __init__(
+        self,
+        ens: Optional[ENS] = None,
+        chunk_size: Optional[int] = None,
+        start_block: Optional[int] = None,
+    ) -> None:
+        self.ens = ens or ENS()
+        self.chunk_size = chunk_size
+        self.start_block = start_block
+        self._last_block: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.ens.config
+
+    @property
+    def _web3_ens(self) -> "Web3ENS":
+        return self.ens._web3_ens
+
+    @property
+    def last_block(self) -> Optional[int]:
+        """
+        The last block indexed, if any.
+        """
+        if self._last_block is not None:
+            return self._last_block
+
+        elif (disk_cache := self.ens._disk_cache) is not None and (
+            record := disk_cache.get(CHECKPOINT_KIND, self._web3_ens.ens.address, CHECKPOINT_KEY)
+        ):
+            self._last_block = int(record.value)
+
+        return self._last_block
+
+    def _save_checkpoint(self, block_number: int) -> None:
+        self._last_block = block_number
+        if (disk_cache := self.ens._disk_cache) is not None:
+            registry = self._web3_ens.ens.address
+            disk_cache.set(CHECKPOINT_KIND, registry, CHECKPOINT_KEY, str(block_number))
+
+    def _first_block(self, latest: int) -> int:
+        if (last_block := self.last_block) is not None:
+            return last_block + 1
+
+        elif self.start_block is not None:
+            return self.start_block
+
+        elif (disk_cache := self.ens._disk_cache) is not None and (
+            oldest := disk_cache.oldest_block_number(self._web3_ens.ens.address)
+        ) is not None:
+            # Catch up on changes since the oldest persisted result.
+            return oldest + 1
+
+        # Results cached from now on are fresh.
+        return latest + 1
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """
+        Index the logs from the last indexed block up to ``to_block``,
+        removing the cache entries they affect.
+
+        Args:
+            to_block (Optional[int]): The last block to index. Defaults to the latest block.
+
+        Returns:
+            int: The number of cache entries removed.
+        """
+        with self._lock:
+            ens = self._web3_ens
+            if to_block is None:
+                to_block = ens.w3.eth.block_number
+
+            chunk_size = max(self.chunk_size or self.config.indexer_chunk_size, 1)
+            start = self._first_block(to_block)
+            if self.last_block is None:
+                # Start from here next time, even when there is nothing to index yet.
+                self._save_checkpoint(start - 1)
+
+            index: Optional[_CacheIndex] = None
+            removed = 0
+            while start <= to_block:
+                end = min(start + chunk_size - 1, to_block)
+                changes = _ChangedNodes()
+                for log in self._get_logs(ens, start, end):
+                    changes.add(log)
+
+                if changes:
+                    if index is None:
+                        # Entries cached after this are at least as new as the logs.
+                        index = self._build_index(ens)
+
+                    removed += self._invalidate(ens, index, changes)
+
+                self._save_checkpoint(end)
+                start = end + 1
+
+            return removed
+
+    def _get_logs(self, ens: "Web3ENS", start: int, end: int) -> list:
+        blocks = {"fromBlock": start, "toBlock": end}
+        registry_topics = [to_hex(t) for t in (NEW_OWNER_TOPIC, TRANSFER_TOPIC, NEW_RESOLVER_TOPIC)]
+        resolver_topics = [
+            to_hex(t)
+            for t in (
+                ADDR_CHANGED_TOPIC,
+                ADDRESS_CHANGED_TOPIC,
+                NAME_CHANGED_TOPIC,
+                CONTENTHASH_CHANGED_TOPIC,
+                TEXT_CHANGED_TOPIC,
+                TEXT_VALUE_CHANGED_TOPIC,
+                VERSION_CHANGED_TOPIC,
+            )
+        ]
+        registry_logs = ens.w3.eth.get_logs(
+            {**blocks, "address": ens.ens.address, "topics": [registry_topics]}  # type: ignore
+        )
+        # Any contract may be a resolver. Logs are only used to remove entries,
+        # so logs from other contracts cannot make the cache wrong.
+        resolver_logs = ens.w3.eth.get_logs(
+            {**blocks, "topics": [resolver_topics]}  # type: ignore[typeddict-item]
+        )
+        return [*registry_logs, *resolver_logs]
+
+    def _build_index(self, ens: "Web3ENS") -> _CacheIndex:
+        names = set(self.ens.local_registry.all_keys())
+        record_keys = set(self.ens.record_cache.all_keys())
+        owner_names = set(self.ens.owner_cache.all_keys())
+        addresses = set(self.ens.name_cache.all_keys())
+        if (disk_cache := self.ens._disk_cache) is not None:
+            registry = ens.ens.address
+            names.update(disk_cache.keys("address", registry))
+            record_keys.update(disk_cache.keys("record", registry))
+            owner_names.update(disk_cache.keys("owner", registry))
+            addresses.update(disk_cache.keys("name", registry))
+
+        return _CacheIndex(names, owner_names, addresses, record_keys=record_keys)
+
+    def _invalidate(self, ens: "Web3ENS", index: _CacheIndex, changes: _ChangedNodes) -> int:
+        registry = ens.ens.address
+        names = index.changed_names(changes)
+        record_keys = index.changed_record_keys(changes)
+        owner_names = index.changed_owner_names(changes)
+        # Reverse look-ups are only valid while their names resolve back to them.
+        addresses = index.changed_addresses(changes)
+        addresses.update(a for name in names for a in self.ens.name_cache.keys_for(name))
+        removed = self.ens.local_registry.invalidate(names)
+        removed += self.ens.name_cache.invalidate(addresses)
+        removed += self.ens.owner_cache.invalidate(owner_names)
+        removed += self.ens.record_cache.invalidate(record_keys)
+        removed += self.ens.resolver_cache.invalidate(
+            f"{registry}:{node.hex()}" for node in changes.resolvers
+        )
+        if (disk_cache := self.ens._disk_cache) is not None:
+            removed += disk_cache.delete_many("address", registry, names)
+            removed += disk_cache.delete_many("record", registry, record_keys)
+            removed += disk_cache.delete_many("owner", registry, owner_names)
+            removed += disk_cache.delete_many("name", registry, addresses)
+
+        if removed:
+            logger.debug(f"Removed {removed} stale ENS cache entries.")
+
+        return removed
+
+    def run(self, poll_interval: float = BLOCK_TIME) -> None:
+        """
+        Index new blocks until :meth:`~ape_ens.indexer.ENSIndexer.stop` is called.
+
+        Args:
+            poll_interval (float): Seconds to wait between syncs.
+        """
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as err:
+                logger.error(f"ENS indexer failed to sync: {err}")
+
+            self._stop.wait(poll_interval)
+
+    def start(self, poll_interval: float = BLOCK_TIME) -> None:
+        """
+        Index new blocks in a background thread.
+
+        Args:
+            poll_interval (float): Seconds to wait between syncs.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, args=(poll_interval,), name="ens-indexer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop indexing, after the current sync finishes.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
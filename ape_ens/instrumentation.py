@@ -0,0 +1,572 @@
+import atexit
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds (in seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class Instrumentation:
+    """
+    A hook for metrics and tracing of ENS look-ups. Subclass it, override the
+    methods you need, and add it using :func:`~ape_ens.instrumentation.add_instrumentation`.
+    Every method is a no-op by default. Hooks are called synchronously, so they
+    should be fast and must not raise.
+    """
+
+    def start_lookup(self, method: str) -> Any:
+        """
+        Called when a look-up (e.g. ``ENS.resolve``) starts.
+
+        Args:
+            method (str): The name of the :class:`~ape_ens.ens.ENS` method.
+
+        Returns:
+            Any: A value passed back to ``end_lookup``, such as a tracing span.
+        """
+        return None
+
+    def end_lookup(
+        self,
+        method: str,
+        token: Any,
+        seconds: float,
+        rpc_calls: int,
+        error: Optional[BaseException],
+    ) -> None:
+        """
+        Called when a look-up finishes.
+
+        Args:
+            method (str): The name of the :class:`~ape_ens.ens.ENS` method.
+            token (Any): The value returned by ``start_lookup``.
+            seconds (float): How long the look-up took.
+            rpc_calls (int): The number of RPC calls the look-up made.
+            error (Optional[BaseException]): The error raised, if any.
+        """
+
+    def count_cache(self, cache: str, event: str, count: int = 1) -> None:
+        """
+        Called when a cache is used.
+
+        Args:
+            cache (str): The cache, such as ``"local_registry"``.
+            event (str): ``"hits"``, ``"misses"``, or ``"evictions"``.
+            count (int): The number of events.
+        """
+
+    def count_rpc(self, method: str, count: int = 1) -> None:
+        """
+        Called when RPC calls are made.
+
+        Args:
+            method (str): The kind of call, such as ``"eth_call"``.
+            count (int): The number of calls.
+        """
+
+
+class SessionStats(Instrumentation):
+    """
+    Counts look-ups, their latencies (as histograms), cache events, RPC calls,
+    and errors in this process. The counters are flat, dotted keys, such as
+    ``lookups.resolve``, ``latency.resolve.le_0.01``, ``cache.local_registry.hits``,
+    ``rpc.eth_call``, and ``errors.resolve.MissingRegistryError``.
+    """
+
+    def __init__(self) -> None:
+        self._counters: defaultdict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def end_lookup(
+        self,
+        method: str,
+        token: Any,
+        seconds: float,
+        rpc_calls: int,
+        error: Optional[BaseException],
+    ) -> None:
+        bucket = next(b for b in LATENCY_BUCKETS if seconds <= b)
+        with self._lock:
+            self._counters[f"lookups.{method}"] += 1
+            self._counters[f"latency.{method}.sum"] += seconds
+            self._counters[f"latency.{method}.le_{bucket}"] += 1
+            self._counters[f"rpc_per_lookup.{method}.sum"] += rpc_calls
+            if error is not None:
+                self._counters[f"errors.{method}.{type(error).__name__}"] += 1
+
+    def count_cache(self, cache: str, event: str, count: int = 1) -> None:
+        with self._lock:
+            self._counters[f"cache.{cache}.{event}"] += count
+
+    def count_rpc(self, method: str, count: int = 1) -> None:
+        with self._lock:
+            self._counters[f"rpc.{method}"] += count
+
+    @property
+    def counters(self) -> dict[str, float]:
+        """
+        A copy of the counters.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> dict[str, float]:
+        """
+        Clear the counters.
+
+        Returns:
+            dict[str, float]: The counters before clearing them.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            self._counters.clear()
+
+        return counters
+
+    def save(self, path: Path) -> None:
+        """
+        Add the counters to the ones saved at ``path`` and then clear them, so
+        counters from many processes (e.g. separate ``ape`` commands) add up.
+
+        Args:
+            path (Path): The path to the stats database.
+        """
+        if not (counters := self.reset()):
+            return
+
+        with closing(_connect(path)) as connection, connection:
+            connection.executemany(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                counters.items(),
+            )
+
+    @staticmethod
+    def load(path: Path) -> dict[str, float]:
+        """
+        Read the counters saved at ``path``.
+
+        Args:
+            path (Path): The path to the stats database.
+
+        Returns:
+            dict[str, float]
+        """
+        if not path.is_file():
+            return {}
+
+        with closing(_connect(path)) as connection:
+            return dict(connection.execute("SELECT key, value FROM counters").fetchall())
+
+    @staticmethod
+    def clear(path: Path) -> None:
+        """
+        Delete the counters saved at ``path``.
+
+        Args:
+            path (Path): The path to the stats database.
+        """
+        path.unlink(missing_ok=True)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30.0)
+    connection.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value REAL)")
+    return connection
+
+
+session_stats = SessionStats()
+"""The counters of this process, always collected."""
+
+_instruments: list[Instrumentation] = [session_stats]
+_save_lock = threading.Lock()
+_save_path: Optional[Path] = None
+
+
+def add_instrumentation(instrumentation: Instrumentation) -> None:
+    """
+    Start sending look-up events to a hook, such as
+    :class:`~ape_ens.instrumentation.PrometheusInstrumentation`.
+
+    Args:
+        instrumentation (:class:`~ape_ens.instrumentation.Instrumentation`): The hook.
+    """
+    if instrumentation not in _instruments:
+        _instruments.append(instrumentation)
+
+
+def remove_instrumentation(instrumentation: Instrumentation) -> None:
+    """
+    Stop sending look-up events to a hook.
+
+    Args:
+        instrumentation (:class:`~ape_ens.instrumentation.Instrumentation`): The hook.
+    """
+    if instrumentation in _instruments and instrumentation is not session_stats:
+        _instruments.remove(instrumentation)
+
+
+def save_session_stats_at_exit(path: Path) -> None:
+    """
+    Save the session counters to ``path`` when the process exits.
+
+    Args:
+        path (Path): The path to the stats database.
+    """
+    global _save_path
+    with _save_lock:
+        if _save_path is None:
+            atexit.register(lambda: session_stats.save(_save_path))  # type: ignore[arg-type]
+
+        _save_path = path
+
+
+def record_cache(cache: str, event: str, count: int = 1) -> None:
+    """
+    Record cache events.
+
+    Args:
+        cache (str): The cache, such as ``"local_registry"``.
+        event (str): ``"hits"``, ``"misses"``, or ``"evictions"``.
+        count (int): The number of events.
+    """
+    if count:
+        for instrumentation in _instruments:
+            instrumentation.count_cache(cache, event, count)
+
+
+# The RPC calls made by the look-up in progress (in this thread or asyncio task).
+_lookup: ContextVar[Optional[list[int]]] = ContextVar("ape_ens_lookup", default=None)
+
+# The requests web3 made since counting started (see `counting_requests()`).
+_requests: ContextVar[Optional[list[int]]] = ContextVar("ape_ens_requests", default=None)
+_request_counter_lock = threading.Lock()
+
+
+def current_lookup() -> Optional[list[int]]:
+    """
+    The RPC call counter of the look-up in progress, if any. Pass it to
+    :func:`~ape_ens.instrumentation.record_rpc` to credit calls made on its
+    behalf (such as by another thread) to it.
+
+    Returns:
+        Optional[list[int]]
+    """
+    return _lookup.get()
+
+
+def record_rpc(
+    method: str, count: int = 1, lookups: Optional[Iterable[Optional[list[int]]]] = None
+) -> None:
+    """
+    Record RPC calls, adding them to the look-ups they were made for.
+
+    Args:
+        method (str): The kind of call, such as ``"eth_call"``.
+        count (int): The number of calls.
+        lookups (Optional[Iterable[Optional[list[int]]]]): The counters (see
+          :func:`~ape_ens.instrumentation.current_lookup`) of the look-ups the calls
+          were made for. Defaults to the current look-up.
+    """
+    if lookups is None:
+        lookups = (_lookup.get(),)
+
+    # Each look-up once, even when several of its calls were made together.
+    for lookup in {id(lookup): lookup for lookup in lookups if lookup is not None}.values():
+        lookup[0] += count
+
+    for instrumentation in _instruments:
+        instrumentation.count_rpc(method, count)
+
+
+@functools.cache
+def _request_counter() -> type:
+    from web3.middleware import Web3Middleware
+
+    class RequestCounter(Web3Middleware):
+        def request_processor(self, method: Any, params: Any) -> Any:
+            if (requests := _requests.get()) is not None:
+                requests[0] += 1
+
+            return method, params
+
+        async def async_request_processor(self, method: Any, params: Any) -> Any:
+            return self.request_processor(method, params)
+
+    return RequestCounter
+
+
+def _add_request_counter(web3: Any) -> bool:
+    # Returns ``False`` when the requests cannot be counted (such as a mocked web3).
+    from web3 import AsyncWeb3, Web3
+
+    if not isinstance(web3, (Web3, AsyncWeb3)):
+        return False
+
+    onion = web3.middleware_onion
+    if "ape_ens_request_counter" not in onion:
+        with _request_counter_lock:
+            if "ape_ens_request_counter" not in onion:
+                onion.add(_request_counter(), name="ape_ens_request_counter")
+
+    return True
+
+
+@contextmanager
+def counting_requests(
+    method: str, web3: Any, lookups: Optional[Iterable[Optional[list[int]]]] = None
+) -> Iterator[None]:
+    """
+    Record the requests ``web3`` makes in the block as ``method`` calls, as some
+    calls (such as web3's ``ens.address``) take several requests. Records one
+    call when the requests cannot be counted.
+
+    Args:
+        method (str): The kind of call, such as ``"eth_call"`` or ``"ens.address"``.
+        web3 (``web3.Web3`` | ``web3.AsyncWeb3``): The connection making the requests.
+        lookups (Optional[Iterable[Optional[list[int]]]]): The counters of the
+          look-ups the calls are made for. Defaults to the current look-up.
+    """
+    if not _add_request_counter(web3):
+        record_rpc(method, lookups=lookups)
+        yield
+        return
+
+    token = _requests.set(requests := [0])
+    try:
+        yield
+    finally:
+        _requests.reset(token)
+        record_rpc(method, requests[0], lookups=lookups)
+
+
+def instrumented(method: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorate a look-up method (or coroutine) to record its latency, RPC calls, and
+    errors. Look-ups made by another look-up (e.g. ``name_many`` resolving the names
+    forward) are counted as part of it.
+
+    Args:
+        method (str): The name to record the look-ups under.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        def start() -> tuple[list[Instrumentation], list[Any], Any, list[int], float]:
+            instruments = list(_instruments)
+            tokens = [i.start_lookup(method) for i in instruments]
+            context = _lookup.set(lookup := [0])
+            return instruments, tokens, context, lookup, time.perf_counter()
+
+        def end(state: tuple, error: Optional[BaseException]) -> None:
+            instruments, tokens, context, lookup, started = state
+            seconds = time.perf_counter() - started
+            _lookup.reset(context)
+            for instrumentation, token in zip(instruments, tokens):
+                instrumentation.end_lookup(method, token, seconds, lookup[0], error)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                if _lookup.get() is not None:
+                    # Part of another look-up.
+                    return await fn(*args, **kwargs)
+
+                state = start()
+                error: Optional[BaseException] = None
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException as err:
+                    error = err
+                    raise
+                finally:
+                    end(state, error)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs) -> T:
+            if _lookup.get() is not None:
+                # Part of another look-up.
+                return fn(*args, **kwargs)
+
+            state = start()
+            error: Optional[BaseException] = None
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as err:
+                error = err
+                raise
+            finally:
+                end(state, error)
+
+        return wrapper
+
+    return decorator
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Exports look-up metrics to Prometheus. Requires ``prometheus-client``
+    (``pip install ape-ens[prometheus]``).
+
+    Args:
+        registry (Optional[CollectorRegistry]): The registry to add the metrics to.
+          Defaults to Prometheus' default registry.
+        prefix (str): The prefix of the metric names.
+    """
+
+    def __init__(self, registry: Any = None, prefix: str = "ape_ens") -> None:
+        try:
+            from prometheus_client import (  # type: ignore[import-not-found]
+                REGISTRY,
+                Counter,
+                Histogram,
+            )
+        except ImportError as err:
+            raise ImportError(
+                "PrometheusInstrumentation requires `prometheus-client`. "
+                "Install it using `pip install ape-ens[prometheus]`."
+            ) from err
+
+        registry = REGISTRY if registry is None else registry
+        self.latency = Histogram(
+            f"{prefix}_lookup_seconds",
+            "Latency of ENS look-ups.",
+            ["method"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.lookup_rpc_calls = Histogram(
+            f"{prefix}_lookup_rpc_calls",
+            "RPC calls made per ENS look-up.",
+            ["method"],
+            buckets=(0, 1, 2, 5, 10, 50, 100, float("inf")),
+            registry=registry,
+        )
+        self.errors = Counter(
+            f"{prefix}_lookup_errors",
+            "Failed ENS look-ups.",
+            ["method", "error"],
+            registry=registry,
+        )
+        self.cache_events = Counter(
+            f"{prefix}_cache_events",
+            "ENS cache hits, misses, and evictions.",
+            ["cache", "event"],
+            registry=registry,
+        )
+        self.rpc_calls = Counter(
+            f"{prefix}_rpc_calls", "RPC calls made by ENS.", ["method"], registry=registry
+        )
+
+    def end_lookup(
+        self,
+        method: str,
+        token: Any,
+        seconds: float,
+        rpc_calls: int,
+        error: Optional[BaseException],
+    ) -> None:
+        self.latency.labels(method).observe(seconds)
+        self.lookup_rpc_calls.labels(method).observe(rpc_calls)
+        if error is not None:
+            self.errors.labels(method, type(error).__name__).inc()
+
+    def count_cache(self, cache: str, event: str, count: int = 1) -> None:
+        self.cache_events.labels(cache, event).inc(count)
+
+    def count_rpc(self, method: str, count: int = 1) -> None:
+        self.rpc_calls.labels(method).inc(count)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Exports look-up metrics and traces (a span per look-up) to OpenTelemetry.
+    Requires ``opentelemetry-api`` (``pip install ape-ens[opentelemetry]``).
+
+    Args:
+        meter_provider (Optional[MeterProvider]): Defaults to the global one.
+        tracer_provider (Optional[TracerProvider]): Defaults to the global one.
+    """
+
+    def __init__(self, meter_provider: Any = None, tracer_provider: Any = None) -> None:
+        try:
+            from opentelemetry import metrics, trace  # type: ignore[import-not-found]
+        except ImportError as err:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires `opentelemetry-api`. "
+                "Install it using `pip install ape-ens[opentelemetry]`."
+            ) from err
+
+        self._trace = trace
+        meter = metrics.get_meter("ape_ens", meter_provider=meter_provider)
+        self.tracer = trace.get_tracer("ape_ens", tracer_provider=tracer_provider)
+        self.latency = meter.create_histogram(
+            "ape_ens.lookup.duration", unit="s", description="Latency of ENS look-ups."
+        )
+        self.lookup_rpc_calls = meter.create_histogram(
+            "ape_ens.lookup.rpc_calls", description="RPC calls made per ENS look-up."
+        )
+        self.errors = meter.create_counter(
+            "ape_ens.lookup.errors", description="Failed ENS look-ups."
+        )
+        self.cache_events = meter.create_counter(
+            "ape_ens.cache.events", description="ENS cache hits, misses, and evictions."
+        )
+        self.rpc_calls = meter.create_counter(
+            "ape_ens.rpc.calls", description="RPC calls made by ENS."
+        )
+
+    def start_lookup(self, method: str) -> Any:
+        return self.tracer.start_span(f"ENS.{method}")
+
+    def end_lookup(
+        self,
+        method: str,
+        token: Any,
+        seconds: float,
+        rpc_calls: int,
+        error: Optional[BaseException],
+    ) -> None:
+        attributes = {"method": method}
+        self.latency.record(seconds, attributes)
+        self.lookup_rpc_calls.record(rpc_calls, attributes)
+        token.set_attribute("ape_ens.rpc_calls", rpc_calls)
+        if error is not None:
+            self.errors.add(1, {**attributes, "error": type(error).__name__})
+            token.record_exception(error)
+            token.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+
+        token.end()
+
+    def count_cache(self, cache: str, event: str, count: int = 1) -> None:
+        self.cache_events.add(count, {"cache": cache, "event": event})
+
+    def count_rpc(self, method: str, count: int = 1) -> None:
+        self.rpc_calls.add(count, {"method": method})
+
+
+def format_stats(counters: dict[str, float]) -> Iterable[str]:
+    """
+    Format counters as ``key: value`` lines, sorted by key.
+
+    Args:
+        counters (dict[str, float]): The counters.
+
+    Returns:
+        Iterable[str]
+    """
+    return (f"{key}: {value:g}" for key, value in sorted(counters.items()))
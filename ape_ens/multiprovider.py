@@ -0,0 +1,297 @@
+import re
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Optional
+
+from ape.logging import logger
+from web3.providers.base import BaseProvider
+
+if TYPE_CHECKING:
+    from web3.types import RPCEndpoint, RPCResponse
+
+# JSON-RPC errors that are the endpoint's problem (rate limited, out of sync, or failing),
+# rather than the request's, so another endpoint may answer.
+ENDPOINT_ERROR_CODES = (-32005, -32603, 429)
+_ENDPOINT_ERROR_PATTERN = re.compile(
+    r"rate.?limit|too many requests|exceeded|header not found|missing trie node|internal error",
+    re.IGNORECASE,
+)
+
+# Weight of the latest request in an endpoint's average latency.
+LATENCY_SMOOTHING = 0.3
+
+
+class EndpointError(Exception):
+    """
+    An endpoint responded with an error that another endpoint may not have.
+    """
+
+    def __init__(self, response: "RPCResponse") -> None:
+        super().__init__(str(response.get("error")))
+        self.response = response
+
+
+def is_endpoint_error(response: "RPCResponse") -> bool:
+    """
+    Returns ``True`` when a JSON-RPC error response is the endpoint's problem,
+    such as being rate limited or out of sync, so another endpoint may answer.
+    """
+    if not isinstance(error := response.get("error"), dict):
+        return False
+
+    return (
+        error.get("code") in ENDPOINT_ERROR_CODES
+        or _ENDPOINT_ERROR_PATTERN.search(str(error.get("message", ""))) is not None
+    )
+
+
+class EndpointStats:
+    """
+    The health and latency of an endpoint.
+
+    Args:
+        name (str): The provider name or the RPC host.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+        self.requests = 0
+        """The number of requests sent to it."""
+
+        self.errors = 0
+        """The number of requests that failed."""
+
+        self.hedges = 0
+        """The number of requests sent to it because another endpoint was slow."""
+
+        self.wins = 0
+        """The number of races (hedged requests) it answered first."""
+
+        self.latency: Optional[float] = None
+        """The (exponential moving) average seconds a request takes."""
+
+        self.consecutive_failures = 0
+        """The number of requests failed in a row."""
+
+        self.unhealthy_until = 0.0
+        """Until when (``time.monotonic()``) it is skipped, after failing too often."""
+
+    @property
+    def healthy(self) -> bool:
+        return self.unhealthy_until <= time.monotonic()
+
+    def record_success(self, seconds: float) -> None:
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def record_slow(self, seconds: float) -> None:
+        # A request still in flight has taken at least this long.
+        self.latency = max(self.latency or 0.0, seconds)
+
+    def record_failure(self, failure_threshold: int, cooldown: float) -> None:
+        self.errors += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.unhealthy_until = time.monotonic() + cooldown
+
+    def model_dump(self) -> dict[str, Any]:
+        """
+        The stats as a dictionary.
+        """
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "latency": self.latency,
+            "healthy": self.healthy,
+        }
+
+
+class MultiProvider(BaseProvider):
+    """
+    A web3 provider that sends each request to the fastest healthy one of several
+    endpoints. When a request is slower than ``hedge_delay``, the next fastest endpoint
+    is raced and the first answer wins. When an endpoint fails (e.g. times out, is
+    rate limited, or is out of sync), the next one is tried, and endpoints failing
+    ``failure_threshold`` times in a row are skipped for ``cooldown`` seconds.
+    Only use it for reads, as a request may be sent to more than one endpoint.
+
+    Args:
+        endpoints (Sequence[tuple[str, BaseProvider]]): ``(name, provider)`` pairs,
+          in order of preference when their latencies are unknown.
+        hedge_delay (Optional[float]): Seconds until racing another endpoint.
+          ``None`` means never race.
+        failure_threshold (int): The number of failures in a row until an endpoint
+          is skipped.
+        cooldown (float): Seconds to skip failing endpoints for.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[tuple[str, BaseProvider]],
+        hedge_delay: Optional[float] = 0.5,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("No endpoints.")
+
+        super().__init__()
+        self.endpoints = list(endpoints)
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown = cooldown
+        self.stats = {name: EndpointStats(name) for name, _ in self.endpoints}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __str__(self) -> str:
+        return f"MultiProvider<{', '.join(self.stats)}>"
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Slow requests that lost a race keep their thread until they finish.
+                self._executor = ThreadPoolExecutor(
+                    max_workers=8 * len(self.endpoints), thread_name_prefix="ape-ens-rpc"
+                )
+
+            return self._executor
+
+    def ranked(self) -> list[tuple[str, BaseProvider]]:
+        """
+        The endpoints in the order to try them: the healthy ones, fastest first
+        (ones without a latency yet are tried first, to measure them), then
+        the unhealthy ones, as a last resort.
+        """
+
+        def rank(index: int) -> tuple[bool, float, int]:
+            stats = self.stats[self.endpoints[index][0]]
+            return (not stats.healthy, stats.latency or 0.0, index)
+
+        return [self.endpoints[i] for i in sorted(range(len(self.endpoints)), key=rank)]
+
+    def _request(
+        self, name: str, provider: BaseProvider, method: "RPCEndpoint", params: Any
+    ) -> "RPCResponse":
+        stats = self.stats[name]
+        stats.requests += 1
+        start = time.monotonic()
+        try:
+            response = provider.make_request(method, params)
+            if is_endpoint_error(response):
+                raise EndpointError(response)
+
+        except Exception as err:
+            stats.record_failure(self.failure_threshold, self.cooldown)
+            logger.debug(f"ENS RPC endpoint '{name}' failed '{method}': {err}")
+            raise
+
+        stats.record_success(time.monotonic() - start)
+        return response
+
+    def make_request(self, method: "RPCEndpoint", params: Any) -> "RPCResponse":
+        endpoints = self.ranked()
+        if self.hedge_delay is None:
+            return self._failover(endpoints, method, params)
+
+        return self._race(endpoints, method, params)
+
+    def _failover(
+        self, endpoints: list[tuple[str, BaseProvider]], method: "RPCEndpoint", params: Any
+    ) -> "RPCResponse":
+        error: Optional[Exception] = None
+        for name, provider in endpoints:
+            try:
+                return self._request(name, provider, method, params)
+            except Exception as err:
+                error = err
+
+        return self._raise(error)
+
+    def _race(
+        self, endpoints: list[tuple[str, BaseProvider]], method: "RPCEndpoint", params: Any
+    ) -> "RPCResponse":
+        remaining = iter(endpoints)
+        pending: dict[Future, str] = {}
+        hedged = False
+        error: Optional[Exception] = None
+
+        def start(hedge: bool = False) -> None:
+            if (endpoint := next(remaining, None)) is None:
+                return
+
+            name, provider = endpoint
+            if hedge:
+                self.stats[name].hedges += 1
+
+            future = self.executor.submit(self._request, name, provider, method, params)
+            pending[future] = name
+
+        start()
+        while pending:
+            # Race another endpoint once, when the first is slow.
+            timeout = None if hedged else self.hedge_delay
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Rank the slow endpoint by how slow it is already, rather than waiting
+                # for its request to finish.
+                for name in pending.values():
+                    self.stats[name].record_slow(self.hedge_delay or 0.0)
+
+                hedged = True
+                start(hedge=True)
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as err:
+                    error = err
+                    continue
+
+                if hedged:
+                    self.stats[name].wins += 1
+
+                # The losers finish in the background, updating their stats.
+                return response
+
+            if not pending:
+                # Fail over.
+                start()
+
+        return self._raise(error)
+
+    def _raise(self, error: Optional[Exception]) -> "RPCResponse":
+        if isinstance(error, EndpointError):
+            # Let web3 raise its usual error for the response.
+            return error.response
+
+        elif error is not None:
+            raise error
+
+        raise ValueError("No endpoints.")
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(
+            provider.is_connected(show_traceback=show_traceback) for _, provider in self.endpoints
+        )
+
+    def close(self) -> None:
+        """
+        Stop the threads racing requests.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
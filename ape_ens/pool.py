@@ -0,0 +1,323 @@
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional
+
+from ape.exceptions import ProviderError
+from ape.logging import silenced
+from ape.utils.basemodel import ManagerAccessMixin
+
+from ape_ens.utils.concurrency import ForkGuard
+
+if TYPE_CHECKING:
+    from ape.api import ProviderAPI
+    from ape.types import AddressType
+    from ape_ethereum.provider import Web3Provider
+    from requests import Session
+    from web3 import Web3
+    from web3.main import ENS as Web3ENS
+    from web3.providers.base import BaseProvider
+
+    from ape_ens.config import ENSConfig
+    from ape_ens.multiprovider import EndpointStats
+
+
+def is_mainnet_provider(provider: Optional["ProviderAPI"]) -> bool:
+    """
+    Returns ``True`` when the provider is connected to Ethereum mainnet
+    (or a fork of it) and has web3.
+
+    Args:
+        provider (Optional[``ProviderAPI``]): The provider.
+
+    Returns:
+        bool
+    """
+    return (
+        provider is not None
+        and hasattr(provider, "web3")
+        and provider.network.name in ("mainnet", "mainnet-fork")
+        and provider.network.ecosystem.name == "ethereum"
+    )
+
+
+class ConnectionPool(ManagerAccessMixin):
+    """
+    A thread-safe pool of the Ethereum mainnet provider and the ``Web3ENS``
+    objects built on it, keyed by registry address. All
+    :class:`~ape_ens.ens.ENS` instances in a process share one pool, so the
+    provider is only found (and connected) once and its HTTP session, which
+    web3 keeps alive, is reused rather than re-doing connection and TLS setup.
+    The provider is found again once it disconnects, or once another Ethereum
+    mainnet provider becomes active.
+
+    Args:
+        max_size (Optional[int]): The max number of ``Web3ENS`` objects (registries)
+          to keep, and of HTTP connections to keep alive to each of the
+          ``mainnet_providers`` given as an RPC URI. Defaults to the
+          ``connection_pool_size`` config.
+    """
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        self._max_size = max_size
+        self._lock = threading.RLock()
+        self._provider: Optional["Web3Provider"] = None
+        self._provider_is_set = False
+        self._provider_was_connected = False
+        self._multi_web3: Optional["Web3"] = None
+        self._sessions: list["Session"] = []
+        self._web3_ens: OrderedDict[Optional[str], "Web3ENS"] = OrderedDict()
+        self._fork_guard = ForkGuard()
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.config_manager.ens
+
+    @property
+    def max_size(self) -> int:
+        return max(self._max_size or self.config.connection_pool_size, 1)
+
+    def _check_pid(self) -> None:
+        if self._fork_guard.forked():
+            self._provider = None
+            self._provider_is_set = False
+            self._multi_web3 = None
+            self._sessions = []
+            self._web3_ens.clear()
+
+    def _is_stale(self, provider: "Web3Provider") -> bool:
+        # Checked on each access, so this must not make requests (as `is_connected` does).
+        if self._provider_is_set:
+            return False
+
+        elif self._provider_was_connected and getattr(provider, "_web3", None) is None:
+            # Disconnected, such as after leaving its network.
+            return True
+
+        # Prefer the active provider once it is (another) mainnet one.
+        active_provider = self.network_manager.active_provider
+        return active_provider is not provider and is_mainnet_provider(active_provider)
+
+    @property
+    def provider(self) -> "Web3Provider":
+        """
+        The Ethereum mainnet provider, connected on first use.
+        """
+        with self._lock:
+            self._check_pid()
+            if (provider := self._provider) is not None and self._is_stale(provider):
+                provider = self._provider = None
+                if not self.config.mainnet_providers:
+                    # Built on the stale provider.
+                    self._web3_ens.clear()
+
+            if provider is None:
+                provider = self._find_mainnet_provider()
+                self._provider = provider
+                # Not when it failed to connect, to not retry on each access.
+                self._provider_was_connected = getattr(provider, "_web3", None) is not None
+
+            return provider
+
+    @provider.setter
+    def provider(self, provider: "Web3Provider") -> None:
+        # Use another provider, such as a local network with ENS deployed (testing?).
+        with self._lock:
+            self._check_pid()
+            self._provider = provider
+            self._provider_is_set = True
+            self._web3_ens.clear()
+
+    @property
+    def web3(self) -> "Web3":
+        """
+        The connection ENS reads with: the provider's, or one racing the
+        ``mainnet_providers`` when configured.
+        """
+        if not self.config.mainnet_providers:
+            return self.provider.web3
+
+        with self._lock:
+            self._check_pid()
+            if (web3 := self._multi_web3) is None:
+                from web3 import Web3
+
+                from ape_ens.multiprovider import MultiProvider
+
+                config = self.config
+                multi_provider = MultiProvider(
+                    self._get_endpoints(config.mainnet_providers),
+                    hedge_delay=config.provider_hedge_delay,
+                    failure_threshold=config.provider_failure_threshold,
+                    cooldown=config.provider_cooldown,
+                )
+                web3 = Web3(multi_provider)
+                self._multi_web3 = web3
+
+            return web3
+
+    @property
+    def provider_stats(self) -> dict[str, "EndpointStats"]:
+        """
+        The health and latency of each of the ``mainnet_providers``, when configured.
+        """
+        with self._lock:
+            web3 = self._multi_web3
+
+        return dict(getattr(web3.provider, "stats", {})) if web3 is not None else {}
+
+    @silenced
+    def _get_endpoints(self, names: list[str]) -> list[tuple[str, "BaseProvider"]]:
+        from urllib.parse import urlparse
+
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+        from web3 import HTTPProvider
+
+        endpoints: list[tuple[str, "BaseProvider"]] = []
+        for name in names:
+            if "://" in name:
+                # Only show the host, as the rest of the URI may have an API key.
+                label = urlparse(name).netloc or name
+
+                # Keep as many connections alive as look-ups may make at once.
+                session = Session()
+                adapter = HTTPAdapter(pool_maxsize=self.max_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions.append(session)
+
+                provider: "BaseProvider" = HTTPProvider(
+                    name,
+                    request_kwargs={"timeout": self.config.provider_timeout},
+                    session=session,
+                    # Fail over, rather than retrying the same endpoint.
+                    exception_retry_configuration=None,
+                )
+
+            else:
+                label = name
+                ape_provider = self.network_manager.ethereum.mainnet.get_provider(name)
+                if not ape_provider.is_connected:
+                    ape_provider.connect()
+
+                provider = ape_provider.web3.provider  # type: ignore[attr-defined]
+
+            labels = {endpoint[0] for endpoint in endpoints}
+            unique_label, count = label, 1
+            while unique_label in labels:
+                count += 1
+                unique_label = f"{label}#{count}"
+
+            endpoints.append((unique_label, provider))
+
+        return endpoints
+
+    def provider_name(self, web3: Any) -> Optional[str]:
+        """
+        Get the name of the pool's provider when ``web3`` is its connection,
+        without connecting.
+
+        Args:
+            web3 (``web3.Web3``): The connection.
+
+        Returns:
+            str | None
+        """
+        with self._lock:
+            provider = self._provider
+
+        if provider is not None and getattr(provider, "_web3", None) is web3:
+            return provider.name
+
+        return None
+
+    @silenced
+    def _find_mainnet_provider(self) -> "Web3Provider":
+        provider = self.network_manager.active_provider
+        if is_mainnet_provider(provider):
+            return provider  # type: ignore[return-value]
+
+        ethereum = self.network_manager.ethereum
+
+        # Find a provider with access to web3.ens.
+        # First, try the default ethereum mainnet provider.
+        web3_provider = None
+        if provider := ethereum.mainnet.default_provider:
+            if "web3" in dir(provider):
+                web3_provider = provider
+
+        if web3_provider is None:
+            # Loop through other providers to find a valid one.
+            # It should minimally find ape-node which comes with Ape.
+            for provider in ethereum.mainnet.providers:
+                if "web3" in dir(provider):
+                    web3_provider = provider
+                    break
+
+        if web3_provider is None:
+            raise ValueError("Never found a valid Ethereum mainnet provider.")
+
+        # Connect the provider so we can access web3.ens.
+        if not web3_provider.is_connected:
+            try:
+                web3_provider.connect()
+
+            except ProviderError:
+                # There might be an issue, but attempt anyway.
+                return web3_provider
+
+        return web3_provider
+
+    def get(self, registry_address: Optional["AddressType"] = None) -> "Web3ENS":
+        """
+        Get the shared ``Web3ENS`` for a registry, creating it if needed.
+
+        Args:
+            registry_address (Optional[AddressType]): The registry address.
+              Defaults to the mainnet registry.
+
+        Returns:
+            ``web3.main.ENS``
+        """
+        key = registry_address.lower() if registry_address else None
+        with self._lock:
+            self._check_pid()
+            if not self.config.mainnet_providers:
+                # Forget the objects built on a stale provider.
+                _ = self.provider
+
+            if (ens := self._web3_ens.get(key)) is not None:
+                self._web3_ens.move_to_end(key)
+                return ens
+
+            from web3.main import ENS as Web3ENS
+
+            web3 = self.web3
+            ens = Web3ENS.from_web3(web3, registry_address) if registry_address else web3.ens
+            self._web3_ens[key] = ens
+            while len(self._web3_ens) > self.max_size:
+                self._web3_ens.popitem(last=False)
+
+            return ens
+
+    def clear(self) -> None:
+        """
+        Forget the provider and all ``Web3ENS`` objects, such as
+        after changing networks.
+        """
+        with self._lock:
+            self._provider = None
+            self._provider_is_set = False
+            self._web3_ens.clear()
+            if (web3 := self._multi_web3) is not None:
+                self._multi_web3 = None
+                web3.provider.close()  # type: ignore[attr-defined]
+
+            for session in self._sessions:
+                session.close()
+
+            self._sessions = []
+
+
+connection_pool = ConnectionPool()
+"""The connection pool shared by all :class:`~ape_ens.ens.ENS` instances."""
@@ -0,0 +1,558 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+from ape.logging import logger
+from ape.utils.basemodel import ManagerAccessMixin
+
+from ape_ens.exceptions import RateLimitError
+from ape_ens.instrumentation import counting_requests, current_lookup
+from ape_ens.utils.multicall import MULTICALL3_ADDRESS, aggregate3
+
+if TYPE_CHECKING:
+    from web3 import Web3
+    from web3.types import BlockIdentifier
+
+    from ape_ens.config import ENSConfig, RateLimitConfig
+    from ape_ens.utils.multicall import Call, Result
+
+T = TypeVar("T")
+
+# JSON-RPC error codes providers use when rate limiting (EIP-1474 "limit exceeded").
+RATE_LIMIT_CODES = (-32005, 429)
+
+# HTTP statuses worth retrying.
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_RATE_LIMIT_PATTERN = re.compile(
+    r"rate.?limit|too many requests|exceeded .*(capacity|compute units|quota)", re.IGNORECASE
+)
+_TOO_LARGE_PATTERN = re.compile(
+    r"out of gas|gas (limit|cap)|gas required exceeds|response (size|is too)|too large",
+    re.IGNORECASE,
+)
+
+
+def _status_code(err: BaseException) -> Optional[int]:
+    # E.g. ``requests.HTTPError``.
+    return getattr(getattr(err, "response", None), "status_code", None)
+
+
+def _rpc_error_code(err: BaseException) -> Optional[int]:
+    # E.g. ``web3.exceptions.Web3RPCError``.
+    rpc_response = getattr(err, "rpc_response", None)
+    if isinstance(rpc_response, dict) and isinstance(error := rpc_response.get("error"), dict):
+        return error.get("code")
+
+    return None
+
+
+def is_rate_limited(err: BaseException) -> bool:
+    """
+    Returns ``True`` when the error means the provider is rate limiting requests.
+    """
+    return (
+        _status_code(err) == 429
+        or _rpc_error_code(err) in RATE_LIMIT_CODES
+        or _RATE_LIMIT_PATTERN.search(str(err)) is not None
+    )
+
+
+def is_transient(err: BaseException) -> bool:
+    """
+    Returns ``True`` when the call may succeed if retried: it was rate limited,
+    failed with a 5xx status, or timed out.
+    """
+    if isinstance(err, (TimeoutError, ConnectionError)):
+        return True
+
+    elif _status_code(err) in TRANSIENT_STATUS_CODES or is_rate_limited(err):
+        return True
+
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+    from requests.exceptions import Timeout
+
+    return isinstance(err, (RequestsConnectionError, Timeout))
+
+
+def is_too_large(err: BaseException) -> bool:
+    """
+    Returns ``True`` when a multicall failed for exceeding the node's gas
+    (or response size) limit, so smaller multicalls may succeed.
+    """
+    return not is_rate_limited(err) and _TOO_LARGE_PATTERN.search(str(err)) is not None
+
+
+def retry_after(err: BaseException) -> Optional[float]:
+    """
+    Get the seconds to wait from the ``Retry-After`` header of an HTTP error.
+    """
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    if (value := headers.get("Retry-After")) is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # An HTTP date, which providers do not use for rate limits.
+        return None
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: tokens refill at ``rate`` per second, up to
+    ``capacity``, and each request takes ``cost`` tokens, waiting when there
+    are not enough. Waiting requests reserve their tokens, so they are
+    served in order.
+
+    Args:
+        rate (Optional[float]): Tokens per second. ``None`` means no limit.
+        capacity (Optional[float]): The max number of tokens. Defaults to ``rate``.
+        clock (Callable[[], float]): Returns the current time, in seconds.
+        sleep (Callable[[float], Any]): Waits a number of seconds.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self.rate: Optional[float] = None
+        self.capacity = 0.0
+        self._configured: Optional[tuple[Optional[float], Optional[float]]] = None
+        self._tokens = 0.0
+        self._updated = clock()
+        self._paused_until = 0.0
+        self.configure(rate, capacity)
+
+    def configure(self, rate: Optional[float], capacity: Optional[float] = None) -> None:
+        """
+        Change the rate and capacity, such as after the config changed.
+        """
+        with self._lock:
+            if (rate, capacity) == self._configured:
+                return
+
+            self._configured = (rate, capacity)
+            self._refill()
+            self.rate = rate if rate and rate > 0 else None
+            self.capacity = max(capacity or self.rate or 0.0, 1.0) if self.rate else 0.0
+            self._tokens = min(self._tokens, self.capacity) if self.rate else 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.rate is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+
+        self._updated = now
+
+    def acquire(self, cost: float = 1.0) -> float:
+        """
+        Take ``cost`` tokens, waiting until they are available.
+
+        Args:
+            cost (float): The number of tokens.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        if (wait := self.reserve(cost)) > 0:
+            self._sleep(wait)
+
+        return wait
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """
+        Take ``cost`` tokens without waiting for them, such as to wait on an event
+        loop instead.
+
+        Args:
+            cost (float): The number of tokens.
+
+        Returns:
+            float: The number of seconds to wait until they are available.
+        """
+        with self._lock:
+            self._refill()
+            wait = max(self._paused_until - self._updated, 0.0)
+            if self.rate is not None:
+                self._tokens -= cost
+                wait = max(wait, -self._tokens / self.rate)
+
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Make requests wait at least ``seconds`` from now, such as after
+        the provider rate-limited a request.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class _PendingCalls:
+    def __init__(self, calls: list["Call"]) -> None:
+        self.calls = calls
+        # Credited with the multicalls made for it, even by another thread.
+        self.lookup = current_lookup()
+        self.results: Optional[list["Result"]] = None
+        self.error: Optional[BaseException] = None
+        self.lead = False
+        self.wake = threading.Event()
+
+
+class RPCScheduler(ManagerAccessMixin):
+    """
+    Schedules the RPC calls ENS look-ups make to a provider: each call waits
+    for the provider's token bucket and transient errors are retried with
+    exponential backoff. Multicalls made at once (such as by many threads
+    resolving names) are queued and packed together, in batches sized to
+    the observed latency and the node's gas limit. Configure it using the
+    ``rate_limits`` config.
+
+    Args:
+        provider_name (Optional[str]): The name of the provider. Defaults to
+          the ``default`` config.
+        sleep (Callable[[float], Any]): Waits a number of seconds.
+    """
+
+    def __init__(
+        self, provider_name: Optional[str] = None, sleep: Callable[[float], Any] = time.sleep
+    ) -> None:
+        self.provider_name = provider_name
+        self._sleep = sleep
+        self.bucket = TokenBucket(sleep=sleep)
+        self._lock = threading.Lock()
+        self._queues: dict[Hashable, list[_PendingCalls]] = {}
+        self._leading: set[Hashable] = set()
+        self._batch_size: Optional[int] = None
+
+    @property
+    def config(self) -> "ENSConfig":
+        return self.config_manager.ens
+
+    @property
+    def settings(self) -> "RateLimitConfig":
+        """
+        The provider's rate limit config.
+        """
+        return self.config.get_rate_limit(self.provider_name)
+
+    @property
+    def batch_size(self) -> int:
+        """
+        The number of calls to put in each multicall.
+        """
+        settings = self.settings
+        max_size = max(self.config.multicall_batch_size, 1)
+        if not settings.adaptive_batch_size or self._batch_size is None:
+            return max_size
+
+        return min(max(self._batch_size, settings.min_batch_size, 1), max_size)
+
+    def run(
+        self,
+        method: str,
+        fn: Callable[[], T],
+        web3: Any = None,
+        lookups: Optional[Iterable[Optional[list[int]]]] = None,
+    ) -> T:
+        """
+        Make a call, waiting for the rate limit and retrying transient errors.
+
+        Args:
+            method (str): The kind of call, such as ``"eth_call"``.
+            fn (Callable[[], T]): Makes the call.
+            web3 (Optional[``web3.Web3``]): The connection ``fn`` uses, to record
+              each request it makes (see :func:`~ape_ens.instrumentation.counting_requests`).
+              Otherwise, records one call.
+            lookups (Optional[Iterable[Optional[list[int]]]]): The counters of the
+              look-ups the call is made for. Defaults to the current look-up.
+
+        Raises:
+            :class:`~ape_ens.exceptions.RateLimitError`: When still rate limited
+              after ``max_retries``.
+
+        Returns:
+            T: The result of ``fn``.
+        """
+        settings = self.settings
+        self.bucket.configure(settings.requests_per_second, settings.burst)
+        cost = settings.method_costs.get(method, 1.0)
+        attempt = 0
+        while True:
+            self.bucket.acquire(cost)
+            try:
+                with counting_requests(method, web3, lookups=lookups):
+                    return fn()
+
+            except Exception as err:
+                if delay := self._retry_delay(method, err, attempt, settings):
+                    self._sleep(delay)
+
+                attempt += 1
+
+    async def run_async(
+        self,
+        method: str,
+        fn: Callable[[], Awaitable[T]],
+        web3: Any = None,
+        lookups: Optional[Iterable[Optional[list[int]]]] = None,
+    ) -> T:
+        """
+        Like :meth:`~ape_ens.scheduler.RPCScheduler.run`, but for a coroutine, waiting
+        on the event loop rather than blocking it. Async and sync calls to the same
+        provider share its rate limit.
+
+        Args:
+            method (str): The kind of call, such as ``"eth_call"``.
+            fn (Callable[[], Awaitable[T]]): Makes the call.
+            web3 (Optional[``web3.AsyncWeb3``]): The connection ``fn`` uses.
+            lookups (Optional[Iterable[Optional[list[int]]]]): The counters of the
+              look-ups the call is made for. Defaults to the current look-up.
+
+        Raises:
+            :class:`~ape_ens.exceptions.RateLimitError`: When still rate limited
+              after ``max_retries``.
+
+        Returns:
+            T: The result of ``fn``.
+        """
+        settings = self.settings
+        self.bucket.configure(settings.requests_per_second, settings.burst)
+        cost = settings.method_costs.get(method, 1.0)
+        attempt = 0
+        while True:
+            if (wait := self.bucket.reserve(cost)) > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                with counting_requests(method, web3, lookups=lookups):
+                    return await fn()
+
+            except Exception as err:
+                if delay := self._retry_delay(method, err, attempt, settings):
+                    await asyncio.sleep(delay)
+
+                attempt += 1
+
+    def _retry_delay(
+        self, method: str, err: Exception, attempt: int, settings: "RateLimitConfig"
+    ) -> float:
+        # Seconds to wait before retrying a failed call, or raises its error.
+        if not is_transient(err):
+            raise err
+
+        elif attempt >= settings.max_retries:
+            if is_rate_limited(err):
+                raise RateLimitError(f"Rate limited after {attempt} retries: {err}") from err
+
+            raise err
+
+        delay = retry_after(err)
+        if delay is None:
+            delay = min(settings.backoff * 2**attempt, settings.max_backoff)
+            delay *= random.uniform(0.5, 1.0)
+
+        logger.debug(f"Retrying '{method}' in {delay:.2f}s ({attempt + 1}): {err}")
+        if is_rate_limited(err):
+            # Slow down every call to this provider, not only this one.
+            self.bucket.pause(delay)
+            return 0.0
+
+        return delay
+
+    def aggregate(
+        self,
+        web3: "Web3",
+        calls: list["Call"],
+        block_identifier: Optional["BlockIdentifier"] = None,
+        address: str = MULTICALL3_ADDRESS,
+    ) -> list["Result"]:
+        """
+        Make read-only calls using Multicall3, packed together with the calls
+        other threads are making at the same time.
+
+        Args:
+            web3 (Web3): The connection to make the calls with.
+            calls (list[Call]): ``(target, calldata)`` pairs.
+            block_identifier (Optional[BlockIdentifier]): The block to call at.
+              Defaults to ``"latest"``.
+            address (str): The Multicall3 address.
+
+        Returns:
+            list[Result]: ``(success, return_data)`` pairs, in the same order as ``calls``.
+        """
+        if not calls:
+            return []
+
+        key = (id(web3), address.lower(), str(block_identifier or "latest"))
+        pending = _PendingCalls(calls)
+        with self._lock:
+            self._queues.setdefault(key, []).append(pending)
+            # The first caller makes the calls queued while it is calling.
+            if key not in self._leading:
+                self._leading.add(key)
+                pending.lead = True
+
+        if not pending.lead:
+            pending.wake.wait()
+
+        if pending.lead:
+            self._lead(key, web3, block_identifier, address)
+
+        if pending.error is not None:
+            raise pending.error
+
+        return pending.results  # type: ignore[return-value]
+
+    def _lead(
+        self,
+        key: Hashable,
+        web3: "Web3",
+        block_identifier: Optional["BlockIdentifier"],
+        address: str,
+    ) -> None:
+        with self._lock:
+            batch = self._queues.pop(key, [])
+
+        try:
+            # Make each distinct call once, for every look-up that queued it.
+            lookups: dict["Call", list[Optional[list[int]]]] = {}
+            for pending in batch:
+                for call in pending.calls:
+                    lookups.setdefault(call, []).append(pending.lookup)
+
+            unique = list(lookups)
+            results = dict(
+                zip(unique, self._multicall(web3, unique, block_identifier, address, lookups))
+            )
+            for pending in batch:
+                pending.results = [results[call] for call in pending.calls]
+
+        except BaseException as err:
+            for pending in batch:
+                pending.error = err
+
+            if not isinstance(err, Exception):
+                raise
+
+        finally:
+            with self._lock:
+                if queue := self._queues.get(key):
+                    # Hand over to a caller that queued meanwhile.
+                    queue[0].lead = True
+                    queue[0].wake.set()
+                else:
+                    self._leading.discard(key)
+
+            for pending in batch:
+                pending.lead = False
+                pending.wake.set()
+
+    def _multicall(
+        self,
+        web3: "Web3",
+        calls: list["Call"],
+        block_identifier: Optional["BlockIdentifier"],
+        address: str,
+        lookups: Optional[dict["Call", list[Optional[list[int]]]]] = None,
+    ) -> list["Result"]:
+        results: list["Result"] = []
+        start = 0
+        size = self.batch_size
+        while start < len(calls):
+            chunk = calls[start : start + size]  # noqa: E203
+            chunk_lookups = (
+                None if lookups is None else [lookup for call in chunk for lookup in lookups[call]]
+            )
+            started = time.monotonic()
+            try:
+                chunk_results = self.run(
+                    "eth_call",
+                    lambda: aggregate3(
+                        web3,
+                        chunk,
+                        block_identifier=block_identifier,
+                        batch_size=len(chunk),
+                        address=address,
+                    ),
+                    web3=web3,
+                    lookups=chunk_lookups,
+                )
+            except Exception as err:
+                if len(chunk) <= 1 or not is_too_large(err):
+                    raise
+
+                # Exceeded the node's gas limit; retry in smaller multicalls. It is a hard
+                # limit, so neither ``min_batch_size`` nor the adaptive setting apply.
+                size = len(chunk) // 2
+                if self.settings.adaptive_batch_size:
+                    # Start the next multicalls smaller too.
+                    self._batch_size = size
+
+                logger.debug(f"Multicall of {len(chunk)} calls too large: {err}")
+                continue
+
+            self._adapt(len(chunk), time.monotonic() - started)
+            results.extend(chunk_results)
+            start += len(chunk)
+
+        return results
+
+    def _adapt(self, size: int, seconds: float) -> None:
+        settings = self.settings
+        if not settings.adaptive_batch_size:
+            return
+
+        target = settings.target_latency
+        if seconds > target:
+            # Too slow: shrink in proportion.
+            self._batch_size = max(int(size * target / seconds), 1)
+
+        elif self._batch_size is not None and size >= self._batch_size and seconds < target / 2:
+            # Quick full batches: grow back.
+            self._batch_size += max(self._batch_size // 4, 1)
+            if self._batch_size >= self.config.multicall_batch_size:
+                self._batch_size = None
+
+
+_schedulers: dict[Optional[str], RPCScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider_name: Optional[str] = None) -> RPCScheduler:
+    """
+    Get the scheduler of a provider, shared by all :class:`~ape_ens.ens.ENS`
+    instances, so they share its rate limit.
+
+    Args:
+        provider_name (Optional[str]): The provider name. Defaults to the
+          scheduler of unknown providers.
+
+    Returns:
+        :class:`~ape_ens.scheduler.RPCScheduler`
+    """
+    with _schedulers_lock:
+        if (scheduler := _schedulers.get(provider_name)) is None:
+            scheduler = RPCScheduler(provider_name)
+            _schedulers[provider_name] = scheduler
+
+        return scheduler
+
+
+def clear_schedulers() -> None:
+    """
+    Forget all schedulers, along with their rate limit state and batch sizes.
+    """
+    with _schedulers_lock:
+        _schedulers.clear()
@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+from collections.abc import Iterable
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+from ape_ens.utils.concurrency import thread_connection
+from ape_ens.utils.namehash import namehash
+
+# How much of the file SQLite may memory-map, in bytes.
+MMAP_SIZE = 1 << 30
+
+# How many records to insert per statement when writing a snapshot.
+_WRITE_CHUNK_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+CREATE TABLE records (
+    node BLOB PRIMARY KEY,
+    name TEXT NOT NULL,
+    address TEXT
+) WITHOUT ROWID;
+"""
+
+
+class Snapshot:
+    """
+    A read-only, offline set of ENS names and the addresses they resolved to
+    at a pinned block. Snapshots are SQLite files keyed by namehash, so a
+    look-up is a single B-tree search (O(log n)) of the memory-mapped file
+    rather than parsing all of it. The file is only opened on first use.
+
+    Args:
+        path (Path): The path to the snapshot file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self._local, self._connect)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self.path.is_file():
+            raise FileNotFoundError(f"ENS snapshot '{self.path}' not found.")
+
+        connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return connection
+
+    def _metadata(self, key: str) -> Optional[str]:
+        row = self._connection.execute(
+            "SELECT value FROM metadata WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @property
+    def block_number(self) -> Optional[int]:
+        """
+        The block the names were resolved at.
+        """
+        value = self._metadata("block_number")
+        return None if value is None else int(value)
+
+    @property
+    def registry(self) -> Optional[str]:
+        """
+        The address of the registry the names were resolved with.
+        """
+        return self._metadata("registry")
+
+    def lookup(self, name: str) -> tuple[bool, Optional[str]]:
+        """
+        Look up a name.
+
+        Args:
+            name (str): The ENS name.
+
+        Returns:
+            tuple[bool, str | None]: Whether the name is in the snapshot and
+            its address. A name in the snapshot with a ``None`` address did
+            not resolve at the snapshot's block.
+        """
+        row = self._connection.execute(
+            "SELECT address FROM records WHERE node = ?", (bytes(namehash(name)),)
+        ).fetchone()
+        return (True, row[0]) if row else (False, None)
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM records").fetchone()
+        return count
+
+    @classmethod
+    def write(
+        cls,
+        path: Path,
+        records: Iterable[tuple[str, Optional[str]]],
+        block_number: Optional[int] = None,
+        registry: Optional[str] = None,
+    ) -> "Snapshot":
+        """
+        Write a new snapshot, replacing any file at ``path`` once it is complete.
+        The records are inserted as they are iterated, so they may be a stream.
+
+        Args:
+            path (Path): Where to write the snapshot.
+            records (Iterable[tuple[str, str | None]]): ``(name, address)`` pairs.
+            block_number (Optional[int]): The block the names were resolved at.
+            registry (Optional[str]): The registry address the names were resolved with.
+
+        Returns:
+            :class:`~ape_ens.snapshot.Snapshot`
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.unlink(missing_ok=True)
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.executescript(_SCHEMA)
+            connection.executemany(
+                "INSERT INTO metadata (key, value) VALUES (?, ?)",
+                [
+                    ("block_number", None if block_number is None else str(block_number)),
+                    ("registry", registry),
+                ],
+            )
+            rows = ((bytes(namehash(name)), name, address) for name, address in records)
+            while chunk := list(islice(rows, _WRITE_CHUNK_SIZE)):
+                connection.executemany(
+                    "INSERT OR REPLACE INTO records (node, name, address) VALUES (?, ?, ?)",
+                    chunk,
+                )
+
+            connection.commit()
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+        temp_path.replace(path)
+        return cls(path)
@@ -0,0 +1,297 @@
+"""
+Deploy ENS to a local test network, so look-ups can be tested end to end
+(and benchmarked) without mocks or a mainnet connection. For the ``local_ens``
+pytest fixture, see :mod:`ape_ens.fixtures`.
+"""
+
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Union
+
+from ape.utils.basemodel import ManagerAccessMixin
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector, keccak
+
+from ape_ens.pool import connection_pool
+from ape_ens.utils.contract_data import registry_abi, registry_bytecode
+from ape_ens.utils.namehash import namehash
+
+if TYPE_CHECKING:
+    from ape.api import AccountAPI
+    from ape.contracts import ContractInstance
+    from ape.types import AddressType
+
+    from ape_ens.ens import ENS
+
+# The default number of names registered per transaction.
+DEFAULT_BATCH_SIZE = 100
+
+SET_ADDR_SELECTOR = function_signature_to_4byte_selector("setAddr(bytes32,address)")
+SET_NAME_SELECTOR = function_signature_to_4byte_selector("setName(bytes32,string)")
+SET_OWNER_SELECTOR = function_signature_to_4byte_selector("setOwner(bytes32,address)")
+SET_RESOLVER_SELECTOR = function_signature_to_4byte_selector("setResolver(bytes32,address)")
+SET_SUBNODE_OWNER_SELECTOR = function_signature_to_4byte_selector(
+    "setSubnodeOwner(bytes32,bytes32,address)"
+)
+
+# Init code returning the runtime code that follows it (13 bytes): PUSH2 <length>, DUP1,
+# PUSH2 13, PUSH1 0, CODECOPY, PUSH1 0, RETURN.
+_DEPLOY_PREFIX = "61{:04x}8061000d6000396000f3"
+
+
+def _deployment_bytecode(runtime: bytes) -> bytes:
+    return bytes.fromhex(_DEPLOY_PREFIX.format(len(runtime))) + runtime
+
+
+def _contract_container(abi: list[dict], bytecode: Union[str, bytes]) -> Any:
+    from ape.contracts import ContractContainer
+    from ethpm_types import ContractType
+
+    if isinstance(bytecode, bytes):
+        bytecode = f"0x{bytecode.hex()}"
+
+    elif not bytecode.startswith("0x"):
+        bytecode = f"0x{bytecode}"
+
+    contract_type = ContractType.model_validate(
+        {"abi": abi, "deploymentBytecode": {"bytecode": bytecode}}
+    )
+    return ContractContainer(contract_type)
+
+
+class LocalENS(ManagerAccessMixin):
+    """
+    ENS deployed to the connected (local) network: a registry, the public resolver,
+    the reverse registrar, and Multicall3. Names are registered in bulk, a batch
+    of names per transaction.
+
+    Args:
+        owner (AccountAPI): The account that deployed ENS and owns the names.
+        registry (ContractInstance): The ENS registry.
+        resolver (ContractInstance): The public resolver all names use.
+        reverse_registrar (ContractInstance): The reverse registrar, which owns
+          ``addr.reverse``, so accounts can set their own names.
+        multicall (ContractInstance): Multicall3.
+    """
+
+    def __init__(
+        self,
+        owner: "AccountAPI",
+        registry: "ContractInstance",
+        resolver: "ContractInstance",
+        reverse_registrar: "ContractInstance",
+        multicall: "ContractInstance",
+    ) -> None:
+        self.owner = owner
+        self.registry = registry
+        self.resolver = resolver
+        self.reverse_registrar = reverse_registrar
+        self.multicall = multicall
+
+    @classmethod
+    def deploy(cls, owner: "AccountAPI") -> "LocalENS":
+        """
+        Deploy ENS and Multicall3 using ``owner``.
+
+        Args:
+            owner (AccountAPI): The account to deploy with. It owns the root node.
+
+        Returns:
+            :class:`~ape_ens.testing.LocalENS`
+        """
+        from ape_ethereum.multicall.constants import AGGREGATE3_METHOD, MULTICALL3_CODE
+        from ens import contract_data  # type: ignore
+
+        # Test networks may not allow setting code at Multicall3's usual address.
+        multicall = owner.deploy(
+            _contract_container([AGGREGATE3_METHOD], _deployment_bytecode(MULTICALL3_CODE))
+        )
+        registry = owner.deploy(_contract_container(registry_abi, registry_bytecode))
+        resolver = owner.deploy(
+            _contract_container(contract_data.resolver_abi, contract_data.resolver_bytecode),
+            registry.address,
+        )
+        reverse_registrar = owner.deploy(
+            _contract_container(
+                contract_data.reverse_registrar_abi, contract_data.reverse_registrar_bytecode
+            ),
+            registry.address,
+            resolver.address,
+        )
+        local_ens = cls(owner, registry, resolver, reverse_registrar, multicall)
+        local_ens._set_reverse_owner(reverse_registrar.address)
+        return local_ens
+
+    def _set_reverse_owner(self, owner: "AddressType") -> None:
+        reverse_node = self._create_node("reverse")
+        self.registry.setSubnodeOwner(reverse_node, keccak(text="addr"), owner, sender=self.owner)
+
+    def _create_node(self, name: str) -> bytes:
+        # Create the name (and its parents), owned by the owner, if needed.
+        node = bytes(namehash(name))
+        if not name or self.registry.owner(node) == self.owner.address:
+            return node
+
+        label, _, parent = name.partition(".")
+        parent_node = self._create_node(parent)
+        self.registry.setSubnodeOwner(
+            parent_node, keccak(text=label), self.owner.address, sender=self.owner
+        )
+        return node
+
+    def register(self, name: str, address: "AddressType", reverse: bool = False) -> None:
+        """
+        Register a name that resolves to an address.
+
+        Args:
+            name (str): The name, such as ``"alice.eth"``.
+            address (AddressType): The address it resolves to.
+            reverse (bool): Set to ``True`` to also make it the address' name.
+        """
+        self.register_many({name: address}, reverse=reverse)
+
+    def register_many(
+        self,
+        names: Mapping[str, "AddressType"],
+        reverse: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """
+        Register many names at once. The parent names are created as needed, and
+        then each batch of names takes one transaction (through Multicall3).
+
+        Args:
+            names (Mapping[str, AddressType]): Each name mapped to the address it resolves to.
+            reverse (bool): Set to ``True`` to also make each name its address' name.
+            batch_size (int): The max number of names per transaction.
+        """
+        self._register(
+            {name: (SET_ADDR_SELECTOR, ["address"], [address]) for name, address in names.items()},
+            batch_size,
+        )
+        if reverse:
+            self.set_reverse_many({address: name for name, address in names.items()}, batch_size)
+
+    def set_reverse_many(
+        self, names: Mapping["AddressType", str], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        """
+        Set the name of many addresses (their reverse records) at once.
+
+        Args:
+            names (Mapping[AddressType, str]): Each address mapped to its name.
+            batch_size (int): The max number of names per transaction.
+        """
+        # Take ``addr.reverse`` back from the reverse registrar while registering.
+        self._set_reverse_owner(self.owner.address)
+        try:
+            self._register(
+                {
+                    f"{address.lower()[2:]}.addr.reverse": (SET_NAME_SELECTOR, ["string"], [name])
+                    for address, name in names.items()
+                },
+                batch_size,
+            )
+        finally:
+            self._set_reverse_owner(self.reverse_registrar.address)
+
+    def set_text(self, name: str, key: str, value: str) -> None:
+        """
+        Set a text record of a registered name.
+
+        Args:
+            name (str): The name.
+            key (str): The text record key, such as ``"avatar"``.
+            value (str): The value.
+        """
+        node = bytes(namehash(name))
+        self.resolver.setText(node, key, value, sender=self.owner)
+
+    def _register(
+        self, records: Mapping[str, tuple[bytes, list[str], list[Any]]], batch_size: int
+    ) -> None:
+        by_parent: dict[str, list[str]] = {}
+        for name in records:
+            by_parent.setdefault(name.partition(".")[2], []).append(name)
+
+        # Multicall3 owns the parent while it creates the names and owns each name
+        # while it sets its records (only the owner may), and then hands them back.
+        registry, resolver = self.registry.address, self.resolver.address
+        multicall, owner = self.multicall.address, self.owner.address
+        batch_size = max(batch_size, 1)
+        for parent, names in by_parent.items():
+            parent_node = self._create_node(parent)
+            self.registry.setOwner(parent_node, multicall, sender=self.owner)
+            for start in range(0, len(names), batch_size):
+                calls = []
+                for name in names[start : start + batch_size]:  # noqa: E203
+                    selector, types, values = records[name]
+                    label = keccak(text=name.partition(".")[0])
+                    node = bytes(namehash(name))
+                    calls += [
+                        _call(
+                            registry,
+                            SET_SUBNODE_OWNER_SELECTOR,
+                            ["bytes32", "bytes32", "address"],
+                            [parent_node, label, multicall],
+                        ),
+                        _call(
+                            registry,
+                            SET_RESOLVER_SELECTOR,
+                            ["bytes32", "address"],
+                            [node, resolver],
+                        ),
+                        _call(resolver, selector, ["bytes32", *types], [node, *values]),
+                        _call(registry, SET_OWNER_SELECTOR, ["bytes32", "address"], [node, owner]),
+                    ]
+
+                if start + batch_size >= len(names):
+                    calls.append(
+                        _call(
+                            registry,
+                            SET_OWNER_SELECTOR,
+                            ["bytes32", "address"],
+                            [parent_node, owner],
+                        )
+                    )
+
+                self.multicall.aggregate3(calls, sender=self.owner)
+
+    def create_ens(self) -> "ENS":
+        """
+        Create an :class:`~ape_ens.ens.ENS` that uses this deployment.
+
+        Returns:
+            :class:`~ape_ens.ens.ENS`
+        """
+        from web3.main import ENS as Web3ENS
+
+        from ape_ens.ens import ENS
+
+        web3 = self.provider.web3  # type: ignore[attr-defined]
+        return ENS(backend=Web3ENS.from_web3(web3, self.registry.address))
+
+    @contextmanager
+    def use(self) -> Iterator["LocalENS"]:
+        """
+        Use this deployment for all ENS look-ups, including conversions: points the
+        ``registry_address`` and ``multicall_address`` config at it and the shared
+        connection (see :mod:`ape_ens.pool`) at the connected provider.
+        """
+        config = {
+            "registry_address": self.registry.address,
+            "multicall_address": self.multicall.address,
+        }
+        with self.local_project.temp_config(ens=config):
+            connection_pool.provider = self.provider  # type: ignore[assignment]
+            try:
+                yield self
+            finally:
+                connection_pool.clear()
+
+
+def _call(
+    target: "AddressType", selector: bytes, types: list[str], values: list[Any]
+) -> tuple["AddressType", bool, bytes]:
+    # A Multicall3 ``aggregate3`` call that must not fail.
+    return target, False, selector + encode(types, values)
@@ -4,7 +4,17 @@ def __getattr__(name: str):
 
         return namehash
 
+    elif name == "namehash_many":
+        from .namehash import namehash_many
+
+        return namehash_many
+
+    elif name == "is_plausible_name":
+        from .names import is_plausible_name
+
+        return is_plausible_name
+
     raise AttributeError(name)
 
 
-__all__ = ["namehash"]
+__all__ = ["is_plausible_name", "namehash", "namehash_many"]
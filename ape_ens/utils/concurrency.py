@@ -0,0 +1,211 @@
+import os
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from functools import cached_property
+from queue import SimpleQueue
+from typing import Any, Generic, Optional, TypeVar
+
+from ape_ens.instrumentation import current_lookup
+
+T = TypeVar("T")
+
+_NOT_FOUND = object()
+
+
+class locked_cached_property(cached_property, Generic[T]):
+    """
+    A ``functools.cached_property`` that computes its value at most once,
+    even when many threads access it for the first time at once.
+    """
+
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        super().__init__(func)
+        self.lock = threading.RLock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        cache = instance.__dict__
+        if (value := cache.get(self.attrname, _NOT_FOUND)) is not _NOT_FOUND:
+            return value
+
+        with self.lock:
+            # Check again, in case another thread finished first.
+            if (value := cache.get(self.attrname, _NOT_FOUND)) is _NOT_FOUND:
+                value = self.func(instance)
+                cache[self.attrname] = value
+
+        return value
+
+
+class ForkGuard:
+    """
+    Detects when the process forked. Connections, such as HTTP sessions and
+    SQLite connections, cannot be shared with forked processes, so the objects
+    holding them check :meth:`~ape_ens.utils.concurrency.ForkGuard.forked`
+    before using them and reconnect when it is ``True``.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+
+    def forked(self) -> bool:
+        """
+        Check if this is another process than when last checked.
+
+        Returns:
+            bool
+        """
+        if (pid := os.getpid()) == self.pid:
+            return False
+
+        self.pid = pid
+        return True
+
+
+def thread_connection(local: threading.local, connect: Callable[[], T]) -> T:
+    """
+    Get the connection of the current thread, for connections that cannot be
+    shared across threads either (such as SQLite's). It connects on first use,
+    and again after forking (see :class:`~ape_ens.utils.concurrency.ForkGuard`).
+
+    Args:
+        local (threading.local): Where to keep the connections.
+        connect (Callable[[], T]): Makes a new connection.
+
+    Returns:
+        T: The connection.
+    """
+    if getattr(local, "connection", None) is None or local.fork_guard.forked():
+        local.fork_guard = ForkGuard()
+        local.connection = connect()
+
+    return local.connection
+
+
+class DaemonExecutor:
+    """
+    Runs functions one at a time on a daemon thread, started on first use. Unlike
+    a ``ThreadPoolExecutor``, whose threads are joined when the interpreter exits,
+    pending work (such as a slow mainnet call) does not keep the process alive.
+
+    Args:
+        name (str): The name of the thread.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._queue: Optional[SimpleQueue] = None
+        self._lock = threading.Lock()
+        self._fork_guard = ForkGuard()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Run a function in the background.
+
+        Args:
+            fn (Callable[..., T]): The function.
+            *args: Its arguments.
+
+        Returns:
+            Future[T]: The future of its result.
+        """
+        future: Future[T] = Future()
+        with self._lock:
+            # Threads do not survive forking.
+            if (queue := self._queue) is None or self._fork_guard.forked():
+                queue = SimpleQueue()
+                thread = threading.Thread(target=self._run, args=(queue,), name=self.name)
+                thread.daemon = True
+                thread.start()
+                self._queue = queue
+
+            queue.put((future, fn, args))
+
+        return future
+
+    @staticmethod
+    def _run(queue: SimpleQueue) -> None:
+        while True:
+            future, fn, args = queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = fn(*args)
+            except BaseException as err:
+                future.set_exception(err)
+            else:
+                future.set_result(result)
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.rpc_calls = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight, other
+    threads asking for the same key wait for it and share its result (or error)
+    rather than making their own call. The RPC calls it made are credited to
+    each of their look-ups (see :mod:`ape_ens.instrumentation`).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[T]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Call ``fn``, unless a call for ``key`` is already in flight,
+        in which case wait for it and return its result.
+
+        Args:
+            key (Hashable): Identifies the call.
+            fn (Callable[[], T]): Makes the call.
+
+        Returns:
+            T: The result of ``fn``.
+        """
+        with self._lock:
+            if (call := self._calls.get(key)) is None:
+                call = _Call()
+                self._calls[key] = call
+                is_leader = True
+            else:
+                is_leader = False
+
+        if not is_leader:
+            call.done.wait()
+            if (lookup := current_lookup()) is not None:
+                lookup[0] += call.rpc_calls
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result  # type: ignore[return-value]
+
+        lookup = current_lookup()
+        rpc_calls = lookup[0] if lookup is not None else 0
+        try:
+            call.result = fn()
+        except BaseException as err:
+            call.error = err
+            raise
+
+        finally:
+            if lookup is not None:
+                call.rpc_calls = lookup[0] - rpc_calls
+
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
@@ -0,0 +1,178 @@
+"""
+Compiled ENS contracts for deploying ENS to a local network (see :mod:`ape_ens.testing`).
+
+The ``ENSRegistry`` is from the ``ens`` 1.0.0 ethPM package (ENSRegistry.sol of
+https://github.com/ensdomains/ens, BSD-2-Clause), as bundled with web3.py v5.
+"""
+
+registry_abi: list[dict] = [
+    {
+        "constant": True,
+        "inputs": [{"name": "node", "type": "bytes32"}],
+        "name": "resolver",
+        "outputs": [{"name": "", "type": "address"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "constant": True,
+        "inputs": [{"name": "node", "type": "bytes32"}],
+        "name": "owner",
+        "outputs": [{"name": "", "type": "address"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "node", "type": "bytes32"},
+            {"name": "label", "type": "bytes32"},
+            {"name": "owner", "type": "address"},
+        ],
+        "name": "setSubnodeOwner",
+        "outputs": [],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [{"name": "node", "type": "bytes32"}, {"name": "ttl", "type": "uint64"}],
+        "name": "setTTL",
+        "outputs": [],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "constant": True,
+        "inputs": [{"name": "node", "type": "bytes32"}],
+        "name": "ttl",
+        "outputs": [{"name": "", "type": "uint64"}],
+        "payable": False,
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [{"name": "node", "type": "bytes32"}, {"name": "resolver", "type": "address"}],
+        "name": "setResolver",
+        "outputs": [],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "constant": False,
+        "inputs": [{"name": "node", "type": "bytes32"}, {"name": "owner", "type": "address"}],
+        "name": "setOwner",
+        "outputs": [],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {"inputs": [], "payable": False, "stateMutability": "nonpayable", "type": "constructor"},
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "node", "type": "bytes32"},
+            {"indexed": True, "name": "label", "type": "bytes32"},
+            {"indexed": False, "name": "owner", "type": "address"},
+        ],
+        "name": "NewOwner",
+        "type": "event",
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "node", "type": "bytes32"},
+            {"indexed": False, "name": "owner", "type": "address"},
+        ],
+        "name": "Transfer",
+        "type": "event",
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "node", "type": "bytes32"},
+            {"indexed": False, "name": "resolver", "type": "address"},
+        ],
+        "name": "NewResolver",
+        "type": "event",
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "node", "type": "bytes32"},
+            {"indexed": False, "name": "ttl", "type": "uint64"},
+        ],
+        "name": "NewTTL",
+        "type": "event",
+    },
+]
+
+registry_bytecode = (
+    "0x608060405234801561001057600080fd5b503360008080600102600019168152602001908152602001"
+    "60002060000160006101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373"
+    "ffffffffffffffffffffffffffffffffffffffff1602179055506109778061007b6000396000f3006080"
+    "60405260043610610083576000357c010000000000000000000000000000000000000000000000000000"
+    "0000900463ffffffff1680630178b8bf1461008857806302571be3146100f957806306ab59231461016a"
+    "57806314ab9038146101c957806316a25cbd1461020e5780631896f70a146102675780635b0fc9c31461"
+    "02b8575b600080fd5b34801561009457600080fd5b506100b76004803603810190808035600019169060"
+    "200190929190505050610309565b604051808273ffffffffffffffffffffffffffffffffffffffff1673"
+    "ffffffffffffffffffffffffffffffffffffffff16815260200191505060405180910390f35b34801561"
+    "010557600080fd5b50610128600480360381019080803560001916906020019092919050505061035056"
+    "5b604051808273ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffff"
+    "ffffffffffffff16815260200191505060405180910390f35b34801561017657600080fd5b506101c760"
+    "048036038101908080356000191690602001909291908035600019169060200190929190803573ffffff"
+    "ffffffffffffffffffffffffffffffffff169060200190929190505050610397565b005b3480156101d5"
+    "57600080fd5b5061020c6004803603810190808035600019169060200190929190803567ffffffffffff"
+    "ffff16906020019092919050505061057d565b005b34801561021a57600080fd5b5061023d6004803603"
+    "81019080803560001916906020019092919050505061068e565b604051808267ffffffffffffffff1667"
+    "ffffffffffffffff16815260200191505060405180910390f35b34801561027357600080fd5b506102b6"
+    "6004803603810190808035600019169060200190929190803573ffffffffffffffffffffffffffffffff"
+    "ffffffff1690602001909291905050506106c9565b005b3480156102c457600080fd5b50610307600480"
+    "3603810190808035600019169060200190929190803573ffffffffffffffffffffffffffffffffffffff"
+    "ff16906020019092919050505061080a565b005b60008060008360001916600019168152602001908152"
+    "60200160002060010160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff16"
+    "9050919050565b6000806000836000191660001916815260200190815260200160002060000160009054"
+    "906101000a900473ffffffffffffffffffffffffffffffffffffffff169050919050565b6000833373ff"
+    "ffffffffffffffffffffffffffffffffffffff1660008083600019166000191681526020019081526020"
+    "0160002060000160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff1673ff"
+    "ffffffffffffffffffffffffffffffffffffff1614151561041157600080fd5b84846040516020018083"
+    "600019166000191681526020018260001916600019168152602001925050506040516020818303038152"
+    "906040526040518082805190602001908083835b60208310151561047e57805182526020820191506020"
+    "81019050602083039250610459565b6001836020036101000a0380198251168184511680821785525050"
+    "5050505090500191505060405180910390209150836000191685600019167fce0457fe73731f824cc272"
+    "376169235128c118b49d344817417c6d108d155e8285604051808273ffffffffffffffffffffffffffff"
+    "ffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1681526020019150506040518091"
+    "0390a382600080846000191660001916815260200190815260200160002060000160006101000a815481"
+    "73ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffffffffffffffffffffffff"
+    "ffffffffff1602179055505050505050565b813373ffffffffffffffffffffffffffffffffffffffff16"
+    "600080836000191660001916815260200190815260200160002060000160009054906101000a900473ff"
+    "ffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16"
+    "1415156105f557600080fd5b82600019167f1d4f9bbfc9cab89d66e1a1562f2233ccbf1308cb4f63de2e"
+    "ad5787adddb8fa6883604051808267ffffffffffffffff1667ffffffffffffffff168152602001915050"
+    "60405180910390a281600080856000191660001916815260200190815260200160002060010160146101"
+    "000a81548167ffffffffffffffff021916908367ffffffffffffffff160217905550505050565b600080"
+    "6000836000191660001916815260200190815260200160002060010160149054906101000a900467ffff"
+    "ffffffffffff169050919050565b813373ffffffffffffffffffffffffffffffffffffffff1660008083"
+    "6000191660001916815260200190815260200160002060000160009054906101000a900473ffffffffff"
+    "ffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff1614151561"
+    "074157600080fd5b82600019167f335721b01866dc23fbee8b6b2c7b1e14d6f05c28cd35a2c934239f94"
+    "095602a083604051808273ffffffffffffffffffffffffffffffffffffffff1673ffffffffffffffffff"
+    "ffffffffffffffffffffff16815260200191505060405180910390a28160008085600019166000191681"
+    "5260200190815260200160002060010160006101000a81548173ffffffffffffffffffffffffffffffff"
+    "ffffffff021916908373ffffffffffffffffffffffffffffffffffffffff160217905550505050565b81"
+    "3373ffffffffffffffffffffffffffffffffffffffff1660008083600019166000191681526020019081"
+    "5260200160002060000160009054906101000a900473ffffffffffffffffffffffffffffffffffffffff"
+    "1673ffffffffffffffffffffffffffffffffffffffff1614151561088257600080fd5b82600019167fd4"
+    "735d920b0f87494915f556dd9b54c8f309026070caea5c737245152564d26683604051808273ffffffff"
+    "ffffffffffffffffffffffffffffffff1673ffffffffffffffffffffffffffffffffffffffff16815260"
+    "200191505060405180910390a28160008085600019166000191681526020019081526020016000206000"
+    "0160006101000a81548173ffffffffffffffffffffffffffffffffffffffff021916908373ffffffffff"
+    "ffffffffffffffffffffffffffffff1602179055505050505600a165627a7a7230582056008d06b44e6c"
+    "fd9a8e4b8a63f7ac2650d3855c0ffe3ca9765a7f80d7bb5ec60029"
+)
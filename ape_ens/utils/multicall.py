@@ -0,0 +1,151 @@
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Union
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+
+if TYPE_CHECKING:
+    from web3 import Web3
+    from web3.types import BlockIdentifier
+
+# https://github.com/mds1/multicall (same address on mainnet and most other chains).
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+AGGREGATE3_SELECTOR = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+RESOLVER_SELECTOR = function_signature_to_4byte_selector("resolver(bytes32)")
+ADDR_SELECTOR = function_signature_to_4byte_selector("addr(bytes32)")
+NAME_SELECTOR = function_signature_to_4byte_selector("name(bytes32)")
+OWNER_SELECTOR = function_signature_to_4byte_selector("owner(bytes32)")
+# ENSIP-9 (multi-coin addresses).
+COIN_ADDR_SELECTOR = function_signature_to_4byte_selector("addr(bytes32,uint256)")
+TEXT_SELECTOR = function_signature_to_4byte_selector("text(bytes32,string)")
+CONTENTHASH_SELECTOR = function_signature_to_4byte_selector("contenthash(bytes32)")
+# ENSIP-10 (wildcard resolution).
+RESOLVE_SELECTOR = function_signature_to_4byte_selector("resolve(bytes,bytes)")
+
+DEFAULT_BATCH_SIZE = 500
+
+Call = tuple[str, bytes]
+"""A ``(target, calldata)`` pair."""
+
+Result = tuple[bool, bytes]
+"""A ``(success, return_data)`` pair."""
+
+
+def encode_node_call(selector: bytes, node: bytes) -> bytes:
+    """
+    Encode calldata for a ``fn(bytes32 node)`` ENS function.
+
+    Args:
+        selector (bytes): The 4-byte function selector.
+        node (bytes): The 32-byte namehash.
+
+    Returns:
+        bytes
+    """
+    return selector + encode(["bytes32"], [node])
+
+
+def encode_coin_addr_call(node: bytes, coin_type: int) -> bytes:
+    """
+    Encode calldata for an ENSIP-9 ``addr(bytes32 node, uint256 coinType)`` call.
+
+    Args:
+        node (bytes): The 32-byte namehash.
+        coin_type (int): The SLIP-44 (or ENSIP-11) coin type.
+
+    Returns:
+        bytes
+    """
+    return COIN_ADDR_SELECTOR + encode(["bytes32", "uint256"], [node, coin_type])
+
+
+def encode_text_call(node: bytes, key: str) -> bytes:
+    """
+    Encode calldata for a ``text(bytes32 node, string key)`` call.
+
+    Args:
+        node (bytes): The 32-byte namehash.
+        key (str): The text record key, such as ``"avatar"``.
+
+    Returns:
+        bytes
+    """
+    return TEXT_SELECTOR + encode(["bytes32", "string"], [node, key])
+
+
+def encode_resolve_call(dns_name: bytes, data: bytes) -> bytes:
+    """
+    Encode calldata for an ENSIP-10 ``resolve(bytes name, bytes data)`` call.
+
+    Args:
+        dns_name (bytes): The DNS-encoded name.
+        data (bytes): The calldata of the wrapped resolver call, such as ``addr(node)``.
+
+    Returns:
+        bytes
+    """
+    return RESOLVE_SELECTOR + encode(["bytes", "bytes"], [dns_name, data])
+
+
+def decode_bytes(data: bytes) -> bytes:
+    """
+    Decode a single ABI-encoded ``bytes`` return value.
+    """
+    return decode(["bytes"], data)[0]
+
+
+def decode_address(data: bytes) -> str:
+    """
+    Decode a single ABI-encoded ``address`` return value.
+    """
+    return decode(["address"], data)[0]
+
+
+def decode_string(data: bytes) -> str:
+    """
+    Decode a single ABI-encoded ``string`` return value.
+    """
+    return decode(["string"], data)[0]
+
+
+def aggregate3(
+    web3: "Web3",
+    calls: Sequence[Call],
+    block_identifier: Union["BlockIdentifier", None] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    address: str = MULTICALL3_ADDRESS,
+) -> list[Result]:
+    """
+    Execute many read-only calls using Multicall3's ``aggregate3``, allowing
+    each individual call to fail. Calls are split into chunks of ``batch_size``
+    so a single ``eth_call`` does not exceed the node's gas limits.
+
+    Args:
+        web3 (Web3): The connection to make the calls with.
+        calls (Sequence[Call]): ``(target, calldata)`` pairs.
+        block_identifier (BlockIdentifier | None): The block to call at.
+          Defaults to ``"latest"``.
+        batch_size (int): The max number of calls per ``eth_call``.
+        address (str): The Multicall3 address. Defaults to its usual address.
+
+    Returns:
+        list[Result]: ``(success, return_data)`` pairs, in the same order as ``calls``.
+    """
+    results: list[Result] = []
+    batch_size = max(batch_size, 1)
+    for start in range(0, len(calls), batch_size):
+        end = start + batch_size
+        chunk = calls[start:end]
+        data = AGGREGATE3_SELECTOR + encode(
+            ["(address,bool,bytes)[]"], [[(target, True, calldata) for target, calldata in chunk]]
+        )
+        tx = {"to": address, "data": data}
+        raw = web3.eth.call(tx, block_identifier or "latest")  # type: ignore[arg-type]
+        decoded = decode(["(bool,bytes)[]"], bytes(raw))[0]
+        if len(decoded) != len(chunk):
+            raise ValueError("Multicall3 returned an unexpected number of results.")
+
+        results.extend((bool(success), bytes(data)) for success, data in decoded)
+
+    return results
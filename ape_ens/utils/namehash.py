@@ -1,16 +1,41 @@
 import codecs
 import functools
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from types import SimpleNamespace
+from typing import Optional
 
 from eth_utils import is_bytes, keccak
 from hexbytes import HexBytes
 
-try:
-    from ens.utils import raw_name_to_hash  # type: ignore
-except ImportError:
-    raw_name_to_hash = None
-
 # https://github.com/ethereum/EIPs/blob/master/EIPS/eip-137.md#namehash-algorithm
 
+EMPTY_NODE = b"\x00" * 32
+
+# The max number of parent nodes (e.g. ``ourapp.eth``) to memoize.
+PARENT_CACHE_SIZE = 4096
+
+# Lowercase ASCII labels matching this (and without "--" as the 3rd and 4th
+# characters) are already normalized, so they skip full ENSIP-15 normalization.
+_NORMALIZED_ASCII_LABEL = re.compile(r"_*[a-z0-9$-]+")
+
+
+@functools.cache
+def _ens_utils() -> Optional[SimpleNamespace]:
+    # ``ens`` (part of ``web3``) is slow to import, so it is only
+    # imported the first time a name is hashed.
+    try:
+        from ens.exceptions import InvalidName  # type: ignore
+        from ens.utils import normalize_name, raw_name_to_hash  # type: ignore
+    except ImportError:
+        return None
+
+    return SimpleNamespace(
+        InvalidName=InvalidName, normalize_name=normalize_name, raw_name_to_hash=raw_name_to_hash
+    )
+
 
 def _combine(f, g):
     return lambda x: f(g(x))
@@ -45,6 +70,136 @@ def _manual_namehash(name: str, encoding=None) -> HexBytes:
     return HexBytes(node)
 
 
+class _ParentNodeCache:
+    """
+    A bounded, thread-safe LRU memo of parent names to their nodes.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._nodes: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            if (node := self._nodes.get(name)) is not None:
+                self._nodes.move_to_end(name)
+
+            return node
+
+    def set(self, name: str, node: bytes) -> None:
+        with self._lock:
+            self._nodes[name] = node
+            self._nodes.move_to_end(name)
+            if len(self._nodes) > self.max_size:
+                self._nodes.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+
+_parent_nodes = _ParentNodeCache(PARENT_CACHE_SIZE)
+
+
+class _FullNormalization(Exception):
+    # A label normalized to something containing a dot, so labels cannot
+    # be normalized on their own; normalize the whole name instead.
+    pass
+
+
+@functools.lru_cache(maxsize=PARENT_CACHE_SIZE)
+def _normalize_label(label: str) -> str:
+    return _ens_utils().normalize_name(label)  # type: ignore[union-attr]
+
+
+def _label_hash(label: str) -> bytes:
+    if (utils := _ens_utils()) is not None:
+        if not label:
+            raise utils.InvalidName("Labels cannot be empty")
+
+        elif label.isascii() and (
+            _NORMALIZED_ASCII_LABEL.fullmatch(lowered := label.lower()) and lowered[2:4] != "--"
+        ):
+            label = lowered
+
+        else:
+            label = _normalize_label(label)
+            if "." in label:
+                raise _FullNormalization()
+
+    return keccak(label.encode("utf8"))
+
+
+def _node(name: str, batch_nodes: Optional[dict[str, bytes]] = None) -> bytes:
+    # Find the longest suffix (parent) already hashed. Labels are
+    # normalized independently (ENSIP-15), so this is the same as
+    # normalizing the whole name first.
+    labels = name.split(".")
+    node = EMPTY_NODE
+    start = len(labels)
+    suffix_offset = len(name) + 1
+    offset = 0
+    for index in range(1, len(labels)):
+        offset += len(labels[index - 1]) + 1
+        parent = name[offset:]
+        if (batch_nodes is not None and (cached := batch_nodes.get(parent)) is not None) or (
+            cached := _parent_nodes.get(parent)
+        ) is not None:
+            node, start, suffix_offset = cached, index, offset
+            break
+
+    # Hash the remaining labels, from the TLD down, memoizing each parent.
+    for index in range(start - 1, -1, -1):
+        node = keccak(node + _label_hash(labels[index]))
+        suffix_offset -= len(labels[index]) + 1
+        if index > 0:
+            parent = name[suffix_offset:]
+            _parent_nodes.set(parent, node)
+            if batch_nodes is not None:
+                batch_nodes[parent] = node
+
+    return node
+
+
+def _fast_namehash(name: str, batch_nodes: Optional[dict[str, bytes]] = None) -> HexBytes:
+    if is_bytes(name):
+        name = name.decode("utf8")  # type: ignore[attr-defined]
+
+    if not name or (_ens_utils() is not None and name.strip() in ("", ".")):
+        return HexBytes(EMPTY_NODE)
+
+    try:
+        return HexBytes(_node(name, batch_nodes=batch_nodes))
+    except _FullNormalization:
+        return _ens_utils().raw_name_to_hash(name)  # type: ignore[union-attr]
+
+
 def namehash(name: str) -> HexBytes:
-    namehash_func = raw_name_to_hash if raw_name_to_hash else _manual_namehash
-    return namehash_func(name)
+    """
+    Get the namehash (node) of an ENS name. The names are normalized (ENSIP-15)
+    when ``web3`` is installed. The nodes of parent names are memoized, so hashing
+    many subdomains of the same name only costs one new hash each.
+
+    Args:
+        name (str): The ENS name.
+
+    Returns:
+        HexBytes
+    """
+    return _fast_namehash(name)
+
+
+def namehash_many(names: Iterable[str]) -> list[HexBytes]:
+    """
+    Get the namehashes of many ENS names. Parent names shared within
+    the batch are only hashed once.
+
+    Args:
+        names (Iterable[str]): The ENS names.
+
+    Returns:
+        list[HexBytes]: The nodes, in the same order as ``names``.
+    """
+    batch_nodes: dict[str, bytes] = {}
+    return [_fast_namehash(name, batch_nodes=batch_nodes) for name in names]
@@ -0,0 +1,107 @@
+import string
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Optional
+
+# The only ASCII characters that may appear in a normalized (ENSIP-15) name.
+_ASCII_NAME_CHARACTERS = frozenset(f"$'-_.{string.ascii_letters}{string.digits}")
+
+# ``.eth`` and DNS TLDs commonly imported into ENS using DNSSEC.
+DEFAULT_SUFFIXES = (
+    "eth",
+    "art",
+    "box",
+    "cc",
+    "club",
+    "co",
+    "com",
+    "id",
+    "io",
+    "kred",
+    "luxe",
+    "me",
+    "net",
+    "org",
+    "xyz",
+)
+
+
+def is_plausible_name(name: str) -> bool:
+    """
+    Returns False if the value cannot be an ENS name, using only cheap checks
+    (no normalization or network connection). Use this to quickly rule out
+    values such as ``"v1.2"`` or ``"data.txt"`` before checking further.
+
+    Args:
+        name (str): The name to check.
+
+    Returns:
+        bool
+    """
+    if "." not in name or name[0] == "." or name[-1] == "." or ".." in name:
+        # No TLD or empty labels.
+        return False
+
+    elif name.rpartition(".")[-1].isdigit():
+        # Version numbers and decimals; TLDs are never numeric.
+        return False
+
+    # Non-ASCII names need full normalization to know.
+    return not name.isascii() or _ASCII_NAME_CHARACTERS.issuperset(name)
+
+
+class SuffixAllowlist:
+    """
+    An offline check of whether a name ends in a suffix (e.g. ``.eth``) that ENS
+    may resolve, so other dotted strings (e.g. ``foo.txt``) are rejected without
+    normalizing them or connecting.
+
+    Args:
+        suffixes (Optional[Iterable[str]]): The allowed suffixes, e.g. ``["eth", "xyz"]``.
+          ``None`` allows all names.
+        names (Iterable[str]): Names to always allow, such as hardcoded entries.
+    """
+
+    def __init__(self, suffixes: Optional[Iterable[str]], names: Iterable[str] = ()) -> None:
+        self.suffixes = None if suffixes is None else tuple(normalize_suffix(s) for s in suffixes)
+        self.names = frozenset(names)
+
+    def __contains__(self, name: str) -> bool:
+        if self.suffixes is None or name in self.names:
+            return True
+
+        # Non-ASCII names need full normalization to know.
+        return name.lower().endswith(self.suffixes) or not name.isascii()
+
+
+def get_suffix_allowlist(suffixes: Optional[Iterable[str]]) -> SuffixAllowlist:
+    """
+    Get the allowlist of the given suffixes. Allowlists are cached by their suffixes,
+    so callers can cheaply get the one of the current config on each check, rather
+    than keeping one that goes stale when the config changes.
+
+    Args:
+        suffixes (Optional[Iterable[str]]): The allowed suffixes. ``None`` allows all names.
+
+    Returns:
+        :class:`~ape_ens.utils.names.SuffixAllowlist`
+    """
+    return _get_suffix_allowlist(None if suffixes is None else tuple(suffixes))
+
+
+@lru_cache(maxsize=16)
+def _get_suffix_allowlist(suffixes: Optional[tuple[str, ...]]) -> SuffixAllowlist:
+    return SuffixAllowlist(suffixes)
+
+
+def normalize_suffix(suffix: str) -> str:
+    """
+    Lowercase a suffix and prefix it with a ``"."``, so it only matches whole labels.
+
+    Args:
+        suffix (str): The suffix, e.g. ``"ETH"`` or ``".eth"``.
+
+    Returns:
+        str
+    """
+    return f".{suffix.strip().lstrip('.').lower()}"
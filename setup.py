@@ -8,6 +8,7 @@ extras_require = {
         "pytest-xdist",  # Multi-process runner
         "pytest-cov",  # Coverage analyzer plugin
         "pytest-mock",  # For creating mocks
+        "pytest-benchmark",  # For performance benchmarks
         "ape-polygon",  # For testing against another network named 'mainnet'
     ],
     "lint": [
@@ -28,6 +29,12 @@ extras_require = {
     "doc": [
         "sphinx-ape",
     ],
+    "prometheus": [
+        "prometheus-client",  # For `PrometheusInstrumentation`
+    ],
+    "opentelemetry": [
+        "opentelemetry-api",  # For `OpenTelemetryInstrumentation`
+    ],
     "release": [  # `release` GitHub Action job uses this
         "setuptools>=75.6.0",  # Installation tool
         "setuptools-scm",  # Installation tool
@@ -68,7 +75,7 @@ setup(
     url="https://github.com/ApeWorX/ape-ens",
     include_package_data=True,
     install_requires=[
-        "eth-ape>=0.8.25,<0.9",
+        "eth-ape>=0.8.26,<0.9",
         "web3>=6.20.1,<8",
     ],
     entry_points={
@@ -0,0 +1,29 @@
+import pytest
+
+# A mix of values Ape may ask the converter about.
+VALUES = ("vitalik.eth", "test.eth", "v1.2", "data.txt", "nope.eth", "transfer", "0x12")
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000)
+
+
+@pytest.mark.benchmark(group="is-convertible")
+@pytest.mark.parametrize("size", BATCH_SIZES)
+def test_is_convertible(benchmark, converter, size):
+    values = [VALUES[i % len(VALUES)] for i in range(size)]
+
+    def run():
+        return [converter.is_convertible(v) for v in values]
+
+    result = benchmark(run)
+    assert len(result) == size
+
+
+@pytest.mark.benchmark(group="convert")
+@pytest.mark.parametrize("size", BATCH_SIZES)
+def test_convert(benchmark, converter, size):
+    values = ["vitalik.eth" if i % 2 else "test.eth" for i in range(size)]
+
+    def run():
+        return [converter.convert(v) for v in values]
+
+    result = benchmark(run)
+    assert len(result) == size
@@ -0,0 +1,54 @@
+import pytest
+
+from tests.conftest import REGISTRY
+
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000)
+
+
+@pytest.fixture
+def bench_names(mock_web3_ens):
+    """
+    Register many names in the stand-in registry.
+    """
+    names = [f"{i}.bench.eth" for i in range(max(BATCH_SIZES))]
+    for index, name in enumerate(names):
+        mock_web3_ens.w3.eth.register(name, f"0x{index + 1:040x}")
+
+    return names
+
+
+@pytest.mark.benchmark(group="resolve")
+def test_resolve_cache_hit(benchmark, ens):
+    ens.resolve("vitalik.eth")
+    result = benchmark(ens.resolve, "vitalik.eth")
+    assert result == REGISTRY["vitalik.eth"]
+
+
+@pytest.mark.benchmark(group="resolve")
+def test_resolve_cache_miss(benchmark, ens):
+    result = benchmark(ens.resolve, "vitalik.eth", use_cache=False)
+    assert result == REGISTRY["vitalik.eth"]
+
+
+@pytest.mark.benchmark(group="resolve")
+def test_resolve_negative_cache_hit(benchmark, ens):
+    ens.resolve("nope.eth")
+    assert benchmark(ens.resolve, "nope.eth") is None
+
+
+@pytest.mark.benchmark(group="resolve-many")
+@pytest.mark.parametrize("size", BATCH_SIZES)
+def test_resolve_many_cache_miss(benchmark, ens, bench_names, size):
+    names = bench_names[:size]
+    result = benchmark(ens.resolve_many, names, use_cache=False)
+    assert len(result) == size
+
+
+@pytest.mark.benchmark(group="resolve-many-cached")
+@pytest.mark.parametrize("size", BATCH_SIZES)
+def test_resolve_many_cache_hit(benchmark, ens, bench_names, size):
+    names = bench_names[:size]
+    ens.local_registry.max_entries = None
+    ens.resolve_many(names)
+    result = benchmark(ens.resolve_many, names)
+    assert len(result) == size
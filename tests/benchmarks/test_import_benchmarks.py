@@ -0,0 +1,76 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are slow to import and must only be loaded on the first real ENS operation.
+HEAVY_MODULES = ("web3", "ens")
+PLUGIN_MODULES = (
+    "ape_ens",
+    "ape_ens.converter",
+    "ape_ens.ens",
+    "ape_ens.indexer",
+    "ape_ens.pool",
+    "ape_ens.utils.namehash",
+)
+
+
+def import_time(code: str) -> dict[str, int]:
+    """
+    Run ``code`` in a new interpreter with ``-X importtime``.
+
+    Returns:
+        dict[str, int]: The cumulative import time (in microseconds) of each module imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+
+    return times
+
+
+def heavy_imports(times: dict[str, int]) -> list[str]:
+    return [m for m in times if m.split(".")[0] in HEAVY_MODULES]
+
+
+@pytest.mark.parametrize("module", PLUGIN_MODULES)
+def test_import_defers_web3(module):
+    times = import_time(f"import {module}")
+    assert module in times
+    assert heavy_imports(times) == []
+
+
+def test_prefiltered_conversion_defers_ens():
+    # NOTE: Ape itself may load ``web3`` when creating converters.
+    code = (
+        "from ape_ens.converter import ENSConversions\n"
+        "assert not ENSConversions().is_convertible('v1.2')"
+    )
+    times = import_time(code)
+    assert "ape_ens.ens" not in times
+    assert "ens" not in times
+
+
+@pytest.mark.benchmark(group="import")
+@pytest.mark.parametrize("module", ("ape_ens.converter", "ape_ens.ens"))
+def test_import(benchmark, module):
+    times = benchmark.pedantic(import_time, args=(f"import {module}",), rounds=3)
+    benchmark.extra_info["import_time_us"] = times[module]
+
+
+@pytest.mark.benchmark(group="first-call")
+def test_first_namehash(benchmark):
+    # The first name hashed loads ENSIP-15 normalization.
+    code = "from ape_ens.utils.namehash import namehash\nnamehash('vitalik.eth')"
+    times = benchmark.pedantic(import_time, args=(code,), rounds=3)
+    assert "ens.utils" in times
@@ -0,0 +1,20 @@
+import pytest
+
+from ape_ens.ens import ENS
+
+
+@pytest.mark.benchmark(group="local-resolve-many")
+@pytest.mark.parametrize("local_ens_names", [10, 100], indirect=True)
+def test_resolve_many(benchmark, local_ens_names):
+    ens = ENS()
+    result = benchmark(ens.resolve_many, local_ens_names, use_cache=False)
+    assert result == local_ens_names
+
+
+@pytest.mark.benchmark(group="local-name-many")
+@pytest.mark.parametrize("local_ens_names", [10, 100], indirect=True)
+def test_name_many(benchmark, local_ens_names):
+    ens = ENS()
+    addresses = list(local_ens_names.values())
+    result = benchmark(ens.name_many, addresses, use_cache=False)
+    assert len(result) == len(addresses)
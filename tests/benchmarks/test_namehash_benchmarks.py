@@ -0,0 +1,38 @@
+import pytest
+from ens.utils import raw_name_to_hash
+
+from ape_ens.utils.namehash import _manual_namehash, _parent_nodes, namehash, namehash_many
+
+SHORT_NAMES = ["eth", "foo.eth", "vitalik.eth"]
+# Many subdomains of the same parent.
+SUBDOMAINS = [f"{i}.ourapp.eth" for i in range(100)]
+DEEP_NAME = "a.b.c.d.e.f.g.h.ourapp.eth"
+IMPLEMENTATIONS = {
+    "raw_name_to_hash": lambda names: [raw_name_to_hash(n) for n in names],
+    "manual": lambda names: [_manual_namehash(n) for n in names],
+    "namehash": lambda names: [namehash(n) for n in names],
+    "namehash_many": namehash_many,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    _parent_nodes.clear()
+
+
+@pytest.mark.benchmark(group="namehash-short")
+@pytest.mark.parametrize("implementation", IMPLEMENTATIONS)
+def test_short_names(benchmark, implementation):
+    benchmark(IMPLEMENTATIONS[implementation], SHORT_NAMES)
+
+
+@pytest.mark.benchmark(group="namehash-subdomains")
+@pytest.mark.parametrize("implementation", IMPLEMENTATIONS)
+def test_subdomains(benchmark, implementation):
+    benchmark(IMPLEMENTATIONS[implementation], SUBDOMAINS)
+
+
+@pytest.mark.benchmark(group="namehash-deep")
+@pytest.mark.parametrize("implementation", IMPLEMENTATIONS)
+def test_deep_name(benchmark, implementation):
+    benchmark(IMPLEMENTATIONS[implementation], [DEEP_NAME])
@@ -1,11 +1,34 @@
+import json
+import threading
+import time
 from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import cast
 
 import pytest
 from ape.types import AddressType
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_bytes, to_checksum_address
+from web3.exceptions import ContractLogicError
 
+from ape_ens.ccip import OFFCHAIN_LOOKUP_SELECTOR
 from ape_ens.converter import ENSConversions
 from ape_ens.ens import ENS
+from ape_ens.utils.multicall import (
+    ADDR_SELECTOR,
+    AGGREGATE3_SELECTOR,
+    COIN_ADDR_SELECTOR,
+    CONTENTHASH_SELECTOR,
+    MULTICALL3_ADDRESS,
+    NAME_SELECTOR,
+    OWNER_SELECTOR,
+    RESOLVE_SELECTOR,
+    RESOLVER_SELECTOR,
+    TEXT_SELECTOR,
+)
+from ape_ens.utils.namehash import namehash
+
+pytest_plugins = ["ape_ens.fixtures"]
 
 ADDRESS = cast(AddressType, "0xe2222bb6633228143C4Ce8fC4642aa33b857B332")
 negative_tests = pytest.mark.parametrize(
@@ -18,6 +41,272 @@ negative_tests = pytest.mark.parametrize(
     ),
 )
 REGISTRY = {"test.eth": ADDRESS, "vitalik.eth": "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"}
+REGISTRY_ADDRESS = "0x00000000000C2E074eC69A0dFb2997BA6C7d2e1e"
+RESOLVER_ADDRESS = "0x231b0Ee14048e9dCcD1d247744d114a4EB5E8E63"
+OFFCHAIN_RESOLVER_ADDRESS = "0x7CE6Cf740075B5AF6b1681d67136B84431B43AbD"
+RESOLVE_WITH_PROOF_SELECTOR = function_signature_to_4byte_selector("resolveWithProof(bytes,bytes)")
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def dns_decode(dns_name: bytes) -> str:
+    labels, offset = [], 0
+    while length := dns_name[offset]:
+        labels.append(dns_name[offset + 1 : offset + 1 + length].decode())  # noqa: E203
+        offset += length + 1
+
+    return ".".join(labels)
+
+
+class FakeEth:
+    """
+    A stand-in for ``web3.eth`` that answers Multicall3 ``aggregate3`` calls
+    using the ENS registry and a single public resolver backed by ``REGISTRY``.
+    Names in ``wildcards`` resolve all their subnames (ENSIP-10) to one address.
+    Subnames of names in ``offchain`` resolve using an offchain resolver (EIP-3668),
+    which asks the ``gateway_urls``.
+    Other records are set in ``coin_addresses``, ``contenthashes``, and ``texts``.
+    """
+
+    def __init__(self):
+        self.call_count = 0
+        self.block_number = 1
+        self.records = {bytes(namehash(n)): a for n, a in REGISTRY.items()}
+        self.reverse_records = {
+            bytes(namehash(f"{a.lower()[2:]}.addr.reverse")): n for n, a in REGISTRY.items()
+        }
+        self.wildcards = {}
+        self.offchain = set()
+        self.gateway_urls = []
+        self.coin_addresses = {}
+        self.contenthashes = {}
+        self.texts = {}
+        self.logs = []
+        self.block_identifiers = []
+
+    def register(self, name, address):
+        self.records[bytes(namehash(name))] = address
+
+    def set_text(self, name, key, value):
+        self.texts[(bytes(namehash(name)), key)] = value
+
+    def get_logs(self, filter_params):
+        topics = [bytes.fromhex(t[2:]) for t in filter_params["topics"][0]]
+        return [
+            log
+            for log in self.logs
+            if filter_params["fromBlock"] <= log["blockNumber"] <= filter_params["toBlock"]
+            and filter_params.get("address", log["address"]) == log["address"]
+            and log["topics"][0] in topics
+        ]
+
+    def get_code(self, address, block_identifier=None):
+        # The Universal Resolver web3 uses.
+        return b"\x60\x80"
+
+    def get_block(self, block_identifier):
+        return {"number": self.block_number}
+
+    def call(self, tx, block_identifier="latest"):
+        self.call_count += 1
+        self.block_identifiers.append(block_identifier)
+        if tx["to"] != MULTICALL3_ADDRESS:
+            # A direct call.
+            success, data = self._handle(tx["to"], tx["data"][:4], tx["data"][4:])
+            if not success:
+                raise ContractLogicError("Reverted.")
+
+            return data
+
+        elif tx["data"][:4] != AGGREGATE3_SELECTOR:
+            raise AssertionError("Unexpected call.")
+
+        calls = decode(["(address,bool,bytes)[]"], tx["data"][4:])[0]
+        results = [self._handle(target, data[:4], data[4:]) for target, _, data in calls]
+        return encode(["(bool,bytes)[]"], [results])
+
+    def _handle(self, target, selector, args):
+        target = target.lower()
+        node = args[:32]
+        if target == REGISTRY_ADDRESS.lower() and selector == RESOLVER_SELECTOR:
+            known = node in self.records or node in self.reverse_records or node in self.wildcards
+            resolver = RESOLVER_ADDRESS if known else ZERO_ADDRESS
+            if node in self.offchain:
+                resolver = OFFCHAIN_RESOLVER_ADDRESS
+
+            return True, encode(["address"], [resolver])
+
+        elif target == OFFCHAIN_RESOLVER_ADDRESS.lower() and selector == RESOLVE_SELECTOR:
+            call_data = selector + args
+            lookup = encode(
+                ["address", "string[]", "bytes", "bytes4", "bytes"],
+                [
+                    OFFCHAIN_RESOLVER_ADDRESS,
+                    self.gateway_urls,
+                    call_data,
+                    RESOLVE_WITH_PROOF_SELECTOR,
+                    call_data,
+                ],
+            )
+            return False, OFFCHAIN_LOOKUP_SELECTOR + lookup
+
+        elif (
+            target == OFFCHAIN_RESOLVER_ADDRESS.lower() and selector == RESOLVE_WITH_PROOF_SELECTOR
+        ):
+            response, _ = decode(["bytes", "bytes"], args)
+            result, expires, signature = decode(["bytes", "uint64", "bytes"], response)
+            if expires < time.time() or signature != FakeGateway.SIGNATURE:
+                return False, b""
+
+            return True, encode(["bytes"], [result])
+
+        elif target == REGISTRY_ADDRESS.lower() and selector == OWNER_SELECTOR:
+            return True, encode(["address"], [self.records.get(node, ZERO_ADDRESS)])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == ADDR_SELECTOR:
+            return True, encode(["address"], [self.records.get(node, ZERO_ADDRESS)])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == COIN_ADDR_SELECTOR:
+            _, coin_type = decode(["bytes32", "uint256"], args)
+            return True, encode(["bytes"], [self.coin_addresses.get((node, coin_type), b"")])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == CONTENTHASH_SELECTOR:
+            return True, encode(["bytes"], [self.contenthashes.get(node, b"")])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == TEXT_SELECTOR:
+            _, key = decode(["bytes32", "string"], args)
+            return True, encode(["string"], [self.texts.get((node, key), "")])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == NAME_SELECTOR:
+            return True, encode(["string"], [self.reverse_records.get(node, "")])
+
+        elif target == RESOLVER_ADDRESS.lower() and selector == RESOLVE_SELECTOR:
+            dns_name, _ = decode(["bytes", "bytes"], args)
+            parent = dns_decode(dns_name).split(".", 1)[1]
+            if (address := self.wildcards.get(bytes(namehash(parent)))) is None:
+                return False, b""
+
+            return True, encode(["bytes"], [encode(["address"], [address])])
+
+        return False, b""
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class FakeGateway:
+    """
+    A local CCIP-Read gateway for the offchain resolver of ``FakeEth``.
+    It answers ``addr(node)`` look-ups (wrapped in ``resolve()``) of the names
+    in ``records`` with signed responses that expire after ``ttl`` seconds.
+    Set ``status`` to make it fail.
+    """
+
+    SIGNATURE = b"signed"
+
+    def __init__(self):
+        self.records = {}
+        self.requests = []
+        self.ttl = 300
+        self.status = 200
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                sender, data = self.path.strip("/").removesuffix(".json").split("/")
+                self.respond(sender, data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self.respond(body["sender"], body["data"])
+
+            def respond(self, sender, data):
+                gateway.requests.append((self.command, sender, data))
+                body = json.dumps({"data": gateway.handle(data)}).encode()
+                self.send_response(gateway.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def handle(self, data: str) -> str:
+        dns_name, _ = decode(["bytes", "bytes"], bytes.fromhex(data[2:])[4:])
+        address = self.records.get(dns_decode(dns_name), ZERO_ADDRESS)
+        expires = int(time.time()) + self.ttl
+        response = encode(
+            ["bytes", "uint64", "bytes"],
+            [encode(["address"], [address]), expires, self.SIGNATURE],
+        )
+        return f"0x{response.hex()}"
+
+
+class FakeRPC:
+    """
+    A local JSON-RPC server answering ``eth_call`` using a ``FakeEth``.
+    Set ``delay`` to make it slow and ``status`` to make it fail.
+    """
+
+    def __init__(self):
+        self.eth = FakeEth()
+        self.requests = []
+        self.delay = 0.0
+        self.status = 200
+        rpc = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                rpc.requests.append(request["method"])
+                time.sleep(rpc.delay)
+                response = {"jsonrpc": "2.0", "id": request["id"], **rpc.handle(request)}
+                body = json.dumps(response).encode()
+                self.send_response(rpc.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def handle(self, request: dict) -> dict:
+        method, params = request["method"], request["params"]
+        if method == "eth_chainId":
+            return {"result": "0x1"}
+
+        elif method == "eth_blockNumber":
+            return {"result": hex(self.eth.block_number)}
+
+        elif method == "eth_getBlockByNumber":
+            number = hex(self.eth.block_number)
+            block = {"number": number, "hash": f"0x{'00' * 32}", "timestamp": hex(int(time.time()))}
+            return {"result": block}
+
+        elif method == "eth_getCode":
+            # No Universal Resolver.
+            return {"result": "0x"}
+
+        elif method == "eth_call":
+            tx = {
+                "to": to_checksum_address(params[0]["to"]),
+                "data": to_bytes(hexstr=params[0]["data"]),
+            }
+            try:
+                return {"result": f"0x{bytes(self.eth.call(tx, params[1])).hex()}"}
+            except ContractLogicError:
+                return {"error": {"code": 3, "message": "execution reverted"}}
+
+        return {"error": {"code": -32601, "message": f"Method '{method}' not found."}}
 
 
 @pytest.fixture(scope="session")
@@ -45,9 +334,55 @@ def mock_web3_ens(mocker):
     web3_ens.address.side_effect = get_address
     web3_ens.name.side_effect = get_name
     web3_ens.owner.side_effect = get_address
+    web3_ens.w3 = FakeWeb3()
+    web3_ens.ens.address = REGISTRY_ADDRESS
     return web3_ens
 
 
+@pytest.fixture
+def mock_async_web3_ens(mocker):
+    web3_ens = mocker.MagicMock()
+
+    async def get_address(name):
+        return REGISTRY.get(name)
+
+    async def get_name(address):
+        for name, value in REGISTRY.items():
+            if value == address:
+                return name
+
+    web3_ens.address = mocker.AsyncMock(side_effect=get_address)
+    web3_ens.name = mocker.AsyncMock(side_effect=get_name)
+    web3_ens.owner = mocker.AsyncMock(side_effect=get_address)
+    web3_ens.ens.address = REGISTRY_ADDRESS
+    return web3_ens
+
+
+@pytest.fixture
+def gateway():
+    gateway = FakeGateway()
+    thread = threading.Thread(target=gateway.server.serve_forever, daemon=True)
+    thread.start()
+    yield gateway
+    gateway.server.shutdown()
+    gateway.server.server_close()
+
+
+@pytest.fixture
+def rpc_servers():
+    """
+    Two local JSON-RPC servers, standing in for mainnet providers.
+    """
+    servers = [FakeRPC(), FakeRPC()]
+    for server in servers:
+        threading.Thread(target=server.server.serve_forever, daemon=True).start()
+
+    yield servers
+    for server in servers:
+        server.server.shutdown()
+        server.server.server_close()
+
+
 @pytest.fixture
 def ens(mock_web3_ens):
     return ENS(backend=mock_web3_ens)
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+
+import pytest
+from ape.exceptions import ProviderError
+from eth_abi import encode
+from eth_utils import to_hex
+
+from ape_ens.cache import DiskCache
+from ape_ens.ens import AsyncENS
+from ape_ens.snapshot import Snapshot
+from tests.conftest import REGISTRY, REGISTRY_ADDRESS
+
+
+@pytest.fixture
+def async_ens(ens, mock_async_web3_ens):
+    return AsyncENS(ens=ens, backend=mock_async_web3_ens)
+
+
+def test_resolve(async_ens, mock_async_web3_ens, vitalik):
+    assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+    assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+    mock_async_web3_ens.address.assert_awaited_once_with("vitalik.eth")
+
+
+def test_resolve_shares_cache(async_ens, ens, mock_async_web3_ens, address):
+    ens.local_registry["cached.eth"] = address
+    assert asyncio.run(async_ens.resolve("cached.eth")) == address
+    assert not mock_async_web3_ens.address.called
+
+    asyncio.run(async_ens.resolve("vitalik.eth"))
+    assert ens.local_registry["vitalik.eth"] == REGISTRY["vitalik.eth"]
+
+
+def test_resolve_many(async_ens, mock_async_web3_ens):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_address(name):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return REGISTRY.get(name.split(".", 1)[1])
+
+    mock_async_web3_ens.address.side_effect = get_address
+    names = [f"{i}.vitalik.eth" for i in range(10)]
+    actual = asyncio.run(async_ens.resolve_many(names, concurrency=3))
+    assert actual == {n: REGISTRY["vitalik.eth"] for n in names}
+    assert max_in_flight == 3
+
+
+def test_name_many(async_ens, vitalik, address):
+    actual = asyncio.run(async_ens.name_many([vitalik, address]))
+    assert actual == {vitalik: "vitalik.eth", address: "test.eth"}
+
+
+def test_owner(async_ens, vitalik):
+    assert asyncio.run(async_ens.owner("vitalik.eth")) == vitalik
+
+
+def test_namehash(async_ens):
+    expected = "0xde9b09fd7c5f901e23a3f19fecc54828e9c848539801e86591bd9801b019f84f"
+    assert to_hex(async_ens.namehash("foo.eth")) == expected
+
+
+def test_persistent_cache_off_event_loop(project, async_ens, tmp_path, mocker, vitalik):
+    threads = []
+    get_many = DiskCache.get_many
+
+    def record_thread(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        return get_many(self, *args, **kwargs)
+
+    mocker.patch.object(DiskCache, "get_many", record_thread)
+    mocker.patch.object(async_ens, "_get_block_number", mocker.AsyncMock(return_value=1))
+    with project.temp_config(ens={"persistent_cache": True, "cache_path": tmp_path / "cache.db"}):
+        assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+        async_ens.ens.local_registry.clear()
+        assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+
+    assert threads
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.parametrize("uri", ["/tmp/geth.ipc", "ws://localhost:8546", None])
+def test_async_web3_requires_http(ens, mocker, uri):
+    provider = mocker.MagicMock(http_uri=None, uri=uri)
+    provider.name = "node"
+    mocker.patch.object(type(ens), "_mainnet_provider", provider)
+    with pytest.raises(ProviderError, match="needs an HTTP RPC URI"):
+        asyncio.run(AsyncENS(ens=ens)._get_async_web3())
+
+
+def test_async_web3_http(ens, mocker):
+    provider = mocker.MagicMock(http_uri="http://localhost:8545", uri="ws://localhost:8546")
+    provider.name = "node"
+    threads = []
+
+    def mainnet_provider(_):
+        # Finding the provider may connect to it, so not on the event loop.
+        threads.append(threading.current_thread())
+        return provider
+
+    mocker.patch.object(type(ens), "_mainnet_provider", property(mainnet_provider))
+    async_ens = AsyncENS(ens=ens)
+    web3 = asyncio.run(async_ens._get_async_web3())
+    assert web3.provider.endpoint_uri == "http://localhost:8545"
+    assert threading.main_thread() not in threads
+    assert async_ens._provider_name == "node"
+
+
+def test_resolve_from_snapshot(project, async_ens, mock_async_web3_ens, tmp_path, vitalik):
+    path = tmp_path / "snapshot.db"
+    Snapshot.write(path, iter([("vitalik.eth", vitalik)]), registry=REGISTRY_ADDRESS)
+    with project.temp_config(ens={"snapshot_path": path}):
+        assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+
+    assert not mock_async_web3_ens.address.called
+
+
+def test_resolve_uses_resolver_cache(async_ens, ens, mock_async_web3_ens, vitalik, mocker):
+    resolver = "0x231b0Ee14048e9dCcD1d247744d114a4EB5E8E63"
+    node = bytes(async_ens.namehash("vitalik.eth"))
+    ens.resolver_cache.set(f"{REGISTRY_ADDRESS}:{node.hex()}", resolver, block_number=1)
+    mocker.patch.object(async_ens, "_get_block_number", mocker.AsyncMock(return_value=1))
+    call = mock_async_web3_ens.w3.eth.call = mocker.AsyncMock(
+        return_value=encode(["address"], [vitalik])
+    )
+
+    assert asyncio.run(async_ens.resolve("vitalik.eth")) == vitalik
+    assert call.await_args.args[0]["to"] == resolver
+    assert not mock_async_web3_ens.address.called
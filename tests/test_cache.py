@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ape_ens.cache import DiskCache, MemoryCache
+from tests.conftest import REGISTRY_ADDRESS
+
+
+@pytest.fixture
+def memory_cache():
+    return MemoryCache(max_entries=3, ttl=100, negative_ttl=10, max_block_age=5)
+
+
+@pytest.fixture
+def now(mocker):
+    """
+    Control the clock used for expiring cache entries.
+    """
+    patch = mocker.patch("ape_ens.cache.time.monotonic")
+    patch.return_value = 1_000.0
+    return patch
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    return DiskCache(tmp_path / "cache.db", max_entries=10)
+
+
+def test_memory_cache_lru_eviction(memory_cache, address):
+    for name in ("a.eth", "b.eth", "c.eth"):
+        memory_cache[name] = address
+
+    # Use a.eth so b.eth is the least-recently used.
+    assert memory_cache.lookup("a.eth") == (True, address)
+    memory_cache["d.eth"] = address
+    assert set(memory_cache) == {"a.eth", "c.eth", "d.eth"}
+    assert memory_cache.evictions == 1
+
+
+def test_memory_cache_ttl(memory_cache, address, now):
+    memory_cache["test.eth"] = address
+    now.return_value += 99
+    assert memory_cache.lookup("test.eth") == (True, address)
+    now.return_value += 1
+    assert memory_cache.lookup("test.eth") == (False, None)
+    assert "test.eth" not in memory_cache
+
+
+def test_memory_cache_block_age(memory_cache, address):
+    memory_cache.set("test.eth", address, block_number=100)
+    assert memory_cache.lookup("test.eth", block_number=105) == (True, address)
+    assert memory_cache.lookup("test.eth", block_number=106) == (False, None)
+
+
+def test_memory_cache_negative(memory_cache, now):
+    memory_cache.set_negative("nope.eth")
+    assert memory_cache.lookup("nope.eth") == (True, None)
+
+    # Negative entries are hidden from the mapping interface.
+    assert "nope.eth" not in memory_cache
+    assert memory_cache.get("nope.eth") is None
+    assert len(memory_cache) == 0
+
+    # Negative entries use the shorter TTL.
+    now.return_value += 10
+    assert memory_cache.lookup("nope.eth") == (False, None)
+
+
+def test_memory_cache_keys_for(address, vitalik, now):
+    cache = MemoryCache(max_entries=3, ttl=100, index_values=True)
+    cache["test.eth"] = address
+    cache["alias.eth"] = address.lower()
+    cache["vitalik.eth"] = vitalik
+    assert cache.keys_for(address) == ["test.eth", "alias.eth"]
+
+    # The index follows replaced, removed, and evicted entries.
+    cache["alias.eth"] = vitalik
+    del cache["vitalik.eth"]
+    cache.set_negative("nope.eth")
+    cache["other.eth"] = vitalik
+    cache["new.eth"] = vitalik
+    assert cache.keys_for(address) == []
+    assert cache.keys_for(vitalik) == ["other.eth", "new.eth"]
+
+    now.return_value += 100
+    assert cache.keys_for(vitalik) == []
+    with pytest.raises(ValueError):
+        MemoryCache().keys_for(vitalik)
+
+
+def test_disk_cache_get_and_set(disk_cache, address):
+    assert disk_cache.get("address", REGISTRY_ADDRESS, "test.eth") is None
+    disk_cache.set("address", REGISTRY_ADDRESS, "test.eth", address, block_number=123)
+    record = disk_cache.get("address", REGISTRY_ADDRESS, "test.eth")
+    assert record.value == address
+    assert record.block_number == 123
+    assert record.timestamp > 0
+
+    # Different kinds and registries do not collide.
+    assert disk_cache.get("owner", REGISTRY_ADDRESS, "test.eth") is None
+    assert disk_cache.get("address", address, "test.eth") is None
+
+
+def test_disk_cache_get_many(disk_cache, address, vitalik):
+    items = {"test.eth": address, "vitalik.eth": vitalik}
+    disk_cache.set_many("address", REGISTRY_ADDRESS, items)
+    actual = disk_cache.get_many("address", REGISTRY_ADDRESS, ["test.eth", "vitalik.eth", "x.eth"])
+    assert {k: r.value for k, r in actual.items()} == items
+
+
+def test_disk_cache_evict(disk_cache, address):
+    disk_cache.set_many("address", REGISTRY_ADDRESS, {f"{i}.eth": address for i in range(15)})
+    assert disk_cache.evict() == 5
+    assert len(disk_cache) == 10
+
+
+def test_disk_cache_forked_process(disk_cache, address, mocker):
+    disk_cache.set("address", REGISTRY_ADDRESS, "vitalik.eth", address)
+    connection = disk_cache._connection
+    mocker.patch("ape_ens.utils.concurrency.os.getpid", return_value=-1)
+    assert disk_cache._connection is not connection
+    assert disk_cache.get("address", REGISTRY_ADDRESS, "vitalik.eth").value == address
+
+
+def test_disk_cache_shared(disk_cache, address):
+    """
+    Show that separate instances (e.g. in other processes) and
+    threads can safely read and write the same database.
+    """
+    other = DiskCache(disk_cache.path, max_entries=100)
+
+    def write(index):
+        cache = disk_cache if index % 2 else other
+        cache.set("address", REGISTRY_ADDRESS, f"{index}.eth", address)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(8)))
+
+    assert len(other.get_many("address", REGISTRY_ADDRESS, [f"{i}.eth" for i in range(8)])) == 8
+
+
+def test_memory_cache_refresh_ahead(address, now):
+    cache = MemoryCache(ttl=100, max_block_age=10, refresh_ahead=0.2, refresh_min_hits=2)
+    cache.set("a.eth", address, block_number=1)
+    cache.set("b.eth", address, block_number=1)
+    cache.set_negative("nope.eth")
+    now.return_value += 85
+    for key in ("a.eth", "nope.eth", "nope.eth"):
+        cache.lookup(key)
+
+    # a.eth was only used once.
+    assert cache.pop_due() == []
+    assert cache.lookup("a.eth") == (True, address)
+    assert cache.pop_due() == ["a.eth"]
+
+    # Only refreshed once, until set again.
+    cache.lookup("a.eth")
+    assert cache.pop_due() == []
+    cache.set("a.eth", address)
+    cache.lookup("a.eth")
+    cache.lookup("a.eth")
+    assert cache.pop_due() == []
+
+    # Close to its max block age.
+    now.return_value -= 85
+    cache.lookup("b.eth", block_number=9)
+    cache.lookup("b.eth", block_number=9)
+    assert cache.pop_due() == ["b.eth"]
+
+
+def test_disk_cache_recent_keys(disk_cache, address, now):
+    for name in ("a.eth", "b.eth", "c.eth"):
+        disk_cache.set("address", REGISTRY_ADDRESS, name, address)
+
+    assert disk_cache.recent_keys("address", REGISTRY_ADDRESS, 2) == ["c.eth", "b.eth"]
@@ -0,0 +1,91 @@
+import pytest
+from eth_utils import to_checksum_address
+
+from ape_ens.ccip import decode_offchain_lookup, gateway_client
+from ape_ens.utils.namehash import namehash
+
+from .conftest import OFFCHAIN_RESOLVER_ADDRESS
+
+NAMES = {
+    "alice.cb.id": "0x000000000000000000000000000000000000a11c",
+    "bob.cb.id": "0x0000000000000000000000000000000000000b0b",
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_gateway_client():
+    gateway_client.clear()
+    yield
+    gateway_client.clear()
+
+
+@pytest.fixture
+def offchain(mock_web3_ens, gateway):
+    eth = mock_web3_ens.w3.eth
+    eth.offchain.add(bytes(namehash("cb.id")))
+    eth.gateway_urls = [gateway.url]
+    gateway.records.update(NAMES)
+    return eth
+
+
+def test_resolve_many(ens, mock_web3_ens, offchain, gateway):
+    results = ens.resolve_many([*NAMES, "carol.cb.id"])
+    assert results == {
+        **{name: to_checksum_address(address) for name, address in NAMES.items()},
+        "carol.cb.id": None,
+    }
+    assert len(gateway.requests) == 3
+    assert all(method == "POST" for method, _, _ in gateway.requests)
+    assert {sender for _, sender, _ in gateway.requests} == {OFFCHAIN_RESOLVER_ADDRESS.lower()}
+    # Two levels of resolvers, the resolve() calls, and one call for all the callbacks.
+    assert offchain.call_count == 4
+    mock_web3_ens.address.assert_not_called()
+
+
+def test_resolve_many_uses_gateway_cache(ens, offchain, gateway):
+    ens.resolve_many(NAMES, use_cache=False)
+    ens.resolve_many(NAMES, use_cache=False)
+    assert len(gateway.requests) == len(NAMES)
+
+
+def test_resolve_uses_gateway_cache(ens, mock_web3_ens, offchain, gateway):
+    # Resolvers not cached yet, so the look-up finds them first.
+    assert ens.resolve("alice.cb.id", use_cache=False) == to_checksum_address(NAMES["alice.cb.id"])
+    assert ens.resolve("alice.cb.id", use_cache=False) == to_checksum_address(NAMES["alice.cb.id"])
+    ens.resolve_many(["alice.cb.id"], use_cache=False)
+    assert len(gateway.requests) == 1
+    mock_web3_ens.address.assert_not_called()
+
+
+def test_resolve_many_expired_response(ens, mock_web3_ens, offchain, gateway):
+    gateway.ttl = -60
+    assert ens.resolve_many(["alice.cb.id"]) == {"alice.cb.id": None}
+    # The callback rejected the response, so the single look-up handled it.
+    mock_web3_ens.address.assert_called_once_with("alice.cb.id")
+    assert gateway_client.cache.all_keys() == []
+
+
+def test_resolve_many_gateway_failover(ens, mock_web3_ens, offchain, gateway):
+    down = "http://127.0.0.1:1/{sender}/{data}.json"
+    offchain.gateway_urls = [down, f"{gateway.url}/{{sender}}/{{data}}.json"]
+    assert ens.resolve_many(["bob.cb.id"]) == {"bob.cb.id": to_checksum_address(NAMES["bob.cb.id"])}
+    assert [method for method, _, _ in gateway.requests] == ["GET"]
+
+
+def test_resolve_many_gateway_error(ens, mock_web3_ens, offchain, gateway):
+    gateway.status = 404
+    assert ens.resolve_many(["bob.cb.id"]) == {"bob.cb.id": None}
+    mock_web3_ens.address.assert_called_once_with("bob.cb.id")
+
+
+def test_resolve_many_ccip_read_disabled(ens, mock_web3_ens, offchain, gateway, project):
+    with project.temp_config(ens={"ccip_read": False}):
+        ens.resolve_many(["bob.cb.id"])
+
+    assert gateway.requests == []
+    mock_web3_ens.address.assert_called_once_with("bob.cb.id")
+
+
+def test_decode_offchain_lookup():
+    assert decode_offchain_lookup(b"") is None
+    assert decode_offchain_lookup(b"\x00" * 68) is None
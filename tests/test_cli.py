@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from click.testing import CliRunner
 
@@ -39,3 +41,97 @@ def test_namehash(runner):
     result = runner.invoke(cli, ["namehash", "foo.eth"])
     expected = "0xde9b09fd7c5f901e23a3f19fecc54828e9c848539801e86591bd9801b019f84f"
     assert expected in result.output, result.output
+
+
+def test_resolve_many(runner):
+    result = runner.invoke(cli, ["resolve", "vitalik.eth", "test.eth", "nope.eth"])
+    assert "vitalik.eth: 0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045" in result.output
+    assert "test.eth: 0xe2222bb6633228143c4ce8fc4642aa33b857b332" in result.output.lower()
+    assert "Could not resolve ENS 'nope.eth'." in result.output
+
+
+def test_name_many(runner):
+    vitalik = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+    unknown = "0x0000000000000000000000000000000000000123"
+    result = runner.invoke(cli, ["name", vitalik, unknown])
+    assert f"{vitalik}: vitalik.eth" in result.output
+    assert f"No ENS name found for '{unknown}'." in result.output
+
+
+def test_resolve_file(runner, tmp_path):
+    path = tmp_path / "names.txt"
+    path.write_text("vitalik.eth\n\n# comment\nnope.eth\ntest.eth\n")
+    result = runner.invoke(cli, ["resolve-file", str(path), "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    lines[3] = lines[3].lower()
+    assert lines[:4] == [
+        "name,address,error",
+        "vitalik.eth,0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045,",
+        "nope.eth,,",
+        "test.eth,0xe2222bb6633228143c4ce8fc4642aa33b857b332,",
+    ]
+    assert "Resolved 2 names (1 not found)." in result.output
+
+
+def test_resolve_file_stdin_jsonl(runner):
+    result = runner.invoke(
+        cli,
+        ["resolve-file", "--format", "jsonl", "--concurrency", "2", "--batch-size", "1"],
+        input="vitalik.eth\nnope.eth\n",
+    )
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in result.output.splitlines() if line.startswith("{")]
+    assert rows == [
+        {
+            "name": "vitalik.eth",
+            "address": "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045",
+            "error": None,
+        },
+        {"name": "nope.eth", "address": None, "error": None},
+    ]
+
+
+def test_resolve_file_error(runner, ens, mocker):
+    original = ens.resolve
+
+    def resolve(name, **kwargs):
+        if name == "bad.eth":
+            raise ValueError("Bad name.")
+
+        return original(name, **kwargs)
+
+    mocker.patch.object(ens, "resolve_many", side_effect=ValueError("Bad name."))
+    mocker.patch.object(ens, "resolve", side_effect=resolve)
+    result = runner.invoke(cli, ["resolve-file"], input="vitalik.eth\nbad.eth\n")
+    assert result.exit_code != 0
+    assert "Failed to look up 'bad.eth': Bad name." in result.output
+
+    result = runner.invoke(
+        cli, ["resolve-file", "--continue-on-error"], input="vitalik.eth\nbad.eth\n"
+    )
+    assert result.exit_code == 0, result.output
+    assert "vitalik.eth,0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045," in result.output
+    assert "bad.eth,,Bad name." in result.output
+
+
+def test_name_file(runner, tmp_path):
+    vitalik = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+    unknown = "0x0000000000000000000000000000000000000123"
+    output = tmp_path / "names.csv"
+    result = runner.invoke(cli, ["name-file", "-o", str(output)], input=f"{vitalik}\n{unknown}\n")
+    assert result.exit_code == 0, result.output
+    assert output.read_text().splitlines() == [
+        "address,name,error",
+        f"{vitalik},vitalik.eth,",
+        f"{unknown},,",
+    ]
+
+
+def test_snapshot_export(runner, tmp_path):
+    output = tmp_path / "snapshot.db"
+    result = runner.invoke(
+        cli, ["snapshot", "export", "--output", str(output), "--block", "7"], input="vitalik.eth\n"
+    )
+    assert result.exit_code == 0, result.output
+    assert f"Exported 1 names at block 7 to '{output}'." in result.output
@@ -1,8 +1,9 @@
 import pytest
 from ape.exceptions import ConversionError
+from eth_utils import to_checksum_address
 from web3.exceptions import CannotHandleRequest
 
-from tests.conftest import negative_tests
+from tests.conftest import ADDRESS, negative_tests
 
 
 @pytest.fixture(autouse=True)
@@ -78,3 +79,56 @@ def test_convert_change_registry_address(project, converter, vitalik, accounts):
 def test_address_cache(converter, address):
     converter.address_cache["test.eth"] = address
     assert converter.convert("test.eth") == address
+
+
+def test_convert_many(converter, address, vitalik):
+    actual = converter.convert_many(["test.eth", "vitalik.eth"])
+    assert actual == [to_checksum_address(address), vitalik]
+
+
+def test_convert_many_when_not_found(converter):
+    with pytest.raises(ConversionError, match="nope.eth"):
+        converter.convert_many(["test.eth", "nope.eth"])
+
+
+@pytest.mark.parametrize("value", ("v1.2", "1.0.3", "data.txt/", "foo bar.eth", ".eth", "a..eth"))
+def test_is_convertible_prefiltered(converter, mock_web3_ens, value):
+    assert not converter.is_convertible(value)
+    assert converter.stats["prefiltered"] == 1
+    assert converter.stats["lookups"] == 0
+    assert mock_web3_ens.w3.eth.call_count == 0
+
+
+def test_is_convertible_caches_rejections(converter, mock_web3_ens):
+    converter.ens.local_registry.negative_ttl = 0  # Only use the converter's cache.
+    assert not converter.is_convertible("nope.eth")
+    assert not converter.is_convertible("nope.eth")
+    assert converter.stats == {"prefiltered": 0, "negative_cache_hits": 1, "lookups": 1}
+    # The registry has no resolver for nope.eth or eth.
+    assert mock_web3_ens.w3.eth.call_count == 2
+
+    # Adding the name to the cache makes it convertible.
+    converter.address_cache["nope.eth"] = mock_web3_ens.address("vitalik.eth")
+    assert converter.is_convertible("nope.eth")
+
+
+@pytest.mark.parametrize("value", ("foo.txt", "readme.md", "vitalik.ethx"))
+def test_is_convertible_disallowed_suffix(converter, mock_web3_ens, value):
+    assert not converter.is_convertible(value)
+    assert converter.stats["prefiltered"] == 1
+    assert mock_web3_ens.w3.eth.call_count == 0
+
+
+def test_is_convertible_allowed_suffixes_config(project, converter, mock_web3_ens):
+    # Checked before changing the config.
+    assert not converter.is_convertible("me.test")
+    with project.temp_config(ens={"allowed_suffixes": [".TXT"], "registry": {"me.test": ADDRESS}}):
+        assert converter.ens.suffix_allowlist.suffixes == (".txt",)
+        assert not converter.is_convertible("vitalik.eth")
+        assert converter.is_convertible("me.test")
+        assert converter.ens.can_resolve("me.test")
+        lookups = converter.stats["lookups"]
+        converter.is_convertible("foo.txt")
+        assert converter.stats["lookups"] == lookups + 1
+
+    assert not converter.is_convertible("foo.txt")
@@ -0,0 +1,446 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from eth_abi.exceptions import InsufficientDataBytes
+from eth_utils import to_checksum_address
+from web3.exceptions import ContractLogicError
+
+from ape_ens.ens import ENS
+from ape_ens.utils.multicall import MULTICALL3_ADDRESS
+from tests.conftest import REGISTRY
+
+VITALIK = to_checksum_address(REGISTRY["vitalik.eth"])
+TEST = to_checksum_address(REGISTRY["test.eth"])
+
+
+def test_resolve_many(ens, mock_web3_ens):
+    names = ["vitalik.eth", "test.eth", "vitalik.eth"]
+    actual = ens.resolve_many(names, use_cache=False)
+    assert actual == {"vitalik.eth": VITALIK, "test.eth": TEST}
+
+    # One multicall for the registry and one for the resolver.
+    assert mock_web3_ens.w3.eth.call_count == 2
+    assert not mock_web3_ens.address.called
+
+
+def test_resolve_many_not_found(ens, mock_web3_ens):
+    actual = ens.resolve_many(["vitalik.eth", "nope.eth"], use_cache=False)
+    assert actual == {"vitalik.eth": VITALIK, "nope.eth": None}
+
+    # Neither nope.eth nor eth have a resolver.
+    assert not mock_web3_ens.address.called
+
+
+def test_resolve_many_wildcard(ens, mock_web3_ens, address):
+    mock_web3_ens.w3.eth.wildcards[bytes(ens.namehash("ourapp.eth"))] = address
+    actual = ens.resolve_many(["a.ourapp.eth", "b.ourapp.eth"], use_cache=False)
+    assert actual == {"a.ourapp.eth": TEST, "b.ourapp.eth": TEST}
+    assert not mock_web3_ens.address.called
+
+
+def test_resolver_cache(ens, mock_web3_ens):
+    ens.resolve_many(["vitalik.eth", "test.eth"], use_cache=False)
+    assert ens.resolver_cache.misses == 2
+
+    # The resolvers are known, so only the resolver is called.
+    mock_web3_ens.w3.eth.call_count = 0
+    assert ens.resolve_many(["vitalik.eth", "test.eth"], use_cache=False) == {
+        "vitalik.eth": VITALIK,
+        "test.eth": TEST,
+    }
+    assert mock_web3_ens.w3.eth.call_count == 1
+    assert ens.resolve("vitalik.eth", use_cache=False) == VITALIK
+    assert mock_web3_ens.w3.eth.call_count == 2
+    assert not mock_web3_ens.address.called
+    assert ens.resolver_cache.hit_rate == 0.6
+
+
+def test_resolver_cache_block_age(project, mock_web3_ens):
+    with project.temp_config(ens={"resolver_cache_max_block_age": 10}):
+        ens = ENS(backend=mock_web3_ens)
+        ens.resolve_many(["vitalik.eth"], use_cache=False)
+        ens._block_number = None
+        mock_web3_ens.w3.eth.block_number = 12
+        mock_web3_ens.w3.eth.call_count = 0
+        ens.resolve_many(["vitalik.eth"], use_cache=False)
+
+        # The cached resolver expired, so the registry is called again.
+        assert mock_web3_ens.w3.eth.call_count == 2
+
+
+def test_resolver_cache_negative_ttl(project, mock_web3_ens, address):
+    with project.temp_config(ens={"negative_cache_ttl": 0}):
+        ens = ENS(backend=mock_web3_ens)
+        assert ens.resolve_many(["new.eth"]) == {"new.eth": None}
+
+        # Registered after the first look-up.
+        mock_web3_ens.w3.eth.register("new.eth", address)
+        assert ens.resolve_many(["new.eth"]) == {"new.eth": to_checksum_address(address)}
+
+
+def test_resolve_many_uses_cache(ens, mock_web3_ens, address):
+    ens.local_registry = {"cached.eth": address}
+    actual = ens.resolve_many(["cached.eth", "vitalik.eth"])
+    assert actual["cached.eth"] == address
+    assert ens.local_registry["vitalik.eth"] == VITALIK
+
+    # Now everything is cached.
+    mock_web3_ens.w3.eth.call_count = 0
+    ens.resolve_many(["cached.eth", "vitalik.eth"])
+    assert mock_web3_ens.w3.eth.call_count == 0
+
+
+def test_resolve_many_multicall_unavailable(ens, mock_web3_ens, mocker):
+    patch = mocker.patch.object(mock_web3_ens.w3.eth, "call")
+    patch.side_effect = InsufficientDataBytes("No Multicall3")
+    actual = ens.resolve_many(["vitalik.eth", "test.eth"], use_cache=False)
+    assert actual == {"vitalik.eth": REGISTRY["vitalik.eth"], "test.eth": REGISTRY["test.eth"]}
+    assert mock_web3_ens.address.call_count == 2
+
+
+def test_name_many(ens, mock_web3_ens, address):
+    unknown = "0x0000000000000000000000000000000000000123"
+    actual = ens.name_many([VITALIK, address, unknown])
+    assert actual == {VITALIK: "vitalik.eth", address: "test.eth", unknown: None}
+
+    # Registry, reverse resolver, and then registry and resolver for forward verification.
+    assert mock_web3_ens.w3.eth.call_count == 4
+    assert not mock_web3_ens.name.called
+
+
+def test_name_many_forward_mismatch(ens, mock_web3_ens, address):
+    # Claims to be vitalik.eth but vitalik.eth does not resolve to it.
+    fake = "0x0000000000000000000000000000000000000456"
+    node = bytes(ens.namehash(f"{fake[2:]}.addr.reverse"))
+    mock_web3_ens.w3.eth.reverse_records[node] = "vitalik.eth"
+    actual = ens.name_many([fake, VITALIK])
+    assert actual == {fake: None, VITALIK: "vitalik.eth"}
+
+
+def test_persistent_cache(project, ens, mock_web3_ens, tmp_path):
+    path = tmp_path / "cache.db"
+    with project.temp_config(ens={"persistent_cache": True, "cache_path": path}):
+        assert ens.resolve("vitalik.eth") == REGISTRY["vitalik.eth"]
+        assert ens.name(VITALIK) == "vitalik.eth"
+        assert ens.owner("vitalik.eth") == REGISTRY["vitalik.eth"]
+
+        # A new instance (e.g. a new process) reads from the disk.
+        mock_web3_ens.reset_mock()
+        other = type(ens)(backend=mock_web3_ens)
+        assert other.resolve("vitalik.eth") == REGISTRY["vitalik.eth"]
+        assert other.name(VITALIK) == "vitalik.eth"
+        assert other.owner("vitalik.eth") == REGISTRY["vitalik.eth"]
+        assert other.resolve_many(["vitalik.eth"]) == {"vitalik.eth": REGISTRY["vitalik.eth"]}
+        assert not mock_web3_ens.address.called
+        assert not mock_web3_ens.name.called
+        assert not mock_web3_ens.owner.called
+
+
+def test_resolve_caches_negative_results(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    assert ens.resolve("nope.eth") is None
+    calls = eth.call_count
+    assert calls
+    assert ens.resolve("nope.eth") is None
+    assert ens.resolve_many(["nope.eth"]) == {"nope.eth": None}
+    assert eth.call_count == calls
+    assert "nope.eth" not in ens.local_registry
+
+
+def test_local_registry_bounded(project, mock_web3_ens, address):
+    with project.temp_config(ens={"local_cache_max_entries": 1}):
+        ens = ENS(backend=mock_web3_ens)
+        ens.resolve("test.eth")
+        ens.resolve("vitalik.eth")
+        assert list(ens.local_registry) == ["vitalik.eth"]
+
+
+def test_resolve_concurrent_calls_share_look_up(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    started = threading.Event()
+    release = threading.Event()
+    call = eth.call
+
+    def slow_call(*args, **kwargs):
+        started.set()
+        release.wait(timeout=5)
+        return call(*args, **kwargs)
+
+    eth.call = slow_call
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(ens.resolve, "vitalik.eth", use_cache=False) for _ in range(8)]
+        started.wait(timeout=5)
+        time.sleep(0.05)  # Let the other threads start waiting.
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == [REGISTRY["vitalik.eth"]] * 8
+    # Registry and then resolver, once.
+    assert eth.call_count == 2
+
+
+def test_web3_ens_created_once(mocker):
+    ens = ENS()
+    create = mocker.patch.object(ENS, "_create_web3_ens")
+    create.side_effect = lambda: time.sleep(0.05) or object()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        backends = list(pool.map(lambda _: ens._web3_ens, range(4)))
+
+    assert create.call_count == 1
+    assert len({id(b) for b in backends}) == 1
+
+
+def test_resolve_at_block(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    eth.block_number = 100
+    assert ens.resolve("vitalik.eth", block_identifier=50) == VITALIK
+    assert ens.resolve_many(["vitalik.eth", "nope.eth"], block_identifier=50) == {
+        "vitalik.eth": VITALIK,
+        "nope.eth": None,
+    }
+    assert set(eth.block_identifiers) == {50}
+
+    # Results at finalized blocks are cached forever, including negative results.
+    eth.call_count = 0
+    ens.resolve_many(["vitalik.eth", "nope.eth"], block_identifier=50)
+    assert eth.call_count == 0
+    assert ens.pinned_cache.hits == 3
+    assert not mock_web3_ens.address.called
+
+
+def test_resolve_at_unfinalized_block(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    eth.block_number = 100
+    assert ens.resolve("vitalik.eth", block_identifier="latest") == VITALIK
+    assert ens.resolve("vitalik.eth", block_identifier=101) == VITALIK
+    assert len(ens.pinned_cache) == 0
+
+
+def test_resolve_at_block_without_multicall(ens, mock_web3_ens):
+    # Multicall3 was not deployed yet at the block.
+    eth = mock_web3_ens.w3.eth
+    eth.block_number = 100
+    original = eth.call
+
+    def call(tx, block_identifier="latest"):
+        if tx["to"] == MULTICALL3_ADDRESS:
+            raise ContractLogicError("No Multicall3")
+
+        return original(tx, block_identifier)
+
+    eth.call = call
+    assert ens.resolve("vitalik.eth", block_identifier=50) == VITALIK
+    assert not mock_web3_ens.address.called
+
+
+def test_at_block_reverted_does_not_use_latest(ens, mock_web3_ens, address):
+    # web3 looks up at the latest block, where these resolve.
+    mock_web3_ens.address.side_effect = lambda _: VITALIK
+    mock_web3_ens.name.side_effect = lambda _: "vitalik.eth"
+    eth = mock_web3_ens.w3.eth
+    eth.block_number = 100
+    eth.offchain.add(bytes(ens.namehash(f"{address.lower()[2:]}.addr.reverse")))
+
+    # test.eth's resolver does not support wildcards, so the look-up reverts.
+    assert ens.resolve("sub.test.eth", block_identifier=1) is None
+    # The offchain look-up fails (there are no gateways).
+    assert ens.name(address, block_identifier=1) is None
+    assert not mock_web3_ens.address.called
+    assert not mock_web3_ens.name.called
+    assert ens.resolve("sub.test.eth") == VITALIK
+
+
+def test_name_and_owner_at_block(project, ens, mock_web3_ens, tmp_path):
+    mock_web3_ens.w3.eth.block_number = 100
+    with project.temp_config(ens={"persistent_cache": True, "cache_path": tmp_path / "cache.db"}):
+        assert ens.name(VITALIK, block_identifier=50) == "vitalik.eth"
+        assert ens.owner("vitalik.eth", block_identifier=50) == VITALIK
+        assert not mock_web3_ens.name.called
+        assert not mock_web3_ens.owner.called
+
+        # Another instance reads the pinned results from disk.
+        other = ENS(backend=mock_web3_ens)
+        mock_web3_ens.w3.eth.call_count = 0
+        assert other.name(VITALIK, block_identifier=50) == "vitalik.eth"
+        assert other.owner("vitalik.eth", block_identifier=50) == VITALIK
+        assert mock_web3_ens.w3.eth.call_count == 0
+
+
+def test_can_resolve_disallowed_suffix(ens, mock_web3_ens):
+    assert ens.can_resolve("vitalik.eth")
+    calls = mock_web3_ens.w3.eth.call_count
+    assert not ens.can_resolve("notes.txt")
+    assert not ens.can_resolve("1.0.3")
+    assert mock_web3_ens.w3.eth.call_count == calls
+
+
+def test_can_resolve_any_suffix(project, mocker, mock_web3_ens, address):
+    mocker.patch.object(ENS, "_resolve_address", return_value=address)
+    with project.temp_config(ens={"allowed_suffixes": None}):
+        assert ENS(backend=mock_web3_ens).can_resolve("me.test")
+
+
+def test_records(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    node = bytes(ens.namehash("vitalik.eth"))
+    optimism = 0x80000000 | 10
+    eth.coin_addresses[(node, optimism)] = bytes.fromhex(VITALIK[2:])
+    eth.coin_addresses[(node, 0)] = b"\x00\x14" + b"\x01" * 20  # A BTC script.
+    eth.contenthashes[node] = b"\xe3\x01"
+    eth.set_text("vitalik.eth", "avatar", "eip155:1/erc721:0xabc/1")
+
+    records = ens.records(
+        "vitalik.eth", coin_types=(60, optimism, 0, 2), text_keys=("avatar", "url")
+    )
+    assert records.addresses == {
+        60: VITALIK,
+        optimism: VITALIK,
+        0: f"0x0014{'01' * 20}",
+        2: None,
+    }
+    assert records.contenthash == "0xe301"
+    assert records.texts == {"avatar": "eip155:1/erc721:0xabc/1", "url": None}
+    # One multicall for the resolver and one for all the records.
+    assert eth.call_count == 2
+
+    # Cached, including unset records.
+    assert ens.records("vitalik.eth", coin_types=(optimism, 2), text_keys=("url",)).addresses == {
+        optimism: VITALIK,
+        2: None,
+    }
+    assert eth.call_count == 2
+
+
+def test_records_many(ens, mock_web3_ens):
+    eth = mock_web3_ens.w3.eth
+    eth.set_text("test.eth", "url", "https://example.com")
+    records = ens.records_many(
+        ["test.eth", "vitalik.eth", "nope.eth"], text_keys=("url",), contenthash=False
+    )
+    assert records["test.eth"].addresses == {60: TEST}
+    assert records["test.eth"].texts == {"url": "https://example.com"}
+    assert records["vitalik.eth"].texts == {"url": None}
+    assert records["nope.eth"].addresses == {60: None}
+    assert records["nope.eth"].contenthash is None
+    # The resolvers (and the parent of "nope.eth", for a wildcard resolver), then the records.
+    assert eth.call_count == 3
+    assert not mock_web3_ens.address.called
+
+
+def test_records_persistent_cache(project, mock_web3_ens, tmp_path):
+    mock_web3_ens.w3.eth.set_text("vitalik.eth", "url", "https://vitalik.ca")
+    with project.temp_config(ens={"persistent_cache": True, "cache_path": tmp_path / "cache.db"}):
+        ENS(backend=mock_web3_ens).records("vitalik.eth", text_keys=("url",), contenthash=False)
+        calls = mock_web3_ens.w3.eth.call_count
+        records = ENS(backend=mock_web3_ens).records(
+            "vitalik.eth", text_keys=("url",), contenthash=False
+        )
+
+    assert records.texts == {"url": "https://vitalik.ca"}
+    assert mock_web3_ens.w3.eth.call_count == calls
+
+
+def test_refresh_ahead(project, mock_web3_ens, address):
+    eth = mock_web3_ens.w3.eth
+    with project.temp_config(ens={"cache_ttl": 0.5, "refresh_ahead": 0.9}):
+        ens = ENS(backend=mock_web3_ens)
+        assert ens.resolve_many(["vitalik.eth"]) == {"vitalik.eth": VITALIK}
+        time.sleep(0.1)
+        eth.register("vitalik.eth", address)
+        call_count = eth.call_count
+
+        # Used often and about to expire: refreshed in the background,
+        # while the cached address is still served.
+        assert ens.resolve("vitalik.eth") == VITALIK
+        assert ens.resolve("vitalik.eth") == VITALIK
+        ens._background_executor.submit(lambda: None).result()
+        assert eth.call_count > call_count
+
+        call_count = eth.call_count
+        assert ens.resolve("vitalik.eth") == to_checksum_address(address)
+        assert eth.call_count == call_count
+
+
+def test_warm_up(project, mocker, mock_web3_ens, tmp_path):
+    mocker.patch("ape_ens.ens._warm_ups", set())
+    config = {"persistent_cache": True, "cache_path": tmp_path / "cache.db"}
+    with project.temp_config(ens=config):
+        ENS(backend=mock_web3_ens).resolve_many(["test.eth"])
+
+    with project.temp_config(ens={**config, "warm_up_names": ["vitalik.eth"], "warm_up_top_n": 10}):
+        # Warmed up in the background when created.
+        ens = ENS(backend=mock_web3_ens)
+        ens._background_executor.submit(lambda: None).result()
+        assert set(ens.local_registry) == {"vitalik.eth", "test.eth"}
+        assert ens.warm_up() == {"vitalik.eth": VITALIK, "test.eth": TEST}
+
+        # Only once per process.
+        submit = mocker.spy(ENS, "_submit_background")
+        ENS(backend=mock_web3_ens)
+        submit.assert_not_called()
+
+
+def test_background_threads_are_daemons(ens):
+    thread = ens._background_executor.submit(threading.current_thread).result()
+    assert thread.daemon
+
+
+def test_warm_up_not_from_connecting(project, mocker, mock_web3_ens):
+    mocker.patch("ape_ens.ens._warm_ups", set())
+    submit = mocker.patch.object(ENS, "_submit_background")
+    with project.temp_config(ens={"warm_up_names": ["vitalik.eth"]}):
+        ens = ENS(backend=mock_web3_ens)
+        submit.assert_called_once_with(ens.warm_up)
+        ens._web3_ens
+        submit.assert_called_once()
+
+
+def test_name_uses_cache(ens, mock_web3_ens):
+    unknown = "0x0000000000000000000000000000000000000123"
+    assert ens.name_many([VITALIK, unknown]) == {VITALIK: "vitalik.eth", unknown: None}
+
+    # Reverse look-ups of known addresses (including negative results) cost no calls.
+    eth = mock_web3_ens.w3.eth
+    eth.call_count = 0
+    assert ens.name(VITALIK) == "vitalik.eth"
+    assert ens.name(unknown) is None
+    assert ens.name_many([VITALIK, unknown]) == {VITALIK: "vitalik.eth", unknown: None}
+    assert ens.resolve("vitalik.eth") == VITALIK
+    assert eth.call_count == 0
+    assert not mock_web3_ens.name.called
+    assert not mock_web3_ens.address.called
+    assert ens.name(VITALIK, use_cache=False) == "vitalik.eth"
+    assert mock_web3_ens.name.called
+
+
+def test_name_cache_consistent_with_forward(ens, mock_web3_ens, address):
+    assert ens.name(VITALIK) == "vitalik.eth"
+
+    # vitalik.eth now resolves to another address, so it is not VITALIK's name anymore.
+    ens.local_registry["vitalik.eth"] = address
+    mock_web3_ens.name.side_effect = lambda _: None
+    assert ens.name(VITALIK) is None
+    assert ens.name_cache.lookup(VITALIK.lower()) == (True, None)
+
+
+def test_name_from_forward(project, ens, mock_web3_ens):
+    label = "0x0000000000000000000000000000000000000123"
+    with project.temp_config(ens={"registry": {"label.eth": label}}):
+        # Hardcoded entries answer reverse look-ups.
+        assert ens.name(to_checksum_address(label)) == "label.eth"
+
+    ens.resolve("test.eth")
+    assert ens.name_cache.all_keys() == []
+    with project.temp_config(ens={"reverse_from_forward": True}):
+        mock_web3_ens.w3.eth.call_count = 0
+        assert ens.name(TEST) == "test.eth"
+        assert mock_web3_ens.w3.eth.call_count == 0
+
+
+def test_owner_uses_cache(ens, mock_web3_ens):
+    assert ens.owner("vitalik.eth") == REGISTRY["vitalik.eth"]
+    assert ens.owner("vitalik.eth") == REGISTRY["vitalik.eth"]
+    mock_web3_ens.owner.assert_called_once_with("vitalik.eth")
+    assert ens.owner("vitalik.eth", use_cache=False) == REGISTRY["vitalik.eth"]
+    assert mock_web3_ens.owner.call_count == 2
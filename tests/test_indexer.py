@@ -0,0 +1,130 @@
+import pytest
+from eth_utils import keccak
+
+from ape_ens.indexer import (
+    ADDR_CHANGED_TOPIC,
+    NAME_CHANGED_TOPIC,
+    NEW_OWNER_TOPIC,
+    NEW_RESOLVER_TOPIC,
+    TEXT_VALUE_CHANGED_TOPIC,
+    VERSION_CHANGED_TOPIC,
+    ENSIndexer,
+)
+from tests.conftest import REGISTRY, REGISTRY_ADDRESS, RESOLVER_ADDRESS
+
+
+@pytest.fixture
+def indexer(ens):
+    return ENSIndexer(ens=ens, chunk_size=10, start_block=1)
+
+
+@pytest.fixture
+def add_log(ens, mock_web3_ens):
+    def fn(topic, name, block_number, address=RESOLVER_ADDRESS, label=None):
+        topics = [topic, bytes(ens.namehash(name))]
+        if label is not None:
+            topics.append(label)
+
+        log = {"address": address, "topics": topics, "blockNumber": block_number}
+        mock_web3_ens.w3.eth.logs.append(log)
+
+    return fn
+
+
+def test_sync_invalidates_changed_names(ens, mock_web3_ens, indexer, add_log):
+    ens.resolve_many(["vitalik.eth", "test.eth"])
+    add_log(ADDR_CHANGED_TOPIC, "vitalik.eth", 15)
+    mock_web3_ens.w3.eth.block_number = 25
+
+    assert indexer.sync() == 1
+    assert "vitalik.eth" not in ens.local_registry
+    assert "test.eth" in ens.local_registry
+    assert indexer.last_block == 25
+
+    # Already indexed.
+    ens.resolve("vitalik.eth")
+    assert indexer.sync() == 0
+    assert "vitalik.eth" in ens.local_registry
+
+
+def test_sync_new_resolver_invalidates_subnames(ens, mock_web3_ens, indexer, add_log, address):
+    mock_web3_ens.w3.eth.wildcards[bytes(ens.namehash("ourapp.eth"))] = address
+    ens.resolve_many(["a.ourapp.eth", "vitalik.eth"])
+    add_log(NEW_RESOLVER_TOPIC, "ourapp.eth", 3, address=REGISTRY_ADDRESS)
+
+    assert indexer.sync(to_block=5) == 2
+    assert "a.ourapp.eth" not in ens.local_registry
+    assert "vitalik.eth" in ens.local_registry
+
+
+def test_sync_ignores_registry_events_from_other_contracts(ens, indexer, add_log):
+    ens.resolve("vitalik.eth")
+    add_log(NEW_RESOLVER_TOPIC, "vitalik.eth", 3)
+    assert indexer.sync(to_block=5) == 0
+
+
+def test_sync_persistent_cache(project, ens, mock_web3_ens, add_log, tmp_path):
+    vitalik = REGISTRY["vitalik.eth"]
+    with project.temp_config(ens={"persistent_cache": True, "cache_path": tmp_path / "cache.db"}):
+        ens.resolve("vitalik.eth")
+        ens.name(vitalik)
+        ens.owner("vitalik.eth")
+        label = keccak(text="vitalik")
+        add_log(NEW_OWNER_TOPIC, "eth", 3, address=REGISTRY_ADDRESS, label=label)
+        add_log(NAME_CHANGED_TOPIC, f"{vitalik.lower()[2:]}.addr.reverse", 4)
+
+        # Starts after the oldest cached record.
+        indexer = ENSIndexer(ens=ens)
+        # Both in memory and on disk.
+        assert indexer.sync(to_block=5) == 4
+        assert ens.owner_cache.all_keys() == []
+        assert ens.name_cache.all_keys() == []
+        disk_cache = ens._disk_cache
+        assert disk_cache.get("owner", REGISTRY_ADDRESS, "vitalik.eth") is None
+        assert disk_cache.get("name", REGISTRY_ADDRESS, vitalik.lower()) is None
+        assert disk_cache.get("address", REGISTRY_ADDRESS, "vitalik.eth") is not None
+
+        # A new indexer resumes from the checkpoint.
+        assert ENSIndexer(ens=ens).last_block == 5
+
+
+def test_sync_invalidates_changed_records(ens, mock_web3_ens, indexer, add_log):
+    ens.records_many(["vitalik.eth", "test.eth"], text_keys=("url",))
+    add_log(TEXT_VALUE_CHANGED_TOPIC, "vitalik.eth", 3)
+
+    assert indexer.sync(to_block=5) == 3
+    assert not any(k.endswith("@vitalik.eth") for k in ens.record_cache.all_keys())
+    assert "text/url@test.eth" in ens.record_cache.all_keys()
+
+
+def test_sync_version_changed_invalidates_all_records(ens, mock_web3_ens, indexer, add_log):
+    vitalik = REGISTRY["vitalik.eth"]
+    ens.resolve_many(["vitalik.eth", "test.eth"])
+    ens.records_many(["vitalik.eth", "test.eth"], text_keys=("url",))
+    ens.name(vitalik)
+    assert ens.name_cache.all_keys() == [vitalik.lower()]
+    # ``clearRecords`` on both the name and its reverse record.
+    add_log(VERSION_CHANGED_TOPIC, "vitalik.eth", 3)
+    add_log(VERSION_CHANGED_TOPIC, f"{vitalik.lower()[2:]}.addr.reverse", 4)
+
+    assert indexer.sync(to_block=5) > 0
+    assert "vitalik.eth" not in ens.local_registry
+    assert not any(k.endswith("@vitalik.eth") for k in ens.record_cache.all_keys())
+    assert ens.name_cache.all_keys() == []
+    assert "test.eth" in ens.local_registry
+    assert "text/url@test.eth" in ens.record_cache.all_keys()
+
+
+def test_sync_starts_at_latest_block(ens, mock_web3_ens, add_log):
+    indexer = ENSIndexer(ens=ens)
+    mock_web3_ens.w3.eth.block_number = 100
+    assert indexer.sync() == 0
+    assert indexer.last_block == 100
+
+    # Changes since the first sync are indexed.
+    ens.resolve("vitalik.eth")
+    add_log(ADDR_CHANGED_TOPIC, "vitalik.eth", 103)
+    mock_web3_ens.w3.eth.block_number = 105
+    assert indexer.sync() == 1
+    assert "vitalik.eth" not in ens.local_registry
+    assert indexer.last_block == 105
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+from web3 import Web3
+from web3.exceptions import Web3RPCError
+from web3.providers.base import BaseProvider
+
+from ape_ens._cli import cli
+from ape_ens.ens import ENS, AsyncENS
+from ape_ens.exceptions import MissingRegistryError
+from ape_ens.instrumentation import (
+    Instrumentation,
+    SessionStats,
+    add_instrumentation,
+    counting_requests,
+    format_stats,
+    instrumented,
+    record_rpc,
+    remove_instrumentation,
+    session_stats,
+)
+from ape_ens.utils.concurrency import SingleFlight
+
+
+class Recorder(Instrumentation):
+    def __init__(self):
+        self.lookups = []
+
+    def start_lookup(self, method):
+        return method
+
+    def end_lookup(self, method, token, seconds, rpc_calls, error):
+        assert token == method
+        self.lookups.append((method, rpc_calls, error))
+
+
+@pytest.fixture(autouse=True)
+def stats():
+    session_stats.reset()
+    yield session_stats
+    session_stats.reset()
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder()
+    add_instrumentation(recorder)
+    yield recorder
+    remove_instrumentation(recorder)
+
+
+def test_resolve_many(ens, mock_web3_ens, stats):
+    ens.resolve_many(["vitalik.eth", "test.eth"])
+    ens.resolve_many(["vitalik.eth", "test.eth"])
+    counters = stats.counters
+    assert counters["lookups.resolve_many"] == 2
+    assert counters["rpc.eth_call"] == mock_web3_ens.w3.eth.call_count
+    rpc_calls = sum(v for k, v in counters.items() if k.startswith("rpc."))
+    assert counters["rpc_per_lookup.resolve_many.sum"] == rpc_calls
+    assert counters["cache.local_registry.misses"] == 2
+    assert counters["cache.local_registry.hits"] == 2
+    assert sum(v for k, v in counters.items() if k.startswith("latency.resolve_many.le_")) == 2
+
+
+def test_error(ens, mocker, stats, recorder):
+    mocker.patch.object(ens, "_batch_resolve", side_effect=Web3RPCError("Not found."))
+    with pytest.raises(MissingRegistryError):
+        ens.resolve_many(["vitalik.eth"])
+
+    assert stats.counters["errors.resolve_many.MissingRegistryError"] == 1
+    method, _, error = recorder.lookups[0]
+    assert method == "resolve_many"
+    assert isinstance(error, MissingRegistryError)
+
+
+def test_nested_lookups_counted_once(ens, stats, recorder, vitalik):
+    # ``name_many`` resolves the names forward to check them.
+    assert ens.name_many([vitalik]) == {vitalik: "vitalik.eth"}
+    assert [m for m, _, _ in recorder.lookups] == ["name_many"]
+    assert "lookups.resolve_many" not in stats.counters
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "stats.db"
+    for _ in range(2):
+        stats = SessionStats()
+        stats.count_rpc("eth_call", 3)
+        stats.save(path)
+        assert stats.counters == {}
+
+    assert SessionStats.load(path) == {"rpc.eth_call": 6}
+    assert list(format_stats(SessionStats.load(path))) == ["rpc.eth_call: 6"]
+    SessionStats.clear(path)
+    assert SessionStats.load(path) == {}
+
+
+def test_cli_stats(mocker, ens, tmp_path, stats):
+    mocker.patch("ape_ens._cli.create_ens").return_value = ens
+    mocker.patch.object(type(ens), "stats_path", tmp_path / "stats.db")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["stats"])
+    assert "No ENS stats saved" in result.output
+
+    stats.count_rpc("eth_call", 2)
+    stats.save(ens.stats_path)
+    stats.count_rpc("eth_call")
+    result = runner.invoke(cli, ["stats"])
+    assert "rpc.eth_call: 3" in result.output
+
+    result = runner.invoke(cli, ["stats", "--reset"])
+    assert result.exit_code == 0
+    assert not ens.stats_path.exists()
+    assert stats.counters == {}
+
+
+def test_prometheus(ens):
+    prometheus_client = pytest.importorskip("prometheus_client")
+    from ape_ens.instrumentation import PrometheusInstrumentation
+
+    registry = prometheus_client.CollectorRegistry()
+    instrumentation = PrometheusInstrumentation(registry=registry)
+    add_instrumentation(instrumentation)
+    try:
+        ens.resolve_many(["vitalik.eth"])
+    finally:
+        remove_instrumentation(instrumentation)
+
+    count = registry.get_sample_value("ape_ens_lookup_seconds_count", {"method": "resolve_many"})
+    assert count == 1
+
+
+def test_opentelemetry(ens):
+    pytest.importorskip("opentelemetry")
+    from ape_ens.instrumentation import OpenTelemetryInstrumentation
+
+    instrumentation = OpenTelemetryInstrumentation()
+    add_instrumentation(instrumentation)
+    try:
+        ens.resolve_many(["vitalik.eth"])
+    finally:
+        remove_instrumentation(instrumentation)
+
+
+def test_async_lookups(ens, mock_async_web3_ens, stats, recorder):
+    async_ens = AsyncENS(ens=ens, backend=mock_async_web3_ens)
+    asyncio.run(async_ens.resolve_many(["vitalik.eth", "test.eth"], use_cache=False))
+    assert recorder.lookups == [("resolve_many", 2, None)]
+    assert stats.counters["rpc.ens.address"] == 2
+    assert "lookups.resolve" not in stats.counters
+
+
+def test_counting_requests(stats):
+    class Provider(BaseProvider):
+        def make_request(self, method, params):
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+
+    web3 = Web3(Provider())
+    with counting_requests("ens.address", web3):
+        # Such as web3 finding the resolver and then calling it.
+        assert web3.eth.block_number == 1
+        assert web3.eth.chain_id == 1
+
+    assert stats.counters["rpc.ens.address"] == 2
+
+
+def test_single_flight_credits_each_lookup(recorder):
+    single_flight = SingleFlight()
+    calling = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        calling.set()
+        release.wait()
+        record_rpc("eth_call")
+
+    @instrumented("resolve")
+    def resolve():
+        single_flight.do("vitalik.eth", call)
+
+    leader = threading.Thread(target=resolve)
+    leader.start()
+    calling.wait()
+    follower = threading.Thread(target=resolve)
+    follower.start()
+    # Let the follower wait for the leader's call.
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    follower.join()
+    assert len(calls) == 1
+    assert [rpc_calls for _, rpc_calls, _ in recorder.lookups] == [1, 1]
+
+
+def test_persistent_stats(project, mocker):
+    save_at_exit = mocker.patch("ape_ens.ens.save_session_stats_at_exit")
+    with project.temp_config(ens={"persistent_stats": True}):
+        ens = ENS()
+
+    save_at_exit.assert_called_once_with(ens.stats_path)
@@ -0,0 +1,93 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from requests import HTTPError
+
+from ape_ens.ens import ENS
+from ape_ens.pool import connection_pool
+
+from .conftest import REGISTRY, REGISTRY_ADDRESS
+
+
+@pytest.fixture
+def connect(project, rpc_servers):
+    @contextmanager
+    def fn(**config):
+        config = {
+            "mainnet_providers": [server.url for server in rpc_servers],
+            "registry_address": REGISTRY_ADDRESS,
+            "rate_limits": {"default": {"max_retries": 0}},
+            **config,
+        }
+        with project.temp_config(ens=config):
+            connection_pool.clear()
+            try:
+                yield ENS()
+            finally:
+                connection_pool.clear()
+
+    return fn
+
+
+def stats(server):
+    return connection_pool.provider_stats[server.url.removeprefix("http://")]
+
+
+def test_resolve_many(connect, rpc_servers, vitalik):
+    with connect() as ens:
+        assert ens.resolve_many(["vitalik.eth"]) == {"vitalik.eth": vitalik}
+        assert stats(rpc_servers[0]).requests > 0
+
+
+def test_failover(connect, rpc_servers, vitalik):
+    slow, fast = rpc_servers
+    slow.status = 500
+    with connect() as ens:
+        assert ens.resolve_many(["vitalik.eth"]) == {"vitalik.eth": vitalik}
+        assert stats(slow).errors > 0
+        assert stats(fast).errors == 0
+
+
+def test_hedging(connect, rpc_servers, vitalik):
+    slow, fast = rpc_servers
+    slow.delay = 1.0
+    with connect(provider_hedge_delay=0.05) as ens:
+        start = time.monotonic()
+        assert ens.resolve_many(["vitalik.eth"]) == {"vitalik.eth": vitalik}
+        assert time.monotonic() - start < slow.delay
+        assert stats(fast).hedges > 0
+        assert stats(fast).wins > 0
+
+
+def test_fastest_provider(connect, rpc_servers):
+    slow, fast = rpc_servers
+    slow.delay = 0.2
+    with connect(provider_hedge_delay=None) as ens:
+        for _ in range(5):
+            ens.resolve_many(REGISTRY, use_cache=False)
+
+        # Only the first request (before its latency was known).
+        assert len(slow.requests) == 1
+        assert stats(slow).latency > stats(fast).latency
+
+
+def test_unhealthy_provider_skipped(connect, rpc_servers):
+    failing, healthy = rpc_servers
+    failing.status = 500
+    config = {"provider_hedge_delay": None, "provider_failure_threshold": 2}
+    with connect(**config) as ens:
+        for _ in range(5):
+            ens.resolve_many(REGISTRY, use_cache=False)
+
+        assert len(failing.requests) == 2
+        assert not stats(failing).healthy
+        assert stats(healthy).healthy
+
+
+def test_all_providers_fail(connect, rpc_servers):
+    for server in rpc_servers:
+        server.status = 503
+
+    with connect() as ens, pytest.raises(HTTPError):
+        ens.resolve_many(["vitalik.eth"])
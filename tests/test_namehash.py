@@ -1,6 +1,9 @@
+import pytest
+from ens.exceptions import InvalidName
+from ens.utils import raw_name_to_hash
 from eth_utils import to_hex
 
-from ape_ens.utils.namehash import namehash
+from ape_ens.utils.namehash import namehash, namehash_many
 
 
 def test_namehash():
@@ -19,3 +22,22 @@ def test_namehash():
     actual = to_hex(namehash("ape.rocks.eth"))
     expected = "0x6294e43e29c5c1573554a68e6ff302fa867ab0d56b800f623c1abb77609d2b8d"
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "name", ("Vitalik.ETH", "x.ourapp.eth", "a.b.c.d.e.eth", "💩.eth", "ß.eth", "a-b.eth")
+)
+def test_namehash_matches_web3(name):
+    assert namehash(name) == raw_name_to_hash(name)
+    # Again, using the memoized parent.
+    assert namehash(name) == raw_name_to_hash(name)
+
+
+def test_namehash_invalid():
+    with pytest.raises(InvalidName):
+        namehash("a..eth")
+
+
+def test_namehash_many():
+    names = [f"{i}.ourapp.eth" for i in range(5)] + ["foo.eth"]
+    assert namehash_many(names) == [namehash(n) for n in names]
@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ape_ens.ens import ENS
+from ape_ens.pool import ConnectionPool
+
+REGISTRY_A = "0x00000000000000000000000000000000000000aa"
+REGISTRY_B = "0x00000000000000000000000000000000000000bb"
+
+
+@pytest.fixture
+def provider(mocker):
+    return mocker.MagicMock()
+
+
+@pytest.fixture
+def pool(mocker, provider):
+    pool = ConnectionPool(max_size=1)
+    mocker.patch.object(pool, "_find_mainnet_provider", return_value=provider)
+    mocker.patch("web3.main.ENS.from_web3", side_effect=lambda w3, addr: object())
+    return pool
+
+
+def test_get(pool, provider):
+    assert pool.get() is provider.web3.ens
+    ens = pool.get(REGISTRY_A)
+    assert pool.get(REGISTRY_A.upper().replace("0X", "0x")) is ens
+    pool._find_mainnet_provider.assert_called_once()
+
+
+def test_get_bounded(pool):
+    ens = pool.get(REGISTRY_A)
+    pool.get(REGISTRY_B)
+    assert pool.get(REGISTRY_A) is not ens
+
+
+def test_provider_found_once(pool, provider):
+    def find():
+        time.sleep(0.05)
+        return provider
+
+    pool._find_mainnet_provider.side_effect = find
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        providers = list(executor.map(lambda _: pool.provider, range(4)))
+
+    assert providers == [provider] * 4
+    pool._find_mainnet_provider.assert_called_once()
+
+
+def test_forked_process(pool, mocker):
+    ens = pool.get(REGISTRY_A)
+    mocker.patch("ape_ens.utils.concurrency.os.getpid", return_value=pool._fork_guard.pid + 1)
+    assert pool.get(REGISTRY_A) is not ens
+    assert pool._find_mainnet_provider.call_count == 2
+
+
+def test_shared_by_ens_instances(mocker, pool):
+    mocker.patch("ape_ens.ens.connection_pool", pool)
+    assert ENS()._create_web3_ens(REGISTRY_A) is ENS()._create_web3_ens(REGISTRY_A)
+    assert ENS()._mainnet_provider is ENS()._mainnet_provider
+
+
+def test_provider_disconnected(pool, provider, mocker):
+    assert pool.provider is provider
+    ens = pool.get(REGISTRY_A)
+    provider._web3 = None
+    other_provider = mocker.MagicMock()
+    pool._find_mainnet_provider.return_value = other_provider
+    assert pool.get(REGISTRY_A) is not ens
+    assert pool.provider is other_provider
+
+
+def test_provider_not_connected_when_found(pool, provider):
+    provider._web3 = None
+    assert pool.provider is provider
+    assert pool.provider is provider
+    pool._find_mainnet_provider.assert_called_once()
+
+
+def test_provider_mainnet_activated(pool, provider, mocker):
+    assert pool.provider is provider
+    active_provider = mocker.MagicMock()
+    mocker.patch("ape_ens.pool.is_mainnet_provider", return_value=False)
+    mocker.patch.object(type(pool.network_manager), "active_provider", active_provider)
+    assert pool.provider is provider
+
+    mocker.patch("ape_ens.pool.is_mainnet_provider", return_value=True)
+    pool._find_mainnet_provider.return_value = active_provider
+    assert pool.provider is active_provider
+
+
+def test_provider_set(pool, provider, mocker):
+    other_provider = mocker.MagicMock(_web3=None)
+    pool.provider = other_provider
+    assert pool.provider is other_provider
+    pool._find_mainnet_provider.assert_not_called()
+
+
+def test_http_keep_alive_pool_size(pool):
+    ((_, endpoint),) = pool._get_endpoints(["https://rpc.example.com/KEY"])
+    adapter = pool._sessions[0].get_adapter("https://rpc.example.com")
+    assert adapter._pool_maxsize == pool.max_size
+    pool.clear()
+    assert pool._sessions == []
@@ -0,0 +1,348 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from eth_utils import to_checksum_address
+from requests import HTTPError, Response
+from web3.exceptions import Web3RPCError
+
+from ape_ens.exceptions import RateLimitError
+from ape_ens.instrumentation import current_lookup, instrumented
+from ape_ens.scheduler import (
+    RPCScheduler,
+    TokenBucket,
+    clear_schedulers,
+    get_scheduler,
+    is_rate_limited,
+    is_too_large,
+    is_transient,
+    retry_after,
+)
+from ape_ens.utils.multicall import RESOLVER_SELECTOR, encode_node_call
+from ape_ens.utils.namehash import namehash
+
+from .conftest import REGISTRY, REGISTRY_ADDRESS, FakeWeb3
+
+
+def http_error(status: int, retry_after=None) -> HTTPError:
+    response = Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+
+    return HTTPError(f"{status} Error", response=response)
+
+
+def rpc_error(code: int, message: str) -> Web3RPCError:
+    return Web3RPCError(message, rpc_response={"error": {"code": code, "message": message}})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def schedulers():
+    clear_schedulers()
+    yield
+    clear_schedulers()
+
+
+@pytest.fixture
+def rate_limits(project):
+    def fn(**config):
+        return project.temp_config(ens={"rate_limits": {"default": config}})
+
+    return fn
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, clock=clock, sleep=clock.sleep)
+    bucket._tokens = bucket.capacity
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.5
+    # Waiting requests reserve their tokens.
+    assert bucket.acquire(2) == 1.0
+    clock.now += 10
+    assert bucket.acquire() == 0
+
+    bucket.pause(3)
+    assert bucket.acquire() == 3
+
+
+def test_token_bucket_no_limit():
+    clock = Clock()
+    bucket = TokenBucket(clock=clock, sleep=clock.sleep)
+    assert all(bucket.acquire(100) == 0 for _ in range(10))
+    assert clock.sleeps == []
+
+
+def test_error_classification():
+    assert is_rate_limited(http_error(429))
+    assert is_rate_limited(rpc_error(-32005, "limit exceeded"))
+    assert is_rate_limited(Web3RPCError("Your app has exceeded its compute units per second"))
+    assert not is_rate_limited(http_error(503))
+    assert is_transient(http_error(503))
+    assert is_transient(TimeoutError())
+    assert not is_transient(ValueError("nope"))
+    assert is_too_large(rpc_error(-32000, "out of gas"))
+    assert not is_too_large(rpc_error(-32000, "execution reverted"))
+    assert retry_after(http_error(429, retry_after=2)) == 2
+    assert retry_after(http_error(429)) is None
+
+
+def test_run_retries(rate_limits):
+    clock = Clock()
+    scheduler = RPCScheduler(sleep=clock.sleep)
+    errors = [http_error(429, retry_after=1.5), http_error(503)]
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+
+        return "result"
+
+    with rate_limits(backoff=0.5):
+        assert scheduler.run("eth_call", call) == "result"
+
+    # Rate limited: all calls wait.
+    assert clock.sleeps[0] == pytest.approx(1.5, abs=0.1)
+    assert 0.5 <= clock.sleeps[1] <= 1.0
+
+
+def test_run_rate_limited(rate_limits):
+    scheduler = RPCScheduler(sleep=lambda _: None)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise http_error(429)
+
+    with rate_limits(max_retries=2), pytest.raises(RateLimitError):
+        scheduler.run("eth_call", call)
+
+    assert len(calls) == 3
+
+
+def test_run_async(rate_limits, mocker):
+    scheduler = RPCScheduler()
+    scheduler.bucket = TokenBucket()
+    sleep = mocker.patch("ape_ens.scheduler.asyncio.sleep", mocker.AsyncMock())
+    errors = [http_error(503)]
+
+    async def call():
+        if errors:
+            raise errors.pop()
+
+        return "result"
+
+    with rate_limits(requests_per_second=1, backoff=2, max_backoff=2):
+        assert asyncio.run(scheduler.run_async("eth_call", call)) == "result"
+        # Waited on the event loop for the rate limit, the backoff, and the rate limit.
+        delays = [c.args[0] for c in sleep.await_args_list]
+        assert delays[0] == pytest.approx(1, abs=0.1)
+        assert 1 <= delays[1] <= 2
+        assert delays[2] == pytest.approx(2, abs=0.1)
+
+
+def test_run_does_not_retry_other_errors():
+    scheduler = RPCScheduler(sleep=lambda _: None)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise Web3RPCError("Not found.")
+
+    with pytest.raises(Web3RPCError):
+        scheduler.run("eth_call", call)
+
+    assert len(calls) == 1
+
+
+def test_run_method_costs(rate_limits):
+    clock = Clock()
+    scheduler = RPCScheduler(sleep=clock.sleep)
+    scheduler.bucket = TokenBucket(clock=clock, sleep=clock.sleep)
+    with rate_limits(requests_per_second=10, method_costs={"eth_call": 5}):
+        for _ in range(3):
+            scheduler.run("eth_call", lambda: None)
+
+    assert sum(clock.sleeps) == pytest.approx(1.5)
+
+
+def test_get_rate_limit(project):
+    config = {"default": {"max_retries": 1}, "alchemy": {"requests_per_second": 25}}
+    with project.temp_config(ens={"rate_limits": config}):
+        assert get_scheduler("alchemy").settings.requests_per_second == 25
+        assert get_scheduler("node").settings.max_retries == 1
+
+    assert get_scheduler("alchemy") is get_scheduler("alchemy")
+
+
+def test_resolve_many_retries(ens, mock_web3_ens, rate_limits):
+    eth = mock_web3_ens.w3.eth
+    call = eth.call
+    errors = [http_error(429)]
+
+    def rate_limited_call(*args, **kwargs):
+        if errors:
+            raise errors.pop()
+
+        return call(*args, **kwargs)
+
+    eth.call = rate_limited_call
+    with rate_limits(backoff=0):
+        assert ens.resolve_many(REGISTRY) == {
+            n: to_checksum_address(a) for n, a in REGISTRY.items()
+        }
+
+
+def test_resolve_many_gas_limit(ens, mock_web3_ens, project):
+    eth = mock_web3_ens.w3.eth
+    call = eth.call
+    sizes = []
+
+    def gas_limited_call(tx, *args, **kwargs):
+        # Roughly, each call in a multicall adds this much calldata.
+        if (size := len(tx["data"]) // 160) > 2:
+            raise rpc_error(-32000, "out of gas")
+
+        sizes.append(size)
+        return call(tx, *args, **kwargs)
+
+    eth.call = gas_limited_call
+    names = [f"name{i}.eth" for i in range(8)]
+    with project.temp_config(ens={"rate_limits": {"default": {"min_batch_size": 1}}}):
+        assert ens.resolve_many([*REGISTRY, *names], use_cache=False) == {
+            **{n: to_checksum_address(a) for n, a in REGISTRY.items()},
+            **dict.fromkeys(names),
+        }
+        assert ens._scheduler(mock_web3_ens).batch_size <= 2
+
+    assert all(size <= 2 for size in sizes)
+
+
+@pytest.mark.parametrize("adaptive", (True, False))
+def test_resolve_many_gas_limit_default_settings(ens, mock_web3_ens, project, adaptive):
+    eth = mock_web3_ens.w3.eth
+    call = eth.call
+    sizes = []
+
+    def gas_limited_call(tx, *args, **kwargs):
+        sizes.append(size := len(tx["data"]) // 160)
+        if size > 2:
+            raise rpc_error(-32000, "out of gas")
+
+        return call(tx, *args, **kwargs)
+
+    eth.call = gas_limited_call
+    names = [f"name{i}.eth" for i in range(38)]
+    config = {"rate_limits": {"default": {"adaptive_batch_size": adaptive}}}
+    with project.temp_config(ens=config):
+        assert ens.resolve_many([*REGISTRY, *names], use_cache=False) == {
+            **{n: to_checksum_address(a) for n, a in REGISTRY.items()},
+            **dict.fromkeys(names),
+        }
+
+    # Split below ``min_batch_size`` (10), rather than retrying the same size.
+    assert sizes[0] > 10
+    assert all(after < size for size, after in zip(sizes, sizes[1:]) if size > 2)
+
+
+def test_multicall_too_large_single_call():
+    scheduler = RPCScheduler()
+    web3 = FakeWeb3()
+    attempts = []
+
+    def too_large(*args, **kwargs):
+        attempts.append(1)
+        raise rpc_error(-32000, "out of gas")
+
+    web3.eth.call = too_large
+    nodes = [bytes(namehash(f"name{i}.eth")) for i in range(4)]
+    calls = [(REGISTRY_ADDRESS, encode_node_call(RESOLVER_SELECTOR, node)) for node in nodes]
+    with pytest.raises(Web3RPCError):
+        scheduler.aggregate(web3, calls)
+
+    # 4, 2, and then a single call, which is re-raised.
+    assert len(attempts) == 3
+
+
+def test_adaptive_batch_size(project):
+    scheduler = RPCScheduler()
+    with project.temp_config(ens={"multicall_batch_size": 100}):
+        assert scheduler.batch_size == 100
+        scheduler._adapt(100, 4.0)
+        assert scheduler.batch_size == 50
+        scheduler._adapt(50, 0.1)
+        assert scheduler.batch_size == 62
+        scheduler._adapt(10, 0.1)
+        # Only full batches grow it.
+        assert scheduler.batch_size == 62
+        for _ in range(5):
+            scheduler._adapt(scheduler.batch_size, 0.1)
+
+        assert scheduler.batch_size == 100
+        config = {
+            "multicall_batch_size": 100,
+            "rate_limits": {"default": {"adaptive_batch_size": False}},
+        }
+        with project.temp_config(ens=config):
+            scheduler._adapt(100, 4.0)
+            assert scheduler.batch_size == 100
+
+
+def test_aggregate_packs_concurrent_calls():
+    scheduler = RPCScheduler()
+    web3 = FakeWeb3()
+    call = web3.eth.call
+    calling = threading.Event()
+    release = threading.Event()
+
+    def slow_call(*args, **kwargs):
+        calling.set()
+        release.wait()
+        return call(*args, **kwargs)
+
+    web3.eth.call = slow_call
+    nodes = [bytes(namehash(name)) for name in REGISTRY]
+    calls = [(REGISTRY_ADDRESS, encode_node_call(RESOLVER_SELECTOR, node)) for node in nodes]
+    results = []
+    rpc_calls = []
+
+    @instrumented("aggregate")
+    def aggregate():
+        results.append(scheduler.aggregate(web3, calls))
+        rpc_calls.append(current_lookup()[0])
+
+    threads = [threading.Thread(target=aggregate) for _ in range(8)]
+    threads[0].start()
+    calling.wait()
+    for thread in threads[1:]:
+        thread.start()
+
+    # Wait for the others to queue behind the first call.
+    while sum(len(q) for q in scheduler._queues.values()) < len(threads) - 1:
+        time.sleep(0.01)
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert web3.eth.call_count == 2
+    assert len(results) == len(threads)
+    assert all(r == results[0] and len(r) == len(calls) for r in results)
+    # Each look-up is credited with the multicall its calls were in, not only the leader.
+    assert rpc_calls == [1] * len(threads)
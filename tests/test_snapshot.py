@@ -0,0 +1,68 @@
+import pytest
+
+from ape_ens.snapshot import Snapshot
+from tests.conftest import REGISTRY, REGISTRY_ADDRESS
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "snapshot.db"
+    records = [("vitalik.eth", REGISTRY["vitalik.eth"]), ("nope.eth", None)]
+    Snapshot.write(path, iter(records), block_number=123, registry=REGISTRY_ADDRESS)
+    return path
+
+
+def test_lookup(snapshot_path):
+    snapshot = Snapshot(snapshot_path)
+    assert len(snapshot) == 2
+    assert snapshot.block_number == 123
+    assert snapshot.registry == REGISTRY_ADDRESS
+    assert snapshot.lookup("vitalik.eth") == (True, REGISTRY["vitalik.eth"])
+    assert snapshot.lookup("VITALIK.eth") == (True, REGISTRY["vitalik.eth"])
+    assert snapshot.lookup("nope.eth") == (True, None)
+    assert snapshot.lookup("other.eth") == (False, None)
+
+
+def test_missing_file(tmp_path):
+    snapshot = Snapshot(tmp_path / "missing.db")
+    with pytest.raises(FileNotFoundError):
+        snapshot.lookup("vitalik.eth")
+
+
+def test_resolve_from_snapshot(project, ens, mock_web3_ens, snapshot_path):
+    with project.temp_config(ens={"snapshot_path": snapshot_path}):
+        assert ens.resolve("vitalik.eth") == REGISTRY["vitalik.eth"]
+        assert ens.resolve("nope.eth") is None
+        assert ens.resolve_many(["vitalik.eth", "nope.eth"]) == {
+            "vitalik.eth": REGISTRY["vitalik.eth"],
+            "nope.eth": None,
+        }
+
+        assert mock_web3_ens.w3.eth.call_count == 0
+
+        # Names not in the snapshot are still looked up.
+        assert ens.resolve("test.eth").lower() == REGISTRY["test.eth"].lower()
+        assert mock_web3_ens.w3.eth.call_count
+
+
+def test_resolve_from_snapshot_of_other_registry(project, ens, mock_web3_ens, snapshot_path):
+    other_registry = "0x1111111111111111111111111111111111111111"
+    with project.temp_config(ens={"snapshot_path": snapshot_path}):
+        assert ens._lookup_snapshot("nope.eth") == (True, None)
+        assert ens._lookup_snapshot("nope.eth", registry_address=other_registry) == (False, None)
+
+    config = {"snapshot_path": snapshot_path, "registry_address": other_registry}
+    with project.temp_config(ens=config):
+        assert ens._lookup_snapshot("nope.eth") == (False, None)
+
+
+def test_export_snapshot(ens, mock_web3_ens, tmp_path):
+    path = tmp_path / "exported.db"
+    snapshot = ens.export_snapshot(
+        path, iter(["vitalik.eth", "test.eth", "nope.eth"]), block_number=5, batch_size=2
+    )
+    assert snapshot.block_number == 5
+    assert snapshot.registry == REGISTRY_ADDRESS
+    assert snapshot.lookup("vitalik.eth") == (True, REGISTRY["vitalik.eth"])
+    assert snapshot.lookup("test.eth")[1].lower() == REGISTRY["test.eth"].lower()
+    assert snapshot.lookup("nope.eth") == (True, None)
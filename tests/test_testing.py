@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+import pytest
+
+from ape_ens.ens import ENS
+
+
+def test_resolve(local_ens, accounts):
+    local_ens.register("alice.eth", accounts[1].address)
+    assert ENS().resolve("alice.eth") == accounts[1].address
+
+
+@pytest.mark.parametrize("local_ens_names", [250], indirect=True)
+def test_resolve_many(local_ens, local_ens_names):
+    ens = ENS()
+    assert ens.resolve_many(local_ens_names) == local_ens_names
+    assert ens.resolve_many(["nope.eth"]) == {"nope.eth": None}
+
+
+def test_name_many(local_ens, local_ens_names):
+    addresses = {address: name for name, address in local_ens_names.items()}
+    assert ENS().name_many(addresses) == addresses
+
+
+def test_records(local_ens, accounts):
+    local_ens.register("alice.eth", accounts[1].address)
+    local_ens.set_text("alice.eth", "url", "https://apeworx.io")
+    records = ENS().records("alice.eth", text_keys=["url"], contenthash=False)
+    assert records.addresses == {60: accounts[1].address}
+    assert records.texts == {"url": "https://apeworx.io"}
+
+
+def test_owner(local_ens, accounts):
+    local_ens.register("alice.eth", accounts[1].address)
+    assert ENS().owner("alice.eth") == local_ens.owner.address
+
+
+def test_subnames(local_ens, accounts):
+    local_ens.register_many({"a.b.eth": accounts[1].address, "c.b.eth": accounts[2].address})
+    assert ENS().resolve_many(["a.b.eth", "c.b.eth"]) == {
+        "a.b.eth": accounts[1].address,
+        "c.b.eth": accounts[2].address,
+    }
+
+
+def test_reverse_registrar(local_ens, accounts):
+    local_ens.register("alice.eth", accounts[1].address)
+    local_ens.reverse_registrar.setName("alice.eth", sender=accounts[1])
+    assert ENS().name(accounts[1].address) == "alice.eth"
+
+
+def test_conversion(local_ens, accounts, chain):
+    from ape.types import AddressType
+
+    local_ens.register("alice.eth", accounts[1].address)
+    assert chain.conversion_manager.convert("alice.eth", AddressType) == accounts[1].address
+
+
+def test_import_without_pytest():
+    # ``ape_ens.testing`` may be used without pytest; only the fixtures need it.
+    code = "import sys; sys.modules['pytest'] = None; import ape_ens.testing"
+    subprocess.run([sys.executable, "-c", code], check=True)